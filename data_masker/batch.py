@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from .detectors import Detector
+from .io_utils import (
+    STREAMING_KINDS,
+    SUPPORTED,
+    detect_kind,
+    iter_table_chunks,
+    open_chunk_writer,
+    read_table,
+    write_table,
+)
+from .masker import Masker
+from .rules import Rules
+from .streams import temp_path_for
+from .token_store import TokenStore
+
+
+@dataclass
+class FileResult:
+    path: str
+    columns: dict[str, dict[str, int]] = field(default_factory=dict)
+    rows: int = 0
+    error: str | None = None
+
+
+def find_files(source: str, pattern: str = "*", recursive: bool = False) -> list[str]:
+    """Supported data files in *source* whose name matches *pattern*, sorted."""
+    found: list[str] = []
+    for root, dirs, files in os.walk(source):
+        if not recursive:
+            dirs.clear()
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED) and fnmatch.fnmatch(name, pattern):
+                found.append(os.path.join(root, name))
+    return found
+
+
+def _run(
+    fn: Callable[[str], FileResult], paths: list[str], jobs: int
+) -> Iterator[FileResult]:
+    # Threads overlap one file's reads and writes with another's detection; a
+    # failing file is reported and the rest of the batch carries on.
+    def guarded(path: str) -> FileResult:
+        try:
+            return fn(path)
+        except Exception as exc:
+            return FileResult(path, error=f"{type(exc).__name__}: {exc}")
+
+    with ThreadPoolExecutor(max(1, jobs)) as pool:
+        yield from pool.map(guarded, paths)
+
+
+def _accumulate(total: dict[str, dict[str, int]], counts: dict[str, dict[str, int]]) -> None:
+    # Like the scan report, only columns and types with hits are kept
+    for col, by_type in counts.items():
+        for t, c in by_type.items():
+            if c:
+                col_total = total.setdefault(col, {})
+                col_total[t] = col_total.get(t, 0) + c
+
+
+def scan_files(
+    paths: list[str], rules: Rules, jobs: int = 1, chunksize: int = 0
+) -> Iterator[FileResult]:
+    """Scan each file with detectors built once per thread, yielding in input order."""
+    local = threading.local()
+
+    def scan_one(path: str) -> FileResult:
+        if not hasattr(local, "detector"):
+            local.detector = Detector.from_rules(rules)
+        result = FileResult(path)
+        kind = detect_kind(path)
+        if chunksize and kind in STREAMING_KINDS:
+            chunks = iter_table_chunks(path, chunksize=chunksize, kind=kind)
+        else:
+            chunks = iter([read_table(path)[0]])
+        for chunk in chunks:
+            _accumulate(result.columns, local.detector.detect_frame(chunk))
+            result.rows += len(chunk)
+        return result
+
+    yield from _run(scan_one, paths, jobs)
+
+
+def mask_files(  # noqa: PLR0913
+    paths: list[str],
+    source: str,
+    output_dir: str,
+    rules: Rules,
+    tokens: TokenStore,
+    jobs: int = 1,
+    chunksize: int = 0,
+) -> Iterator[FileResult]:
+    """Mask each file into *output_dir* (same relative path), yielding in input order.
+
+    Every thread masks with its own Masker, and all of them share *tokens*, so
+    a value gets the same token in every file of the batch. Each file is
+    written to a temp path and swapped in once it is read, so *output_dir* may
+    overlap *source* without truncating inputs.
+    """
+    local = threading.local()
+
+    def mask_one(path: str) -> FileResult:
+        if not hasattr(local, "masker"):
+            local.masker = Masker(rules, token_store=tokens)
+        masker: Masker = local.masker
+        target = os.path.join(output_dir, os.path.relpath(path, source))
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        result = FileResult(path)
+        kind = detect_kind(path)
+        out_path = temp_path_for(target)
+        try:
+            if chunksize and kind in STREAMING_KINDS:
+                with open_chunk_writer(out_path, kind, masked=masker.targets) as writer:
+                    for chunk in iter_table_chunks(path, chunksize=chunksize, kind=kind):
+                        writer.write(masker.mask_frame(chunk))
+                        result.rows += len(chunk)
+            else:
+                df, kind = read_table(path)
+                write_table(masker.mask_frame(df), out_path, kind)
+                result.rows = len(df)
+            os.replace(out_path, target)
+        finally:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+        tokens.flush()
+        return result
+
+    yield from _run(mask_one, paths, jobs)
+
+
+def summarize(results: list[FileResult]) -> dict[str, Any]:
+    """Aggregated scan report: per-file columns plus totals per PII type."""
+    totals: dict[str, int] = {}
+    for r in results:
+        for by_type in r.columns.values():
+            for t, c in by_type.items():
+                totals[t] = totals.get(t, 0) + c
+    return {
+        "files": {
+            r.path: {"rows": r.rows, "columns": r.columns} for r in results if r.error is None
+        },
+        "errors": {r.path: r.error for r in results if r.error is not None},
+        "totals": totals,
+    }
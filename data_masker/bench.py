@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from .pii_patterns import DEFAULT_PATTERNS
+
+# The CLI reads DEFAULT_TOLERANCE at startup, so pandas and the masking
+# modules are only imported once a benchmark actually runs.
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .masker import Masker
+
+STRATEGIES = ("redact", "hash", "tokenize", "partial", "null")
+FILLER_WORDS = ("alpha", "Bravo Corp", "charlie", "pending", "Delta 42", "n/a", "echo foxtrot")
+# Default allowed slowdown before a result counts as a regression
+DEFAULT_TOLERANCE = 0.2
+# Share of generated cards and IBANs with a deliberately wrong checksum
+INVALID_SHARE = 0.25
+LUHN_SUBTRACT = 9
+
+
+def _luhn_check_digit(body: str) -> str:
+    total = 0
+    for i, ch in enumerate(reversed(body)):
+        d = int(ch)
+        if i % 2 == 0:
+            d *= 2
+            if d > LUHN_SUBTRACT:
+                d -= LUHN_SUBTRACT
+        total += d
+    return str((10 - total % 10) % 10)
+
+
+def _iban(rng: random.Random, valid: bool) -> str:
+    bban = "WEST" + "".join(rng.choice("0123456789") for _ in range(14))
+    numeric = "".join(str(int(ch, 36)) for ch in bban + "GB00")
+    check = 98 - int(numeric) % 97
+    if not valid:
+        check = (check + 1) % 100
+    return f"GB{check:02d}{bban}"
+
+
+def _pii_value(kind: str, i: int, rng: random.Random) -> str:  # noqa: PLR0911
+    # Some cards and IBANs fail their checksum so the validators get exercised
+    valid = rng.random() >= INVALID_SHARE
+    if kind == "email":
+        return f"user{i}@example.com"
+    if kind == "phone":
+        return f"202-555-{i % 10000:04d}"
+    if kind == "credit_card":
+        body = "4" + "".join(rng.choice("0123456789") for _ in range(14))
+        check = int(_luhn_check_digit(body))
+        return body + str(check if valid else (check + 1) % 10)
+    if kind == "ssn":
+        return f"{100 + i % 800:03d}-{10 + i % 89:02d}-{1000 + i % 9000:04d}"
+    if kind == "ipv4":
+        return f"10.{i % 256}.{(i // 256) % 256}.{i % 250 + 1}"
+    if kind == "ipv6":
+        return f"2001:db8::{i % 65536:x}"
+    if kind == "iban":
+        return _iban(rng, valid)
+    return rng.choice(FILLER_WORDS)
+
+
+def generate_dataset(
+    rows: int, width: int = 12, density: float = 0.5, seed: int = 0
+) -> pd.DataFrame:
+    """Build a synthetic table with one column per PII type plus filler columns.
+
+    *density* is the share of cells in PII columns that hold a PII value; the
+    rest hold filler text. Columns beyond the PII types are ids, amounts and
+    free text that never match.
+    """
+    import pandas as pd  # noqa: PLC0415
+
+    rng = random.Random(seed)
+    data: dict[str, list[Any]] = {}
+    for kind in list(DEFAULT_PATTERNS)[:width]:
+        data[kind] = [
+            _pii_value(kind, i, rng) if rng.random() < density else rng.choice(FILLER_WORDS)
+            for i in range(rows)
+        ]
+    fillers: list[tuple[str, Callable[[int], Any]]] = [
+        ("id", lambda i: i),
+        ("amount", lambda i: round(rng.random() * 1000, 2)),
+        ("note", lambda i: rng.choice(FILLER_WORDS)),
+    ]
+    extra = 0
+    while len(data) < width:
+        name, make = fillers[extra % len(fillers)]
+        data[f"{name}_{extra}"] = [make(i) for i in range(rows)]
+        extra += 1
+    return pd.DataFrame(data)
+
+
+def _best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _record(seconds: float, rows: int, nbytes: int) -> dict[str, float]:
+    seconds = max(seconds, 1e-9)
+    return {
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(rows / seconds, 1),
+        "mb_per_sec": round(nbytes / seconds / 1e6, 3),
+    }
+
+
+def _text_bytes(df: pd.DataFrame) -> int:
+    return int(sum(df[col].astype(str).str.len().sum() for col in df.columns))
+
+
+def run_benchmarks(  # noqa: PLR0913
+    rows: int = 20000,
+    width: int = 12,
+    density: float = 0.5,
+    seed: int = 0,
+    repeat: int = 3,
+    chunksize: int = 5000,
+) -> dict[str, Any]:
+    """Time the hot paths on a synthetic dataset and return a JSON-able report."""
+    import pandas as pd  # noqa: PLC0415
+    from click.testing import CliRunner  # noqa: PLC0415
+
+    from .cli import main  # noqa: PLC0415
+    from .detectors import Detector  # noqa: PLC0415
+    from .masker import Masker  # noqa: PLC0415
+    from .rules import Rules  # noqa: PLC0415
+    from .token_store import TokenStore  # noqa: PLC0415
+
+    df = generate_dataset(rows, width, density, seed)
+    nbytes = _text_bytes(df)
+    results: dict[str, dict[str, float]] = {}
+
+    detector = Detector()
+    results["detect_series"] = _record(
+        _best_of(repeat, lambda: detector.detect_frame(df)), rows, nbytes
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        values = df["email"].astype(str).tolist()
+        value_bytes = sum(len(v) for v in values)
+        for strategy in STRATEGIES:
+            rules = Rules.load(None)
+            rules.options["cache_size"] = 0
+            rules.columns["email"] = {"strategy": strategy}
+            store = TokenStore(os.path.join(tmp, f"{strategy}.jsonl"))
+            masker = Masker(rules, token_store=store)
+
+            def mask_all(m: Masker = masker) -> None:
+                for v in values:
+                    m.mask_cell(v, "email")
+
+            seconds = _best_of(repeat, mask_all)
+            results[f"mask_cell.{strategy}"] = _record(seconds, len(values), value_bytes)
+            store.close()
+
+        def tokenize_all() -> None:
+            store = TokenStore(os.path.join(tmp, "tokenize.sqlite"))
+            for v in values:
+                store.tokenize(v)
+            store.close()
+            os.remove(os.path.join(tmp, "tokenize.sqlite"))
+
+        results["token_store.tokenize"] = _record(
+            _best_of(repeat, tokenize_all), len(values), value_bytes
+        )
+
+        src = os.path.join(tmp, "bench.csv")
+        df.to_csv(src, index=False)
+        file_bytes = os.path.getsize(src)
+        runner = CliRunner()
+        out = os.path.join(tmp, "out.csv")
+        tokens = os.path.join(tmp, "e2e.jsonl")
+        cases = {
+            "scan": ["scan", src],
+            "scan.chunked": ["scan", src, "--chunksize", str(chunksize)],
+            "mask": ["mask", src, "-o", out, "--token-store", tokens],
+            "mask.chunked": [
+                "mask", src, "-o", out, "--token-store", tokens, "--chunksize", str(chunksize),
+            ],
+        }
+        for name, args in cases.items():
+
+            def invoke(a: list[str] = args) -> None:
+                runner.invoke(main, a, catch_exceptions=False)
+
+            seconds = _best_of(repeat, invoke)
+            results[f"e2e.{name}"] = _record(seconds, rows, file_bytes)
+
+    return {
+        "meta": {
+            "rows": rows,
+            "width": width,
+            "density": density,
+            "seed": seed,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    report: dict[str, Any], baseline: dict[str, Any], tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """List benchmarks whose rows/sec fell more than *tolerance* below the baseline."""
+    regressions: list[str] = []
+    for name, base in baseline.get("results", {}).items():
+        current = report["results"].get(name)
+        if current is None:
+            continue
+        floor = base["rows_per_sec"] * (1 - tolerance)
+        if current["rows_per_sec"] < floor:
+            change = current["rows_per_sec"] / base["rows_per_sec"] - 1
+            regressions.append(
+                f"{name}: {current['rows_per_sec']:.0f} rows/s vs baseline "
+                f"{base['rows_per_sec']:.0f} ({change:+.1%})"
+            )
+    return regressions
+
+
+def load_report(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        data: dict[str, Any] = json.load(f)
+    return data
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from re import Pattern
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from .dictionaries import TermDictionary, load_dictionaries
+from .pii_patterns import DEFAULT_PATTERNS, DEFAULT_PREFILTERS, IPV6, Prefilter
+from .validators import iban_valid, ipv6_valid, luhn_valid
+
+if TYPE_CHECKING:
+    from .rules import Rules
+    from .stats import Stats
+
+# name, compiled pattern or term dictionary, prefilter (None = always search), validator
+_EngineEntry = tuple[
+    str, Pattern[str] | TermDictionary, Prefilter | None, Callable[[str], bool] | None
+]
+# name, bound regex search, required char, its minimum count, validator
+_Candidate = tuple[str, Callable[[str], Any], str, int, Callable[[str], bool] | None]
+_D = TypeVar("_D", bound="CellDetector")
+
+
+class CellDetector:
+    """Detection one value at a time, in plain Python.
+
+    The stream engine uses it as is, so masking a CSV row by row never imports
+    pandas or numpy; ``Detector`` adds column-at-a-time detection on top.
+    """
+
+    def __init__(
+        self,
+        patterns: dict[str, Pattern[str]] | None = None,
+        dictionaries: dict[str, TermDictionary] | None = None,
+    ) -> None:
+        # No patterns means the defaults, unless only dictionaries were asked for
+        self.patterns = patterns or ({} if dictionaries else DEFAULT_PATTERNS)
+        self.dictionaries = dictionaries or {}
+        # Every PII type this detector reports, in engine order
+        self.types = [*self.patterns, *self.dictionaries]
+        self._engine = self._compile()
+        # Length and digit count are clamped at the largest threshold any prefilter
+        # asks for, so the number of cached candidate lists stays small.
+        prefilters = [pf for _, _, pf, _ in self._engine if pf is not None]
+        self._max_length = max((pf.min_length for pf in prefilters), default=0)
+        self._max_digits = max((pf.min_digits for pf in prefilters), default=0)
+        self._by_shape: dict[tuple[int, int], list[_Candidate]] = {}
+        # Set to a Stats to record regex/validator time and counts (--stats)
+        self.stats: Stats | None = None
+
+    @classmethod
+    def from_rules(cls: type[_D], rules: Rules) -> _D:
+        """Detector for the patterns and dictionaries *rules* enable."""
+        patterns = {k: v for k, v in DEFAULT_PATTERNS.items() if k in rules.enabled_detectors}
+        return cls(patterns, dictionaries=load_dictionaries(rules))
+
+    def _compile(self) -> list[_EngineEntry]:
+        # One entry per enabled pattern: pattern, prefilter and optional validator.
+        validators: dict[str, Callable[[str], bool]] = {
+            "credit_card": self._passes_luhn,
+            "ipv6": self._valid_ipv6,
+            "iban": self._valid_iban,
+        }
+        engine: list[_EngineEntry] = []
+        for name, pattern in self.patterns.items():
+            # Prefilters only hold for the built-in regexes they were derived from
+            prefilter = DEFAULT_PREFILTERS.get(name)
+            if pattern is not DEFAULT_PATTERNS.get(name):
+                prefilter = None
+            engine.append((name, pattern, prefilter, validators.get(name)))
+        for name, dictionary in self.dictionaries.items():
+            engine.append((name, dictionary, None, None))
+        return engine
+
+    def _candidates(self, length: int, digits: int) -> list[_Candidate]:
+        candidates: list[_Candidate] = []
+        for name, pattern, pf, validator in self._engine:
+            if pf is None:
+                candidates.append((name, pattern.search, "", 0, validator))
+            elif length >= pf.min_length and digits >= pf.min_digits:
+                candidates.append(
+                    (name, pattern.search, pf.required, pf.min_required, validator)
+                )
+        return candidates
+
+    def _shape_candidates(self, text: str) -> list[_Candidate]:
+        shape = (min(len(text), self._max_length), min(_digit_count(text), self._max_digits))
+        candidates = self._by_shape.get(shape)
+        if candidates is None:
+            candidates = self._by_shape[shape] = self._candidates(*shape)
+        return candidates
+
+    def _hits(self, text: str) -> list[str]:
+        if self.stats is not None:
+            return self._hits_instrumented(text, self.stats)
+        hits: list[str] = []
+        for name, search, required, min_required, validator in self._shape_candidates(text):
+            if required and text.count(required) < min_required:
+                continue
+            if search(text) and (validator is None or validator(text)):
+                hits.append(name)
+        return hits
+
+    def _hits_instrumented(self, text: str, stats: Stats) -> list[str]:
+        # Same as _hits, timing each regex search and validator call
+        hits: list[str] = []
+        for name, search, required, min_required, validator in self._shape_candidates(text):
+            if required and text.count(required) < min_required:
+                continue
+            start = perf_counter()
+            matched = search(text) is not None
+            stats.add(f"regex.{name}", perf_counter() - start, tested=1, matched=int(matched))
+            if not matched:
+                continue
+            if validator is not None:
+                start = perf_counter()
+                valid = validator(text)
+                elapsed = perf_counter() - start
+                stats.add(f"validator.{name}", elapsed, calls=1, rejected=int(not valid))
+                if not valid:
+                    continue
+            hits.append(name)
+        return hits
+
+    def detect_cell(self, value: Any) -> list[str]:
+        text = "" if value is None else str(value)
+        return self._hits(text)
+
+    def _passes_luhn(self, text: str) -> bool:
+        return luhn_valid(text)
+
+    def _valid_ipv6(self, text: str) -> bool:
+        return ipv6_valid(text, self.patterns.get("ipv6", IPV6))
+
+    def _valid_iban(self, text: str) -> bool:
+        return iban_valid(text)
+
+
+def _digit_count(text: str) -> int:
+    if text.isascii():
+        return len(text) - len(text.encode().translate(None, b"0123456789"))
+    # \d also matches non-ASCII digits; don't prefilter on digits for such text
+    return len(text)
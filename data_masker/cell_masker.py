@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import partial
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from .cell_detector import CellDetector
+from .dictionaries import load_dictionaries
+from .keyed_tokens import DEFAULT_KEY_ENV, KeyedTokenizer
+from .pii_patterns import DEFAULT_PATTERNS
+from .token_store import TokenStore
+
+if TYPE_CHECKING:
+    from .rules import Rules
+    from .stats import Stats
+
+MASK_REPLACEMENT = "[REDACTED]"
+# Default per-column capacity of the mask_cell result cache (options.cache_size)
+DEFAULT_CACHE_SIZE = 10000
+
+
+@dataclass(frozen=True)
+class ColumnMask:
+    """How one column is masked, resolved from the rules once.
+
+    A column rule's *strategy* applies to every value without detection;
+    otherwise values are checked with *detector*, which is None for a column
+    the scan plan marked clean.
+    """
+
+    name: Any
+    strategy: str | None
+    detector: CellDetector | None
+
+    @property
+    def skip(self) -> bool:
+        return self.strategy is None and self.detector is None
+
+
+def _is_nan(value: Any) -> bool:
+    # NaN and NaT are unequal to themselves; pd.NA raises on bool() and is a singleton
+    try:
+        return bool(value != value)  # noqa: PLR0124
+    except (TypeError, ValueError):
+        return False
+
+
+class CellMasker:
+    """Masking one value or one list of strings at a time, in plain Python.
+
+    The stream engine masks CSV rows with it, so pandas and numpy are never
+    imported; ``Masker`` adds whole-column and DataFrame masking on top.
+    """
+
+    # Detector built for the rules and for each column of a scan plan
+    detector_class: type[CellDetector] = CellDetector
+
+    def __init__(
+        self,
+        rules: Rules,
+        token_store: TokenStore | None = None,
+        profile: dict[str, list[str]] | None = None,
+    ) -> None:
+        self.rules = rules
+        # Restrict detector patterns based on enabled detectors from rules
+        patterns = {k: v for k, v in DEFAULT_PATTERNS.items() if k in self.rules.enabled_detectors}
+        dictionaries = load_dictionaries(self.rules)
+        self.detector = self.detector_class(patterns, dictionaries=dictionaries)
+        # Column plan from a scan: a column mapped to [] is passed through untouched,
+        # one mapped to types is only checked for those; unlisted columns get everything.
+        self.profile = profile
+        self._column_detectors: dict[str, CellDetector | None] = {}
+        for col, types in (profile or {}).items():
+            enabled = {t: patterns[t] for t in types if t in patterns}
+            terms = {t: dictionaries[t] for t in types if t in dictionaries}
+            self._column_detectors[col] = (
+                self.detector_class(enabled, dictionaries=terms) if enabled or terms else None
+            )
+        self.tokens = token_store or TokenStore(
+            self.rules.options.get("token_store"), backend=self.rules.options.get("token_backend")
+        )
+        # Per-column LRU of raw value -> masked result; 0 disables caching
+        self.cache_size = int(self.rules.options.get("cache_size", DEFAULT_CACHE_SIZE))
+        self._cache: dict[str | None, OrderedDict[tuple[type, Any], Any]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.stats: Stats | None = None
+        # Strategy callables with their options bound, and the strategy per PII type
+        self._cell_strategies, self._batch_strategies = self._compile_strategies()
+        self._type_strategies = {t: str(s) for t, s in self.rules.strategies.items() if s}
+        self._default_strategy = str(self.rules.strategies.get("default", "redact"))
+        self._columns: dict[Any, ColumnMask] = {}
+
+    def instrument(self, stats: Stats) -> None:
+        """Record strategy, detector and token store timings into *stats*."""
+        self.stats = self.detector.stats = self.tokens.stats = stats
+        for detector in self._column_detectors.values():
+            if detector is not None:
+                detector.stats = stats
+
+    def _hash(self, text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _partial(self, text: str, keep_last: int) -> str:
+        if len(text) <= keep_last:
+            return "*" * len(text)
+        return "*" * (len(text) - keep_last) + text[-keep_last:]
+
+    def _compile_strategies(
+        self,
+    ) -> tuple[dict[str, Callable[[str], str]], dict[str, Callable[[list[str]], list[str]]]]:
+        # Per-value and batch callables per strategy name, options resolved here
+        keep = int(self.rules.options.get("partial_keep_last", 4))
+        sha256 = hashlib.sha256
+
+        def hash_batch(texts: list[str]) -> list[str]:
+            return [sha256(t.encode("utf-8")).hexdigest() for t in texts]
+
+        def tokenize(text: str) -> str:
+            # looked up per call: the token store may be swapped or wrapped later
+            return self.tokens.tokenize(text)
+
+        def tokenize_batch(texts: list[str]) -> list[str]:
+            run = self.tokens.tokenize
+            return [run(t) for t in texts]
+
+        cell: dict[str, Callable[[str], str]] = {
+            "redact": lambda _: MASK_REPLACEMENT,
+            "hash": self._hash,
+            "tokenize": tokenize,
+            "partial": partial(self._partial, keep_last=keep),
+            "null": lambda _: "",
+        }
+        batch: dict[str, Callable[[list[str]], list[str]]] = {
+            "redact": lambda texts: [MASK_REPLACEMENT] * len(texts),
+            "hash": hash_batch,
+            "tokenize": tokenize_batch,
+            "partial": lambda texts: [self._partial(t, keep) for t in texts],
+            "null": lambda texts: [""] * len(texts),
+        }
+        keyed = KeyedTokenizer.from_options(self.rules.options)
+        if keyed is not None:
+            cell["tokenize_keyed"] = lambda text: self._keyed(keyed, [text])[0]
+            batch["tokenize_keyed"] = lambda texts: self._keyed(keyed, texts)
+        elif "tokenize_keyed" in self._used_strategies():
+            raise ValueError(
+                "tokenize_keyed needs a key: set options.token_key or the "
+                f"{self.rules.options.get('token_key_env') or DEFAULT_KEY_ENV} "
+                "environment variable"
+            )
+        return cell, batch
+
+    def _keyed(self, keyed: KeyedTokenizer, texts: list[str]) -> list[str]:
+        tokens = keyed.tokenize_batch(texts)
+        if self.rules.options.get("keyed_token_store"):
+            # Kept only for reverse lookup; the tokens themselves need no store
+            self.tokens.update({f"keyed::{t}": tok for t, tok in zip(texts, tokens, strict=True)})
+        return tokens
+
+    def _used_strategies(self) -> set[str]:
+        used = {str(s) for s in self.rules.strategies.values()}
+        used.update(
+            str(rule["strategy"]) for rule in self.rules.columns.values() if "strategy" in rule
+        )
+        return used
+
+    def _apply_strategy(self, text: str, strategy: str) -> str:
+        # unknown strategies redact
+        run = self._cell_strategies.get(strategy) or self._cell_strategies["redact"]
+        if self.stats is None:
+            return run(text)
+        start = perf_counter()
+        result = run(text)
+        self.stats.add(f"strategy.{strategy}", perf_counter() - start, calls=1)
+        return result
+
+    def _apply_strategy_batch(self, texts: list[str], strategy: str) -> list[str]:
+        """Apply *strategy* to many values at once; same results as per value."""
+        run = self._batch_strategies.get(strategy) or self._batch_strategies["redact"]
+        if self.stats is None:
+            return run(texts)
+        start = perf_counter()
+        result = run(texts)
+        self.stats.add(f"strategy.{strategy}", perf_counter() - start, calls=len(texts))
+        return result
+
+    def column(self, column: Any = None) -> ColumnMask:
+        """The compiled masking of *column* (None for values outside any column)."""
+        try:
+            return self._columns[column]
+        except KeyError:
+            pass
+        strategy: str | None = None
+        detector: CellDetector | None = self.detector
+        if column:
+            col_rule = self.rules.columns.get(column) or {}
+            if "strategy" in col_rule:
+                strategy, detector = str(col_rule["strategy"]), None
+            else:
+                detector = self._column_detectors.get(column, self.detector)
+        plan = self._columns[column] = ColumnMask(column, strategy, detector)
+        return plan
+
+    def targets(self, column: Any) -> bool:
+        """Whether a column rule or the scan plan says *column* holds PII."""
+        plan = self.column(column)
+        return plan.strategy is not None or self._column_detectors.get(column) is not None
+
+    def compile(self, columns: Iterable[Any]) -> tuple[ColumnMask, ...]:
+        """Compiled masking for each of *columns*, by position."""
+        return tuple(self.column(col) for col in columns)
+
+    def cache_info(self) -> dict[str, float]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "size": sum(len(c) for c in self._cache.values()),
+        }
+
+    def mask_strings(self, values: list[str], column: str | None = None) -> list[str]:
+        """Mask a list of cell strings; same result as ``mask_cell`` on every value."""
+        distinct = list(dict.fromkeys(values))
+        plan = self.column(column)
+        if plan.strategy is not None:
+            results = self._apply_strategy_batch(distinct, plan.strategy)
+        else:
+            results, _ = self._mask_distinct(list(distinct), plan)
+        lookup = dict(zip(distinct, results, strict=True))
+        return [lookup[v] for v in values]
+
+    def _mask_distinct(self, values: list[Any], plan: ColumnMask) -> tuple[list[Any], bool]:
+        # Detect each distinct value (through the cache), then mask per strategy
+        cache: OrderedDict[tuple[type, Any], Any] | None = None
+        if self.cache_size > 0:
+            cache = self._cache.get(plan.name)
+            if cache is None:
+                cache = self._cache[plan.name] = OrderedDict()
+        results: list[Any] = list(values)
+        pending: dict[str, list[int]] = {}
+        changed = False
+        for i, value in enumerate(values):
+            key = (type(value), value)
+            if cache is not None and key in cache:
+                cache.move_to_end(key)
+                self.cache_hits += 1
+                results[i] = cache[key]
+                changed = changed or results[i] is not value
+                continue
+            if cache is not None:
+                self.cache_misses += 1
+            strategy = self._strategy_for(str(value), plan)
+            if strategy is None:
+                if cache is not None:
+                    cache[key] = value
+                continue
+            pending.setdefault(strategy, []).append(i)
+        for strategy, positions in pending.items():
+            masked = self._apply_strategy_batch([str(values[i]) for i in positions], strategy)
+            for i, result in zip(positions, masked, strict=True):
+                results[i] = result
+                if cache is not None:
+                    cache[(type(values[i]), values[i])] = result
+            changed = True
+        if cache is not None:
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return results, changed
+
+    def skips_column(self, column: str) -> bool:
+        """True when the plan marks *column* clean and no column rule applies."""
+        return self.column(column).skip
+
+    def mask_cell(self, value: Any, column: str | None = None) -> Any:
+        # Every NaN is a distinct key that would never hit, only evict
+        if value is None or self.cache_size <= 0 or _is_nan(value):
+            return self._mask_cell(value, column)
+        cache = self._cache.get(column)
+        if cache is None:
+            cache = self._cache[column] = OrderedDict()
+        # keyed on the type too so 1, 1.0 and True don't share an entry
+        key = (type(value), value)
+        try:
+            result = cache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable cell values are simply not cached
+            return self._mask_cell(value, column)
+        else:
+            cache.move_to_end(key)
+            self.cache_hits += 1
+            return result
+        self.cache_misses += 1
+        result = cache[key] = self._mask_cell(value, column)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return result
+
+    def _mask_cell(self, value: Any, column: str | None = None) -> Any:
+        if value is None:
+            return value
+        text = str(value)
+        strategy = self._strategy_for(text, self.column(column))
+        return value if strategy is None else self._apply_strategy(text, strategy)
+
+    def _strategy_for(self, text: str, plan: ColumnMask) -> str | None:
+        """The strategy to mask *text* with, or None to keep it."""
+        if plan.strategy is not None:
+            return plan.strategy
+        if plan.detector is None:
+            return None
+        hits = plan.detector.detect_cell(text)
+        if not hits:
+            # default strategy 'redact' shouldn't be applied to non-PII, so return original
+            return None
+        # choose strategy by first hit type-specific or default
+        for hit in hits:
+            strategy = self._type_strategies.get(hit)
+            if strategy:
+                return strategy
+        return self._default_strategy
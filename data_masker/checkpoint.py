@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import pandas as pd
+
+from .io_utils import CsvChunkWriter, NdjsonChunkWriter, TextChunkWriter
+from .masker import Masker
+from .pipeline import mask_chunks
+from .scan_cache import Block, block_frame, iter_blocks
+from .stats import Stats
+
+CHECKPOINT_VERSION = 1
+# Kinds whose chunks map to byte ranges, in the input and in the output
+CHECKPOINT_KINDS = ("csv", "ndjson")
+
+
+@dataclass
+class CheckpointedRun:
+    rows: int = 0
+    chunks: int = 0
+    # Chunks skipped because an earlier run had committed them
+    resumed_chunks: int = 0
+
+
+def _run_identity(  # noqa: PLR0913
+    input_path: str, output_path: str, kind: str, out_kind: str, chunksize: int, header: bytes
+) -> dict[str, Any]:
+    # A checkpoint only applies to the same input file, output and chunking
+    st = os.stat(input_path)
+    return {
+        "version": CHECKPOINT_VERSION,
+        "input": os.path.abspath(input_path),
+        "input_size": st.st_size,
+        "input_mtime_ns": st.st_mtime_ns,
+        "header": hashlib.sha256(header).hexdigest(),
+        "output": os.path.abspath(output_path),
+        "kind": kind,
+        "out_kind": out_kind,
+        "chunksize": chunksize,
+    }
+
+
+def load_checkpoint(path: str, identity: dict[str, Any]) -> dict[str, Any] | None:
+    """The progress recorded at *path*, or None when there is none yet.
+
+    Raises ValueError when the checkpoint belongs to a different run.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            state: dict[str, Any] = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        raise ValueError(f"Unreadable checkpoint {path}: {exc}") from exc
+    changed = [key for key, value in identity.items() if state.get(key) != value]
+    if changed:
+        raise ValueError(
+            f"Checkpoint {path} was written for a different run ({', '.join(changed)} "
+            "changed); delete it to start over"
+        )
+    return state
+
+
+def _save_checkpoint(path: str, state: dict[str, Any]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _store_size(path: str) -> int | None:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def mask_with_checkpoint(  # noqa: PLR0913
+    input_path: str,
+    output_path: str,
+    kind: str,
+    out_kind: str,
+    masker: Masker,
+    chunksize: int,
+    checkpoint_path: str,
+    workers: int = 1,
+    stats: Stats | None = None,
+) -> CheckpointedRun:
+    """Mask a CSV or JSON Lines file chunk by chunk, resumable after a crash.
+
+    After each chunk the output is fsynced, new token mappings are flushed,
+    and the chunk count, input and output byte offsets and token store size
+    are written to *checkpoint_path*. A later call with the same arguments
+    truncates the output to the last committed chunk and continues from that
+    chunk's input offset, so the final output matches an uninterrupted run.
+    """
+    result = CheckpointedRun()
+    tokens = masker.tokens
+    with open(input_path, "rb") as f:
+        header = b""
+        if kind == "csv":
+            first = next(iter_blocks(f, 0, 1, quoted=True), None)
+            header = first.data if first is not None else b""
+        identity = _run_identity(input_path, output_path, kind, out_kind, chunksize, header)
+        state = load_checkpoint(checkpoint_path, identity)
+        offset = len(header)
+        append = False
+        if state is not None:
+            stored = state["token_store"]["bytes"]
+            current = _store_size(tokens.path)
+            if stored is not None and (current is None or current < stored):
+                raise ValueError(
+                    f"Token store {tokens.path} is older than checkpoint {checkpoint_path}; "
+                    "tokens already written could change"
+                )
+            out_size = _store_size(output_path)
+            if out_size is None or out_size < state["output_offset"]:
+                raise ValueError(
+                    f"Output {output_path} is shorter than checkpoint {checkpoint_path} records"
+                )
+            # Bytes past the last committed chunk came from the interrupted chunk
+            os.truncate(output_path, state["output_offset"])
+            offset = state["input_offset"]
+            result.rows = state["rows"]
+            result.chunks = result.resumed_chunks = state["chunks"]
+            append = True
+        # Blocks are parsed lazily; mask_chunks may read ahead with --workers
+        pending: deque[tuple[Block, int]] = deque()
+
+        def frames() -> Iterator[pd.DataFrame]:
+            for block in iter_blocks(f, offset, chunksize, quoted=kind == "csv"):
+                frame = block_frame(block, header, kind, None)
+                pending.append((block, len(frame)))
+                yield frame
+
+        masked = (
+            mask_chunks(frames(), masker, workers)
+            if stats is None
+            else stats.track_chunks(frames(), lambda c: mask_chunks(c, masker, workers))
+        )
+        writer: TextChunkWriter = (
+            CsvChunkWriter(output_path, append)
+            if out_kind == "csv"
+            else NdjsonChunkWriter(output_path, append)
+        )
+        with writer:
+            for chunk in masked:
+                block, rows = pending.popleft()
+                writer.write(chunk)
+                tokens.flush()
+                result.rows += rows
+                result.chunks += 1
+                _save_checkpoint(
+                    checkpoint_path,
+                    {
+                        **identity,
+                        "chunks": result.chunks,
+                        "rows": result.rows,
+                        "input_offset": block.end,
+                        "output_offset": writer.commit(),
+                        "token_store": {"path": tokens.path, "bytes": _store_size(tokens.path)},
+                    },
+                )
+    return result
@@ -3,21 +3,49 @@ from __future__ import annotations
 import csv
 import json
 import os
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, TypeVar
 
 import click
 
-from .detectors import Detector
-from .io_utils import iter_csv_chunks, read_table, write_table
-from .masker import Masker
-from .pii_patterns import DEFAULT_PATTERNS
-from .rules import Rules
-from .token_store import TokenStore
+from .bench import DEFAULT_TOLERANCE
+
+# pandas, numpy and yaml are imported inside the commands that use them, so
+# `--help` and small runs don't pay their import time (see test_startup.py).
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .batch import FileResult
+    from .cell_masker import CellMasker
+    from .io_utils import CsvRange
+    from .sampling import SampleResult
+    from .scan_cache import CachedScan
+    from .stats import Stats
+
+    _M = TypeVar("_M", bound=CellMasker)
+
+# Rows per chunk when --workers is given without --chunksize
+DEFAULT_CHUNKSIZE = 10000
+# Files processed at once by scan-dir / mask-dir
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)
 
 
 @click.group()
-def main() -> None:
+@click.option(
+    "--cprofile",
+    "cprofile_path",
+    type=click.Path(),
+    help="Run the command under cProfile and write the stats to PATH (main process only)",
+)
+@click.pass_context
+def main(ctx: click.Context, cprofile_path: str | None) -> None:
     """Data Masker – Smart Data Redactor"""
-    pass
+    if cprofile_path:
+        from .stats import profiled
+
+        # Registered first so it runs after the profile has been dumped
+        ctx.call_on_close(lambda: _echo_profile(cprofile_path))
+        ctx.with_resource(profiled(cprofile_path))
 
 
 @main.command()
@@ -38,12 +66,61 @@ def main() -> None:
     type=click.Path(),
     help="Write per-column/type counts to CSV",
 )
+@click.option(
+    "--export-plan",
+    type=click.Path(),
+    help="Write a column plan (column -> detected types) for `mask --plan`",
+)
 @click.option(
     "--chunksize",
     type=int,
     default=0,
     help="Process CSV in row chunks to reduce memory usage",
 )
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    help="Process chunks in N worker processes (uses --chunksize, default 10000 rows)",
+)
+@click.option(
+    "--columns",
+    "columns_opt",
+    default=None,
+    help="Comma-separated columns to scan; others are never read (Parquet/Arrow/CSV)",
+)
+@click.option(
+    "--sample",
+    type=int,
+    default=0,
+    help="Fast mode: test at most N non-null values per column and stop early",
+)
+@click.option(
+    "--confidence",
+    type=float,
+    default=0.95,
+    show_default=True,
+    help="With --sample: probability of seeing any type at or above --min-rate",
+)
+@click.option(
+    "--min-rate",
+    type=float,
+    default=0.01,
+    show_default=True,
+    help="With --sample: smallest per-column hit rate that must not be missed",
+)
+@click.option("--stats", "show_stats", is_flag=True, help="Print timing and counter stats")
+@click.option(
+    "--stats-json",
+    type=click.Path(),
+    help="Write timing and counter stats (incl. per-chunk timings) to a JSON file",
+)
+@click.option(
+    "--cache",
+    "cache_dir",
+    type=click.Path(file_okay=False),
+    help="Reuse per-chunk results from earlier scans of this file (CSV/NDJSON)",
+)
 @click.option(
     "-r",
     "--rules",
@@ -52,45 +129,149 @@ def main() -> None:
     required=False,
     help="Rules YAML file (supports strategies, columns, options, and detectors toggles)",
 )
-def scan(  # noqa: PLR0913, PLR0912
+def scan(  # noqa: PLR0913, PLR0912, PLR0915
     input_path: str,
     as_json: bool,
     export_json: str | None,
     export_csv: str | None,
+    export_plan: str | None,
     chunksize: int,
+    workers: int,
+    columns_opt: str | None,
+    sample: int,
+    confidence: float,
+    min_rate: float,
+    show_stats: bool,
+    stats_json: str | None,
+    cache_dir: str | None,
     rules_path: str | None,
 ) -> None:
     """Scan a file and report PII presence per column."""
-    df, kind = read_table(input_path)
+    from .detectors import Detector
+    from .io_utils import (
+        STREAMING_KINDS,
+        detect_compression,
+        detect_kind,
+        iter_table_chunks,
+        read_table,
+    )
+    from .pipeline import scan_chunks
+    from .profile import build_profile
+    from .rules import Rules
+    from .sampling import DEFAULT_SAMPLE_CHUNKSIZE, sample_scan
+    from .scan_cache import CACHEABLE_KINDS, cached_scan
+    from .stats import Stats, stage
+
+    if sample and export_plan:
+        # A plan marks unhit columns clean, and mask --plan copies those through
+        raise click.BadParameter(
+            "cannot be combined with --sample: PII the sample missed would pass unmasked",
+            param_hint="--export-plan",
+        )
+    kind = detect_kind(input_path)
+    columns = [c.strip() for c in columns_opt.split(",") if c.strip()] if columns_opt else None
     rules = Rules.load(rules_path)
-    # Respect detector toggles in rules
-    patterns = {k: v for k, v in DEFAULT_PATTERNS.items() if k in rules.enabled_detectors}
-    det = Detector(patterns)
+    # Respect detector toggles and dictionaries in rules
+    det = Detector.from_rules(rules)
+    stats = Stats() if show_stats or stats_json else None
+    det.stats = stats
     results: dict[str, dict[str, int]] = {}
-    if chunksize and kind == "csv":
-        # Accumulate counts across chunks
+    sampled: SampleResult | None = None
+    cached: CachedScan | None = None
+    # Workbooks always stream: the whole-file reader only sees the first sheet
+    if (workers > 1 or kind == "xlsx") and not chunksize:
+        chunksize = DEFAULT_CHUNKSIZE
+    if cache_dir and (sample or kind not in CACHEABLE_KINDS or detect_compression(input_path)):
+        click.echo(
+            "--cache only applies to full uncompressed CSV/NDJSON scans; ignoring it", err=True
+        )
+        cache_dir = None
+    if cache_dir:
+        cached = cached_scan(
+            input_path, kind, rules, cache_dir, chunksize or DEFAULT_CHUNKSIZE, columns, workers
+        )
+        scanned = list(cached.counts)
+        results = {col: counts for col, counts in cached.counts.items() if counts}
+        click.echo(
+            f"Scan cache: reused {cached.reused_chunks} chunk(s) ({cached.reused_rows} rows), "
+            f"scanned {cached.scanned_chunks} ({cached.scanned_rows} rows)",
+            err=True,
+        )
+    elif sample:
+        step = chunksize or DEFAULT_SAMPLE_CHUNKSIZE
+        if kind in STREAMING_KINDS:
+            chunks: Iterable[pd.DataFrame] = iter_table_chunks(
+                input_path, step, kind=kind, columns=columns
+            )
+        else:
+            df, kind = read_table(input_path, columns=columns)
+            chunks = (df.iloc[i : i + step] for i in range(0, len(df), step))
+        try:
+            with stage(stats, "process"):
+                sampled = sample_scan(chunks, det, sample, confidence, min_rate)
+        except ValueError as exc:
+            raise click.BadParameter(str(exc)) from exc
+        if stats is not None:
+            stats.record_run(sampled.rows_read)
+        scanned = list(sampled.columns)
+        for col, state in sampled.columns.items():
+            if sum(state.counts.values()):
+                results[col] = {k: v for k, v in state.counts.items() if v}
+    elif chunksize and kind in STREAMING_KINDS:
+        # Accumulate counts across chunks; the file is only ever read chunk by chunk
         accum: dict[str, dict[str, int]] = {}
-        for chunk in iter_csv_chunks(input_path, chunksize=chunksize):
-            for col in chunk.columns:
-                counts = det.detect_series(chunk[col])
+        sources = _chunk_sources(input_path, kind, chunksize, workers, columns)
+        counted: Iterable[dict[str, dict[str, int]]] = (
+            scan_chunks(sources, rules, workers)
+            if stats is None
+            else stats.track_chunks(sources, lambda c: scan_chunks(c, rules, workers, stats))
+        )
+        for chunk_counts in counted:
+            for col, counts in chunk_counts.items():
                 if col not in accum:
-                    accum[col] = {t: 0 for t in patterns}
+                    accum[col] = {t: 0 for t in det.types}
                 for t, c in counts.items():
                     accum[col][t] = accum[col].get(t, 0) + c
+        scanned = list(accum)
         for col, counts in accum.items():
             total_hits = sum(counts.values())
             if total_hits:
                 results[col] = {k: v for k, v in counts.items() if v}
     else:
-        for col in df.columns:
-            counts = det.detect_series(df[col])
-            total_hits = sum(counts.values())
-            if total_hits:
-                results[col] = {k: v for k, v in counts.items() if v}
+        with stage(stats, "read"):
+            df, kind = read_table(input_path, columns=columns)
+        scanned = list(df.columns)
+        with stage(stats, "process"):
+            for col in df.columns:
+                counts = det.detect_series(df[col])
+                total_hits = sum(counts.values())
+                if total_hits:
+                    results[col] = {k: v for k, v in counts.items() if v}
+        if stats is not None:
+            stats.record_run(len(df))
     report: dict[str, object] = {"file": input_path, "columns": results}
+    if cached is not None:
+        report["cache"] = {
+            "reused_chunks": cached.reused_chunks,
+            "reused_rows": cached.reused_rows,
+            "scanned_chunks": cached.scanned_chunks,
+            "scanned_rows": cached.scanned_rows,
+        }
+    if sampled is not None:
+        report["sample"] = {
+            "rows_read": sampled.rows_read,
+            "complete": sampled.exhausted,
+            "columns": {
+                col: {"sampled": s.sampled, "settled": s.settled, "rates": s.rates()}
+                for col, s in sampled.columns.items()
+            },
+        }
     if export_json:
         with open(export_json, "w", encoding="utf-8") as f:
             json.dump(report, f, indent=2)
+    if export_plan:
+        with open(export_plan, "w", encoding="utf-8") as f:
+            json.dump(build_profile(input_path, results, scanned), f, indent=2)
     if export_csv and results:
         # Flatten to rows: column,type,count
         with open(export_csv, "w", newline="", encoding="utf-8") as f:
@@ -99,6 +280,8 @@ def scan(  # noqa: PLR0913, PLR0912
             for col, counts in results.items():
                 for t, c in counts.items():
                     writer.writerow([col, t, c])
+    if stats is not None:
+        _emit_stats(stats, show_stats, stats_json)
     if as_json:
         click.echo(json.dumps(report, indent=2))
     else:
@@ -107,6 +290,12 @@ def scan(  # noqa: PLR0913, PLR0912
             return
         click.echo(f"PII detected in {len(results.keys())} column(s):")
         for col, counts in results.items():
+            if sampled is not None:
+                state = sampled.columns[col]
+                rates = state.rates()
+                summary = ", ".join([f"{k}~{rates[k]:.1%}" for k in counts])
+                click.echo(f"- {col}: {summary} (sample of {state.sampled})")
+                continue
             summary = ", ".join([f"{k}={v}" for k, v in counts.items()])
             click.echo(f"- {col}: {summary}")
 
@@ -137,43 +326,584 @@ def scan(  # noqa: PLR0913, PLR0912
     help="Token store file path",
 )
 @click.option("--inplace", is_flag=True, help="Overwrite input file in place")
+@click.option(
+    "--plan",
+    "plan_path",
+    type=click.Path(exists=True),
+    required=False,
+    help="Column plan from `scan --export-plan`; clean columns are passed through",
+)
 @click.option(
     "--chunksize",
     type=int,
     default=0,
     help="Process CSV in row chunks to reduce memory usage",
 )
-def mask(  # noqa: PLR0913
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    help="Process chunks in N worker processes (uses --chunksize, default 10000 rows)",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["pandas", "stream"]),
+    default="pandas",
+    show_default=True,
+    help="'stream' masks CSV to CSV row by row with the csv module, keeping values as written",
+)
+@click.option(
+    "--checkpoint",
+    "checkpoint_path",
+    type=click.Path(dir_okay=False),
+    help="Record progress after each chunk here and resume from it after an interruption",
+)
+@click.option(
+    "--compression-level",
+    type=int,
+    help="Level for compressed output (.gz, .bz2, .xz, .zst); default depends on the format",
+)
+@click.option("--stats", "show_stats", is_flag=True, help="Print timing and counter stats")
+@click.option(
+    "--stats-json",
+    type=click.Path(),
+    help="Write timing and counter stats (incl. per-chunk timings) to a JSON file",
+)
+def mask(  # noqa: PLR0913, PLR0912, PLR0915
     input_path: str,
     output_path: str,
     rules_path: str | None,
     token_store_path: str | None,
     inplace: bool,
+    plan_path: str | None,
     chunksize: int,
+    workers: int,
+    engine: str,
+    checkpoint_path: str | None,
+    compression_level: int | None,
+    show_stats: bool,
+    stats_json: str | None,
 ) -> None:
     """Mask a file using rules or defaults and write to output."""
-    df, kind = read_table(input_path)
-    rules = Rules.load(rules_path)
-    if token_store_path:
-        rules.options["token_store"] = token_store_path
-    masker = Masker(rules, token_store=TokenStore(rules.options.get("token_store")))
-    # chunked CSV processing if requested
+    from .stats import Stats
+    from .streams import detect_compression, detect_kind, temp_path_for
+
+    kind = detect_kind(input_path)
     target = input_path if inplace else output_path
-    if chunksize and kind == "csv":
-        # Remove existing target if present
-        if os.path.exists(target):
-            os.remove(target)
-        header_written = False
-        for chunk in iter_csv_chunks(input_path, chunksize=chunksize):
-            for col in chunk.columns:
-                chunk[col] = chunk[col].map(lambda v, c=col: masker.mask_cell(v, c))
-            # append mode for subsequent chunks
-            chunk.to_csv(target, index=False, mode="a", header=not header_written)
-            header_written = True
+    stats = Stats() if show_stats or stats_json else None
+    if engine == "stream":
+        # Plain Python from here on: the stream engine never imports pandas or numpy
+        from .cell_masker import CellMasker
+        from .csv_stream import DEFAULT_BLOCK_ROWS, mask_csv_stream
+
+        if kind != "csv" or detect_kind(target) != "csv":
+            raise click.BadParameter(
+                "only CSV input and output are supported", param_hint="--engine"
+            )
+        if workers > 1:
+            raise click.BadParameter("cannot be combined with --workers", param_hint="--engine")
+        if checkpoint_path:
+            raise click.BadParameter("needs the pandas engine", param_hint="--checkpoint")
+        cell_masker = _build_masker(CellMasker, rules_path, token_store_path, plan_path, stats)
+        out_path = temp_path_for(target) if inplace else target
+        rows = mask_csv_stream(
+            input_path, out_path, cell_masker, chunksize or DEFAULT_BLOCK_ROWS, compression_level
+        )
+        if inplace:
+            os.replace(out_path, target)
+        cell_masker.tokens.close()
+        click.echo(f"Masked {rows} row(s) to {target} (stream engine)")
+        _echo_cache_info(cell_masker)
+        if stats is not None:
+            _emit_stats(stats, show_stats, stats_json, cell_masker)
+        return
+    from .checkpoint import CHECKPOINT_KINDS, mask_with_checkpoint
+    from .io_utils import STREAMING_KINDS, open_chunk_writer, read_table, write_table
+    from .masker import Masker
+    from .pipeline import mask_chunks
+    from .stats import stage
+
+    if checkpoint_path:
+        if kind not in CHECKPOINT_KINDS or _streaming_kind(target, kind) not in CHECKPOINT_KINDS:
+            raise click.BadParameter(
+                "only CSV and JSON Lines input and output can be resumed",
+                param_hint="--checkpoint",
+            )
+        if detect_compression(input_path) or detect_compression(target):
+            # Offsets in a compressed stream can't be seeked to or truncated at
+            raise click.BadParameter(
+                "compressed input or output can't be resumed", param_hint="--checkpoint"
+            )
+    masker = _build_masker(Masker, rules_path, token_store_path, plan_path, stats)
+    tokens = masker.tokens
+    # chunked CSV processing if requested
+    if (workers > 1 or checkpoint_path) and not chunksize:
+        chunksize = DEFAULT_CHUNKSIZE
+    # Workbook to workbook always streams, keeping every sheet
+    if kind == "xlsx" and target.lower().endswith(".xlsx") and not chunksize:
+        chunksize = DEFAULT_CHUNKSIZE
+    if checkpoint_path:
+        out_path = temp_path_for(target) if inplace else target
+        try:
+            run = mask_with_checkpoint(
+                input_path,
+                out_path,
+                kind,
+                _streaming_kind(target, kind),
+                masker,
+                chunksize,
+                checkpoint_path,
+                workers,
+                stats,
+            )
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        if inplace:
+            os.replace(out_path, target)
+        tokens.close()
+        # The run is complete; a new run starts from the beginning
+        os.remove(checkpoint_path)
+        resumed = f", resumed after {run.resumed_chunks} chunk(s)" if run.resumed_chunks else ""
+        click.echo(f"Masked data written to {target} (chunked {chunksize}{resumed})")
+        _echo_cache_info(masker)
+        if stats is not None:
+            _emit_stats(stats, show_stats, stats_json, masker)
+        return
+    if chunksize and kind in STREAMING_KINDS:
+        # In-place runs write next to the input and swap it in once reading is done
+        out_path = temp_path_for(target) if inplace else target
+        out_kind = _streaming_kind(target, kind)
+        # Only a workbook has room for every sheet; flat outputs get the first one
+        sources = _chunk_sources(
+            input_path, kind, chunksize, workers, first_sheet=out_kind != "xlsx"
+        )
+        masked = (
+            mask_chunks(sources, masker, workers)
+            if stats is None
+            else stats.track_chunks(sources, lambda c: mask_chunks(c, masker, workers))
+        )
+        with open_chunk_writer(out_path, out_kind, compression_level, masker.targets) as writer:
+            for chunk in masked:
+                try:
+                    writer.write(chunk)
+                except ValueError as exc:
+                    raise click.ClickException(str(exc)) from exc
+                # new token mappings are persisted once per chunk
+                tokens.flush()
+        if inplace:
+            os.replace(out_path, target)
+        tokens.close()
         click.echo(f"Masked data written to {target} (chunked {chunksize})")
+        _echo_cache_info(masker)
+        if stats is not None:
+            _emit_stats(stats, show_stats, stats_json, masker)
         return
     # non-chunked path
-    for col in df.columns:
-        df[col] = df[col].map(lambda v, c=col: masker.mask_cell(v, c))
-    write_table(df, target, kind)
+    with stage(stats, "read"):
+        df, kind = read_table(input_path)
+    with stage(stats, "process"):
+        masker.mask_frame(df)
+    with stage(stats, "write"):
+        write_table(df, target, kind, compression_level)
+        tokens.close()
     click.echo(f"Masked data written to {target}")
+    _echo_cache_info(masker)
+    if stats is not None:
+        stats.record_run(len(df))
+        _emit_stats(stats, show_stats, stats_json, masker)
+
+
+@main.command("scan-dir")
+@click.argument("source", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--pattern",
+    default="*",
+    show_default=True,
+    help="Only files whose name matches this glob (e.g. '*.csv')",
+)
+@click.option("--recursive", is_flag=True, help="Include files in subdirectories")
+@click.option(
+    "--jobs",
+    type=int,
+    default=DEFAULT_JOBS,
+    show_default=True,
+    help="Files processed concurrently",
+)
+@click.option(
+    "--chunksize",
+    type=int,
+    default=0,
+    help="Stream CSV/NDJSON/Parquet/Arrow files in row chunks",
+)
+@click.option(
+    "-r",
+    "--rules",
+    "rules_path",
+    type=click.Path(exists=True),
+    required=False,
+    help="Rules YAML file",
+)
+@click.option("--as-json", "as_json", is_flag=True, help="Output JSON report to stdout")
+@click.option("--export-json", type=click.Path(), help="Write the aggregated report to a JSON file")
+def scan_dir(  # noqa: PLR0913
+    source: str,
+    pattern: str,
+    recursive: bool,
+    jobs: int,
+    chunksize: int,
+    rules_path: str | None,
+    as_json: bool,
+    export_json: str | None,
+) -> None:
+    """Scan every supported file in a directory and write one aggregated report."""
+    from .batch import find_files, scan_files, summarize
+    from .rules import Rules
+
+    rules = Rules.load(rules_path)
+    paths = find_files(source, pattern, recursive)
+    results = list(scan_files(paths, rules, jobs, chunksize))
+    report = summarize(results)
+    if export_json:
+        with open(export_json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+    else:
+        flagged = [r for r in results if r.error is None and r.columns]
+        click.echo(f"Scanned {len(paths)} file(s); PII detected in {len(flagged)}:")
+        for r in flagged:
+            summary = ", ".join(
+                f"{col} ({', '.join(f'{k}={v}' for k, v in counts.items())})"
+                for col, counts in r.columns.items()
+            )
+            click.echo(f"- {r.path}: {summary}")
+    _exit_on_errors(results)
+
+
+@main.command("mask-dir")
+@click.argument("source", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--pattern",
+    default="*",
+    show_default=True,
+    help="Only files whose name matches this glob (e.g. '*.csv')",
+)
+@click.option("--recursive", is_flag=True, help="Include files in subdirectories")
+@click.option(
+    "--jobs",
+    type=int,
+    default=DEFAULT_JOBS,
+    show_default=True,
+    help="Files processed concurrently",
+)
+@click.option(
+    "--chunksize",
+    type=int,
+    default=0,
+    help="Stream CSV/NDJSON/Parquet/Arrow files in row chunks",
+)
+@click.option(
+    "-r",
+    "--rules",
+    "rules_path",
+    type=click.Path(exists=True),
+    required=False,
+    help="Rules YAML file",
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    required=True,
+    help="Directory for masked files (keeps the relative paths)",
+)
+@click.option(
+    "--token-store",
+    "token_store_path",
+    type=click.Path(),
+    required=False,
+    help="Token store file path (shared by every file in the batch)",
+)
+def mask_dir(  # noqa: PLR0913
+    source: str,
+    pattern: str,
+    recursive: bool,
+    jobs: int,
+    chunksize: int,
+    rules_path: str | None,
+    output_dir: str,
+    token_store_path: str | None,
+) -> None:
+    """Mask every supported file in a directory with one shared token store."""
+    from .batch import find_files, mask_files
+    from .rules import Rules
+    from .token_store import TokenStore
+
+    rules = Rules.load(rules_path)
+    if token_store_path:
+        rules.options["token_store"] = token_store_path
+    tokens = TokenStore(
+        rules.options.get("token_store"), backend=rules.options.get("token_backend")
+    )
+    paths = find_files(source, pattern, recursive)
+    results: list[FileResult] = []
+    for r in mask_files(paths, source, output_dir, rules, tokens, jobs, chunksize):
+        results.append(r)
+        if r.error is None:
+            click.echo(f"Masked {r.path} ({r.rows} rows)")
+    tokens.close()
+    done = sum(r.error is None for r in results)
+    click.echo(f"Masked {done} of {len(paths)} file(s) into {output_dir}")
+    _exit_on_errors(results)
+
+
+def _exit_on_errors(results: list[FileResult]) -> None:
+    failed = [r for r in results if r.error is not None]
+    for r in failed:
+        click.echo(f"Failed: {r.path}: {r.error}", err=True)
+    if failed:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to listen on")
+@click.option("--port", type=int, default=8765, show_default=True, help="TCP port (0 picks one)")
+@click.option(
+    "--unix-socket",
+    type=click.Path(),
+    help="Listen on a Unix socket instead of TCP",
+)
+@click.option(
+    "-r",
+    "--rules",
+    "rules_path",
+    type=click.Path(exists=True),
+    required=False,
+    help="Default rules YAML file",
+)
+@click.option(
+    "--rules-dir",
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory of rules files requests may pick with ?rules=name (off by default)",
+)
+@click.option(
+    "--token-store",
+    "token_store_path",
+    type=click.Path(),
+    required=False,
+    help="Token store file path",
+)
+@click.option(
+    "--flush-interval",
+    type=float,
+    default=5.0,
+    show_default=True,
+    help="Seconds between durable token store flushes",
+)
+@click.option(
+    "--max-pending",
+    type=int,
+    default=64,
+    show_default=True,
+    help="Queued requests before new ones are refused with 503",
+)
+def serve(  # noqa: PLR0913
+    host: str,
+    port: int,
+    unix_socket: str | None,
+    rules_path: str | None,
+    rules_dir: str | None,
+    token_store_path: str | None,
+    flush_interval: float,
+    max_pending: int,
+) -> None:
+    """Run a local HTTP service with /mask, /scan and /metrics, keeping rules and tokens warm."""
+    import asyncio
+
+    from .server import MaskingService
+
+    service = MaskingService(
+        rules_path,
+        token_store_path,
+        flush_interval=flush_interval,
+        max_pending=max_pending,
+        rules_dir=rules_dir,
+    )
+
+    def ready(address: str) -> None:
+        click.echo(f"Serving on {address} (Ctrl+C to stop)", err=True)
+
+    try:
+        asyncio.run(service.serve(host, port, unix_socket, ready=ready))
+    except KeyboardInterrupt:
+        # serve() flushed and closed the token store while unwinding
+        click.echo("Stopped", err=True)
+
+
+@main.command("migrate-tokens")
+@click.argument("source", type=click.Path(exists=True))
+@click.argument("target", type=click.Path())
+@click.option(
+    "--backend",
+    type=click.Choice(["json", "log", "sqlite"]),
+    default=None,
+    help="Target backend (default: inferred from the target suffix)",
+)
+def migrate_tokens(source: str, target: str, backend: str | None) -> None:
+    """Copy token mappings from one token store file into another."""
+    from .token_store import migrate
+
+    count = migrate(source, target, backend=backend)
+    click.echo(f"Migrated {count} token(s) to {target}")
+
+
+@main.command()
+@click.option("--rows", type=int, default=20000, show_default=True, help="Rows to generate")
+@click.option("--width", type=int, default=12, show_default=True, help="Columns to generate")
+@click.option(
+    "--density",
+    type=float,
+    default=0.5,
+    show_default=True,
+    help="Share of cells in PII columns that hold PII",
+)
+@click.option("--seed", type=int, default=0, show_default=True, help="Random seed")
+@click.option("--repeat", type=int, default=3, show_default=True, help="Best-of repetitions")
+@click.option(
+    "--chunksize",
+    type=int,
+    default=5000,
+    show_default=True,
+    help="Chunk size for the chunked end-to-end runs",
+)
+@click.option("-o", "--output", "output_path", type=click.Path(), help="Write results JSON")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True),
+    help="Compare against a previous results JSON and fail on regressions",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=DEFAULT_TOLERANCE,
+    show_default=True,
+    help="Allowed rows/sec drop versus the baseline",
+)
+def bench(  # noqa: PLR0913
+    rows: int,
+    width: int,
+    density: float,
+    seed: int,
+    repeat: int,
+    chunksize: int,
+    output_path: str | None,
+    baseline: str | None,
+    tolerance: float,
+) -> None:
+    """Benchmark detection, masking and token store throughput on synthetic data."""
+    from .bench import compare, load_report, run_benchmarks
+
+    report = run_benchmarks(rows, width, density, seed, repeat, chunksize)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    for name, r in report["results"].items():
+        click.echo(f"{name:28s} {r['rows_per_sec']:>12,.0f} rows/s {r['mb_per_sec']:>9.2f} MB/s")
+    if baseline:
+        regressions = compare(report, load_report(baseline), tolerance)
+        if regressions:
+            click.echo("Regressions against baseline:")
+            for line in regressions:
+                click.echo(f"- {line}")
+            raise SystemExit(1)
+        click.echo("No regressions against baseline.")
+
+
+def _chunk_sources(  # noqa: PLR0913
+    path: str,
+    kind: str,
+    chunksize: int,
+    workers: int,
+    columns: list[str] | None = None,
+    first_sheet: bool = False,
+) -> Iterable[pd.DataFrame | CsvRange]:
+    from .io_utils import detect_compression, iter_csv_ranges, iter_table_chunks, iter_xlsx_chunks
+
+    # Parallel CSV runs send workers byte ranges to parse rather than parsed chunks
+    if kind == "csv" and workers > 1 and not detect_compression(path):
+        return iter_csv_ranges(path, chunksize, columns)
+    if kind == "xlsx" and first_sheet:
+        return iter_xlsx_chunks(path, chunksize, columns, first_sheet=True)
+    return iter_table_chunks(path, chunksize=chunksize, kind=kind, columns=columns)
+
+
+def _build_masker(
+    masker_class: type[_M],
+    rules_path: str | None,
+    token_store_path: str | None,
+    plan_path: str | None,
+    stats: Stats | None,
+) -> _M:
+    from .profile import load_profile
+    from .rules import Rules
+    from .token_store import TokenStore
+
+    rules = Rules.load(rules_path)
+    if token_store_path:
+        rules.options["token_store"] = token_store_path
+    tokens = TokenStore(
+        rules.options.get("token_store"), backend=rules.options.get("token_backend")
+    )
+    try:
+        profile = load_profile(plan_path) if plan_path else None
+    except (OSError, ValueError) as exc:
+        raise click.BadParameter(str(exc), param_hint="--plan") from exc
+    try:
+        masker = masker_class(rules, token_store=tokens, profile=profile)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+    if stats is not None:
+        masker.instrument(stats)
+    return masker
+
+
+def _streaming_kind(path: str, fallback: str) -> str:
+    from .io_utils import STREAMING_KINDS, detect_kind
+
+    # Chunked output follows the target suffix when it is streamable, else the input kind
+    try:
+        kind = detect_kind(path)
+    except ValueError:
+        return fallback
+    return kind if kind in STREAMING_KINDS else fallback
+
+
+def _emit_stats(
+    stats: Stats, show: bool, json_path: str | None, masker: CellMasker | None = None
+) -> None:
+    # Stats go to stderr so they never mix with --as-json output
+    if masker is not None:
+        stats.add("cache", hits=masker.cache_hits, misses=masker.cache_misses)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(), f, indent=2)
+    if show:
+        for line in stats.report():
+            click.echo(line, err=True)
+
+
+def _echo_profile(path: str) -> None:
+    from .stats import profile_summary
+
+    click.echo(f"Profile written to {path}; top functions by cumulative time:", err=True)
+    for line in profile_summary(path):
+        click.echo(line, err=True)
+
+
+def _echo_cache_info(masker: CellMasker) -> None:
+    info = masker.cache_info()
+    if info["hits"] or info["misses"]:
+        click.echo(
+            f"Cache: {info['hits']} hits, {info['misses']} misses "
+            f"({info['hit_rate']:.1%} hit rate)"
+        )
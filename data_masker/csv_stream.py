@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import csv
+from collections.abc import Iterator
+from itertools import islice
+from time import perf_counter
+
+from .cell_masker import CellMasker
+from .streams import open_text_input, open_text_output
+
+# Rows read, masked and written per block; new tokens are flushed once per block
+DEFAULT_BLOCK_ROWS = 10000
+
+
+def column_plan(masker: CellMasker, header: list[str]) -> list[tuple[int, str]]:
+    """(index, name) of the columns *masker* may change; clean plan columns are left out."""
+    return [(i, plan.name) for i, plan in enumerate(masker.compile(header)) if not plan.skip]
+
+
+def _blocks(reader: Iterator[list[str]], rows: int) -> Iterator[list[list[str]]]:
+    while block := list(islice(reader, rows)):
+        yield block
+
+
+def mask_csv_stream(
+    input_path: str,
+    output_path: str,
+    masker: CellMasker,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    level: int | None = None,
+) -> int:
+    """Mask a CSV file into *output_path* row by row without pandas; returns the row count.
+
+    Each column of a block is masked with ``CellMasker.mask_strings`` on the strings
+    read from the file, so unmasked values (leading zeros, ids next to empty
+    cells) are written back unchanged. Empty cells stay empty. Memory is
+    bounded by *block_rows*. Compressed input and output (.gz, .bz2, .xz,
+    .zst) are streamed, the output at compression *level*.
+    """
+    stats = masker.stats
+    rows = 0
+    with (
+        open_text_input(input_path) as src,
+        open_text_output(output_path, "w", level) as dst,
+    ):
+        reader = csv.reader(src)
+        # Same line endings as the pandas writer
+        writer = csv.writer(dst, lineterminator="\n")
+        header = next(reader, None)
+        if header is None:
+            return 0
+        writer.writerow(header)
+        plan = column_plan(masker, header)
+        blocks = _blocks(reader, max(1, block_rows))
+        while True:
+            start = perf_counter()
+            block = next(blocks, None)
+            if block is None:
+                break
+            read = perf_counter()
+            for i, col in plan:
+                # Short rows and empty cells are left as they are
+                cells = [(row, row[i]) for row in block if i < len(row) and row[i]]
+                masked = masker.mask_strings([text for _, text in cells], col)
+                for (row, _), text in zip(cells, masked, strict=True):
+                    row[i] = text
+            processed = perf_counter()
+            writer.writerows(block)
+            masker.tokens.flush()
+            rows += len(block)
+            if stats is not None:
+                written = perf_counter()
+                stats.add("read", read - start)
+                stats.add("process", processed - read)
+                stats.add("write", written - processed)
+                stats.record_chunk(len(block), read - start, processed - read, written - processed)
+    return rows
@@ -1,97 +1,125 @@
-import ipaddress
-import re
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
 from re import Pattern
-from typing import Any
+from time import perf_counter
 
+import numpy as np
 import pandas as pd
 
-from .pii_patterns import DEFAULT_PATTERNS
+from .cell_detector import CellDetector, _digit_count
+from .dictionaries import TermDictionary
+from .pii_patterns import IPV6
+from .validators import iban_valid_batch, ipv6_valid_batch, luhn_valid_batch
 
+# Validator over a list of regex candidates, returning a boolean mask
+_BatchValidator = Callable[[Sequence[str]], np.ndarray]
 
-class Detector:
-    def __init__(self, patterns: dict[str, Pattern[str]] | None = None) -> None:
-        self.patterns = patterns or DEFAULT_PATTERNS
 
-    def detect_cell(self, value: Any) -> list[str]:
-        text = "" if value is None else str(value)
-        hits: list[str] = []
-        for name, pattern in self.patterns.items():
-            if pattern.search(text):
-                if name == "credit_card" and not self._passes_luhn(text):
-                    continue
-                if name == "ipv6" and not self._valid_ipv6(text):
-                    continue
-                if name == "iban" and not self._valid_iban(text):
-                    continue
-                hits.append(name)
-        return hits
+class Detector(CellDetector):
+    def __init__(
+        self,
+        patterns: dict[str, Pattern[str]] | None = None,
+        vectorized: bool = True,
+        dictionaries: dict[str, TermDictionary] | None = None,
+    ) -> None:
+        super().__init__(patterns, dictionaries)
+        # Column-at-a-time detection in detect_series; False keeps the per-cell loop
+        self.vectorized = vectorized
+        self._batch_validators: dict[str, _BatchValidator] = {
+            "credit_card": luhn_valid_batch,
+            "ipv6": self._valid_ipv6_batch,
+            "iban": iban_valid_batch,
+        }
 
     def detect_series(self, series: pd.Series) -> dict[str, int]:
+        if self.vectorized:
+            return self._detect_series_vectorized(series)
         # simple score: count cells with hits by type
-        counts: dict[str, int] = {k: 0 for k in self.patterns}
+        counts: dict[str, int] = {k: 0 for k in self.types}
         values: list[str] = ["" if pd.isna(x) else str(x) for x in series]
         for val in values:
-            for name, pattern in self.patterns.items():
-                if pattern.search(val):
-                    if name == "credit_card" and not self._passes_luhn(val):
-                        continue
-                    if name == "ipv6" and not self._valid_ipv6(val):
-                        continue
-                    if name == "iban" and not self._valid_iban(val):
-                        continue
-                    counts[name] += 1
+            for name in self._hits(val):
+                counts[name] += 1
         return counts
 
-    def _passes_luhn(self, text: str) -> bool:
-        # strip non-digits
-        digits = [int(ch) for ch in text if ch.isdigit()]
-        MIN_CC_DIGITS = 13
-        if len(digits) < MIN_CC_DIGITS:
-            return False
-        # Luhn algorithm
-        checksum = 0
-        parity = (len(digits) - 2) % 2
-        for i, d in enumerate(digits[:-1]):
-            if i % 2 == parity:
-                d2 = d * 2
-                LUHN_SUBTRACT = 9
-                if d2 > LUHN_SUBTRACT:
-                    d2 -= LUHN_SUBTRACT
-                checksum += d2
-            else:
-                checksum += d
-        check_digit = digits[-1]
-        return (checksum + check_digit) % 10 == 0
+    def detect_frame(self, df: pd.DataFrame) -> dict[str, dict[str, int]]:
+        return {col: self.detect_series(df[col]) for col in df.columns}
+
+    def _detect_series_vectorized(self, series: pd.Series) -> dict[str, int]:
+        # Each pattern runs once over the column's distinct values; hits are weighted
+        # by how often each value occurs, so repeated values cost nothing extra.
+        counts: dict[str, int] = {k: 0 for k in self.types}
+        codes, uniques = pd.factorize(as_text(series))
+        if not len(uniques):
+            return counts
+        weights = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        values = pd.Series(uniques, dtype="string[python]")
+        texts: list[str] = values.tolist()
+        lengths = values.str.len().to_numpy()
+        digits = np.fromiter((_digit_count(t) for t in texts), dtype=np.int64, count=len(texts))
+        required: dict[str, np.ndarray] = {}
+        for name, pattern, pf, validator in self._engine:
+            mask = np.ones(len(texts), dtype=bool)
+            if pf is not None:
+                mask &= (lengths >= pf.min_length) & (digits >= pf.min_digits)
+                if pf.required:
+                    if pf.required not in required:
+                        required[pf.required] = np.fromiter(
+                            (t.count(pf.required) for t in texts), dtype=np.int64, count=len(texts)
+                        )
+                    mask &= required[pf.required] >= pf.min_required
+            candidates = values[mask]
+            if candidates.empty:
+                continue
+            start = perf_counter()
+            matched = candidates[_contains(candidates, pattern)]
+            if self.stats is not None:
+                self.stats.add(
+                    f"regex.{name}",
+                    perf_counter() - start,
+                    tested=len(candidates),
+                    matched=len(matched),
+                )
+            if validator is not None and not matched.empty:
+                start = perf_counter()
+                batch = self._batch_validators.get(name)
+                if batch is not None:
+                    valid = batch(matched.tolist())
+                else:
+                    valid = matched.map(validator).to_numpy(bool)
+                if self.stats is not None:
+                    self.stats.add(
+                        f"validator.{name}",
+                        perf_counter() - start,
+                        calls=len(matched),
+                        rejected=int((~valid).sum()),
+                    )
+                matched = matched[valid]
+            counts[name] = int(weights[matched.index.to_numpy()].sum())
+        return counts
+
+    def _valid_ipv6_batch(self, texts: Sequence[str]) -> np.ndarray:
+        return ipv6_valid_batch(texts, self.patterns.get("ipv6", IPV6))
+
 
-    def _valid_ipv6(self, text: str) -> bool:
-        try:
-            # ipaddress will parse strict valid IPv6 tokens; split common separators to try tokens
-            for token in text.replace(',', ' ').split():
-                ipaddress.IPv6Address(token)
-                return True
-            return False
-        except Exception:
-            return False
+def _contains(values: pd.Series, pattern: Pattern[str] | TermDictionary) -> np.ndarray:
+    if isinstance(pattern, TermDictionary):
+        search = pattern.search
+        return np.fromiter(
+            (search(t) is not None for t in values.tolist()), dtype=bool, count=len(values)
+        )
+    return values.str.contains(pattern, na=False).to_numpy(bool)
 
-    def _valid_iban(self, text: str) -> bool:
-        # Extract uppercase alphanumerics only, simple tokenization by whitespace
-        for token in re.findall(r"[A-Z]{2}[0-9]{2}[A-Z0-9]{10,30}", text.upper()):
-            if self._iban_mod97(token):
-                return True
-        return False
 
-    def _iban_mod97(self, iban: str) -> bool:
-        # Move first 4 chars to end
-        rearranged = (iban[4:] + iban[:4]).upper()
-        # Replace letters with numbers A=10 ... Z=35
-        digits: list[str] = []
-        for ch in rearranged:
-            if ch.isdigit():
-                digits.append(ch)
-            else:
-                digits.append(str(ord(ch) - 55))
-        # Compute mod 97 iteratively to avoid big ints
-        remainder = 0
-        for ch in ''.join(digits):
-            remainder = (remainder * 10 + int(ch)) % 97
-        return remainder == 1
+def as_text(series: pd.Series) -> pd.Series:
+    """Return *series* as a string-typed column with missing values kept as NA."""
+    if isinstance(series.dtype, pd.StringDtype) and series.dtype.storage == "python":
+        return series
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_string_dtype(series):
+        # astype gives the same text as str() for numbers, bools and strings
+        return series.astype("string[python]")
+    # Datetimes, mixed objects and the rest: stringify like the per-cell path does
+    # (astype would turn a datetime64 midnight into "2020-01-01", str() keeps the time)
+    text = series.map(str, na_action="ignore")
+    return text.where(series.notna()).astype("string[python]")
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from itertools import chain
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .rules import Rules
+
+DICTIONARY_CACHE_VERSION = 2
+# Term files are hashed in blocks of this many bytes for the cache key
+_HASH_BLOCK = 1 << 20
+
+# Dictionaries loaded by this process, by file stats and options
+_loaded: dict[str, TermDictionary] = {}
+
+
+class TermDictionary:
+    """Aho-Corasick automaton over a list of terms.
+
+    ``search`` walks the text once, so its cost grows with the text length and
+    not with the number of terms. With *whole_words* a term only matches when
+    it is not part of a longer word (no letter or digit right before or after).
+    """
+
+    def __init__(
+        self, terms: Iterable[str], case_sensitive: bool = False, whole_words: bool = True
+    ) -> None:
+        self.case_sensitive = case_sensitive
+        self.whole_words = whole_words
+        # Cache key of the term files; set by load_dictionary
+        self.key = ""
+        # State 0 is the root; depth[s] is the term length when s ends a term, else 0
+        goto: list[dict[str, int]] = [{}]
+        depth: list[int] = [0]
+        self.terms = 0
+        for term in terms:
+            text = term if case_sensitive else term.lower()
+            if not text:
+                continue
+            state = 0
+            for ch in text:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = goto[state][ch] = len(goto)
+                    goto.append({})
+                    depth.append(0)
+                state = nxt
+            if not depth[state]:
+                self.terms += 1
+            depth[state] = len(text)
+        # Failure links (longest proper suffix that is also a prefix) and output
+        # links (nearest state on the failure chain that ends a term), built in
+        # breadth-first order so a state's links are known before its children's.
+        fail = [0] * len(goto)
+        output = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                output[nxt] = fail[nxt] if depth[fail[nxt]] else output[fail[nxt]]
+        self._goto = goto
+        self._depth = depth
+        self._fail = fail
+        self._output = output
+
+    def __len__(self) -> int:
+        return self.terms
+
+    def to_state(self) -> dict[str, Any]:
+        """The built automaton as plain JSON-serializable data."""
+        return {
+            "key": self.key,
+            "case_sensitive": self.case_sensitive,
+            "whole_words": self.whole_words,
+            "terms": self.terms,
+            "goto": self._goto,
+            "depth": self._depth,
+            "fail": self._fail,
+            "output": self._output,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> TermDictionary:
+        """Rebuild a dictionary from ``to_state`` data; ValueError if it is malformed."""
+        goto, depth, fail, output = (state[k] for k in ("goto", "depth", "fail", "output"))
+        size = len(goto)
+        # Every link must name a state, so a damaged cache can't send search astray
+        if (
+            not size
+            or not all(isinstance(t, list) and len(t) == size for t in (depth, fail, output))
+            or not all(isinstance(edges, dict) for edges in goto)
+            or not _links_ok(list(chain.from_iterable(map(dict.values, goto))), size)
+            or not _links_ok(fail, size)
+            or not _links_ok(output, size)
+            or {type(d) for d in depth} != {int}
+        ):
+            raise ValueError("Inconsistent dictionary automaton")
+        dictionary = cls((), bool(state["case_sensitive"]), bool(state["whole_words"]))
+        dictionary.key = str(state["key"])
+        dictionary.terms = int(state["terms"])
+        dictionary._goto, dictionary._depth = goto, depth
+        dictionary._fail, dictionary._output = fail, output
+        return dictionary
+
+    def search(self, text: str) -> tuple[int, int] | None:
+        """(start, end) of the first term found in *text*, or None."""
+        if not self.case_sensitive:
+            text = text.lower()
+        goto, depth, fail, output = self._goto, self._depth, self._fail, self._output
+        whole = self.whole_words
+        size = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = state if depth[state] else output[state]
+            while hit:
+                end = i + 1
+                start = end - depth[hit]
+                if not whole or (
+                    (start == 0 or not text[start - 1].isalnum())
+                    and (end == size or not text[end].isalnum())
+                ):
+                    return start, end
+                hit = output[hit]
+        return None
+
+
+def _links_ok(links: list[Any], size: int) -> bool:
+    # All ints naming an existing state; checked with C-speed builtins
+    if not links:
+        return True
+    return {type(s) for s in links} == {int} and min(links) >= 0 and max(links) < size
+
+
+def read_terms(paths: Iterable[str]) -> Iterator[str]:
+    """Terms from text files, one per line; blank lines and ``#`` comments are skipped."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                term = line.strip()
+                if term and not term.startswith("#"):
+                    yield term
+
+
+def dictionary_key(spec: dict[str, Any]) -> str:
+    """Hash of the term files' contents and the matching options."""
+    digest = hashlib.sha256()
+    options = {
+        "version": DICTIONARY_CACHE_VERSION,
+        "case_sensitive": spec["case_sensitive"],
+        "whole_words": spec["whole_words"],
+    }
+    digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    for path in spec["files"]:
+        with open(path, "rb") as f:
+            while block := f.read(_HASH_BLOCK):
+                digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _read_cache(cache_file: str, key: str) -> TermDictionary | None:
+    # Plain JSON only: a cache file is data, never code to run on load
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            cached = TermDictionary.from_state(json.load(f))
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+    return cached if cached.key == key else None
+
+
+def load_dictionary(spec: dict[str, Any], cache_dir: str | None) -> TermDictionary:
+    """Build the automaton for *spec*, or load it from *cache_dir* if built before."""
+    key = dictionary_key(spec)
+    cache_file = os.path.join(cache_dir, f"{key[:32]}.json") if cache_dir else None
+    if cache_file:
+        cached = _read_cache(cache_file, key)
+        if cached is not None:
+            return cached
+    dictionary = TermDictionary(
+        read_terms(spec["files"]), spec["case_sensitive"], spec["whole_words"]
+    )
+    dictionary.key = key
+    if cache_file and cache_dir:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = cache_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dictionary.to_state(), f, separators=(",", ":"))
+            os.replace(tmp, cache_file)
+        except OSError:
+            # A read-only cache location only costs a rebuild next time
+            pass
+    return dictionary
+
+
+def load_dictionaries(rules: Rules) -> dict[str, TermDictionary]:
+    """The enabled dictionaries of *rules*, loaded once per process."""
+    cache_dir = rules.options.get("dictionary_cache")
+    loaded: dict[str, TermDictionary] = {}
+    for name, spec in rules.dictionaries.items():
+        if name not in rules.enabled_detectors:
+            continue
+        stamp = json.dumps(
+            [spec, [(os.path.getsize(p), os.path.getmtime(p)) for p in spec["files"]]],
+            sort_keys=True,
+        )
+        dictionary = _loaded.get(stamp)
+        if dictionary is None:
+            dictionary = _loaded[stamp] = load_dictionary(spec, cache_dir)
+        loaded[name] = dictionary
+    return loaded
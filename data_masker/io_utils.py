@@ -1,35 +1,508 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+import abc
+import io
+import mmap
+import os
+from collections.abc import Callable, Container, Iterator
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+from typing import Any
 
+import numpy as np
 import pandas as pd
 
-SUPPORTED = (".csv", ".json", ".xlsx")
+from .streams import (
+    COMPRESSIBLE_KINDS,
+    detect_compression,
+    detect_kind,
+    open_input,
+    open_text_output,
+    strip_compression,
+)
 
+SUPPORTED = (".csv", ".json", ".jsonl", ".ndjson", ".xlsx", ".parquet", ".feather", ".arrow")
+# Kinds that can be read and written chunk by chunk without loading the whole file
+STREAMING_KINDS = ("csv", "ndjson", "parquet", "feather", "xlsx")
+# Columnar kinds backed by the optional pyarrow dependency
+ARROW_KINDS = ("parquet", "feather")
+# Bytes of a CSV scanned at a time when counting records for byte ranges
+_RECORD_WINDOW_BYTES = 1 << 22
 
-def read_table(path: str) -> tuple[pd.DataFrame, str]:
-    lower = path.lower()
-    if lower.endswith(".csv"):
-        return pd.read_csv(path), "csv"  # type: ignore[call-overload]
-    if lower.endswith(".json"):
-        return pd.read_json(path, orient="records"), "json"  # type: ignore[call-overload]
-    if lower.endswith(".xlsx"):
-        return pd.read_excel(path), "xlsx"  # type: ignore[call-overload]
-    raise ValueError(f"Unsupported file type for {path}")
 
+def _pyarrow() -> Any:
+    try:
+        import pyarrow  # noqa: PLC0415
+    except ImportError as exc:
+        raise ImportError(
+            "Parquet/Arrow support requires pyarrow: pip install 'data-masker[arrow]'"
+        ) from exc
+    return pyarrow
 
-def iter_csv_chunks(path: str, chunksize: int = 10000) -> Iterator[pd.DataFrame]:
+
+def _source(path: str) -> AbstractContextManager[Any]:
+    # Compressed files are read through open_input; plain ones by path
+    return open_input(path) if detect_compression(path) else nullcontext(path)
+
+
+def read_table(path: str, columns: list[str] | None = None) -> tuple[pd.DataFrame, str]:
+    kind = detect_kind(path)
+    if kind in COMPRESSIBLE_KINDS:
+        with _source(path) as src:
+            if kind == "csv":
+                return pd.read_csv(src, usecols=columns), kind  # type: ignore[call-overload]
+            if kind == "ndjson":
+                df = pd.read_json(src, orient="records", lines=True)
+            else:
+                df = pd.read_json(src, orient="records")  # type: ignore[call-overload]
+        return (df[columns] if columns else df), kind
+    if kind in ARROW_KINDS:
+        _pyarrow()
+        if kind == "parquet":
+            return pd.read_parquet(path, columns=columns), kind
+        return pd.read_feather(path, columns=columns), kind
+    df = pd.read_excel(path, usecols=columns)  # type: ignore[call-overload]
+    return (df[columns] if columns else df), kind
+
+
+def iter_csv_chunks(
+    path: str, chunksize: int = 10000, columns: list[str] | None = None
+) -> Iterator[pd.DataFrame]:
     """Yield DataFrame chunks for a CSV to support streaming."""
-    yield from pd.read_csv(path, chunksize=chunksize)  # type: ignore[call-overload]
+    with _source(path) as src:
+        yield from pd.read_csv(src, chunksize=chunksize, usecols=columns)  # type: ignore[call-overload]
+
+
+def iter_ndjson_chunks(
+    path: str, chunksize: int = 10000, columns: list[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks for a JSON Lines / NDJSON file."""
+    with (
+        _source(path) as src,
+        pd.read_json(src, orient="records", lines=True, chunksize=chunksize) as reader,
+    ):
+        for chunk in reader:
+            yield chunk[columns] if columns else chunk
+
+
+def iter_arrow_batches(
+    path: str, chunksize: int = 10000, columns: list[str] | None = None, kind: str | None = None
+) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames from Parquet row groups or Arrow IPC record batches.
+
+    Only the requested *columns* are read from disk, and nothing is parsed as text.
+    """
+    pa = _pyarrow()
+    kind = kind or detect_kind(path)
+    if kind == "parquet":
+        import pyarrow.parquet as pq  # noqa: PLC0415
+
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_record_batch(i)
+            if columns:
+                batch = batch.select(columns)
+            # IPC batches can be arbitrarily large; zero-copy slice them to chunksize
+            for offset in range(0, batch.num_rows, chunksize):
+                yield batch.slice(offset, chunksize).to_pandas()
+
+
+def iter_xlsx_chunks(
+    path: str,
+    chunksize: int = 10000,
+    columns: list[str] | None = None,
+    first_sheet: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks from every sheet of a workbook, sheet by sheet.
+
+    The workbook is opened read-only, so rows are parsed as they are iterated.
+    Each chunk's ``attrs["sheet"]`` names its sheet; a sheet without rows
+    yields one empty chunk so it is still written out. With *first_sheet*
+    only the first sheet is read, as ``pd.read_excel`` does.
+    """
+    from openpyxl import load_workbook  # noqa: PLC0415
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheets = workbook.worksheets[:1] if first_sheet else workbook.worksheets
+        for sheet in sheets:
+            rows = sheet.iter_rows(values_only=True)
+            first = next(rows, None)
+            header = [
+                f"Unnamed: {i}" if name is None else str(name)
+                for i, name in enumerate(first or ())
+            ]
+            width = len(header)
+            block: list[tuple[Any, ...]] = []
+            emitted = False
+            for row in rows:
+                if all(v is None for v in row):
+                    continue
+                block.append(tuple(row[:width]) + (None,) * (width - len(row)))
+                if len(block) >= chunksize:
+                    yield _sheet_frame(block, header, sheet.title, columns)
+                    block, emitted = [], True
+            if block or not emitted:
+                yield _sheet_frame(block, header, sheet.title, columns)
+    finally:
+        workbook.close()
+
+
+def _sheet_frame(
+    rows: list[tuple[Any, ...]], header: list[str], sheet: str, columns: list[str] | None
+) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=header)
+    if columns:
+        df = df[[c for c in columns if c in df.columns]]
+    df.attrs["sheet"] = sheet
+    return df
+
+
+def iter_table_chunks(
+    path: str, chunksize: int = 10000, kind: str | None = None, columns: list[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    """Stream any STREAMING_KINDS file in row chunks; memory is bounded by *chunksize*."""
+    kind = kind or detect_kind(path)
+    if kind == "csv":
+        return iter_csv_chunks(path, chunksize=chunksize, columns=columns)
+    if kind == "ndjson":
+        return iter_ndjson_chunks(path, chunksize=chunksize, columns=columns)
+    if kind in ARROW_KINDS:
+        return iter_arrow_batches(path, chunksize=chunksize, columns=columns, kind=kind)
+    if kind == "xlsx":
+        return iter_xlsx_chunks(path, chunksize=chunksize, columns=columns)
+    raise ValueError(f"Streaming is not supported for {kind} files: {path}")
 
 
-def write_table(df: pd.DataFrame, path: str, kind: str | None = None) -> None:
-    lower = path.lower()
-    if lower.endswith(".csv") or kind == "csv":
+@dataclass(frozen=True)
+class CsvRange:
+    """Record-aligned byte range of a CSV file.
+
+    Only the path and offsets travel to a worker process, which maps the file
+    and parses its own slice.
+    """
+
+    path: str
+    header: bytes
+    start: int
+    end: int
+    columns: tuple[str, ...] | None = None
+
+    def read(self) -> pd.DataFrame:
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[self.start : self.end]
+        usecols = list(self.columns) if self.columns else None
+        return pd.read_csv(io.BytesIO(self.header + data), usecols=usecols)  # type: ignore[call-overload]
+
+
+def _record_end(mm: mmap.mmap, start: int, target: int) -> int:
+    # First record boundary at or after *target*, given one at *start*: a newline
+    # ends a record only when the quotes seen since *start* are balanced.
+    quotes = mm[start:target].count(b'"')
+    pos = target
+    while True:
+        newline = mm.find(b"\n", pos)
+        if newline < 0:
+            return len(mm)
+        quotes += mm[pos : newline + 1].count(b'"')
+        if quotes % 2 == 0:
+            return newline + 1
+        pos = newline + 1
+
+
+def _record_ends(mm: mmap.mmap, start: int) -> Iterator[np.ndarray]:
+    # Offsets just past each record after *start*, one array per window. A
+    # newline ends a record when the quotes since *start* are balanced; blank
+    # lines are left out, as pd.read_csv skips them.
+    in_quotes = 0
+    prev = start
+    for lo in range(start, len(mm), _RECORD_WINDOW_BYTES):
+        window = np.frombuffer(mm[lo : lo + _RECORD_WINDOW_BYTES], dtype=np.uint8)
+        quotes = np.cumsum(window == ord('"'))
+        newlines = np.flatnonzero(window == ord("\n"))
+        ends = newlines[(quotes[newlines] + in_quotes) % 2 == 0] + lo + 1
+        in_quotes = int(quotes[-1] + in_quotes) % 2
+        lengths = np.diff(ends, prepend=prev)
+        keep = lengths > 2  # noqa: PLR2004
+        for i in np.flatnonzero(lengths == 2):  # noqa: PLR2004
+            keep[i] = mm[ends[i] - 2] != ord("\r")
+        if len(ends):
+            prev = int(ends[-1])
+        yield ends[keep]
+
+
+def iter_csv_ranges(
+    path: str, chunksize: int = 10000, columns: list[str] | None = None
+) -> Iterator[CsvRange]:
+    """Split a CSV into ranges of exactly *chunksize* records without parsing it.
+
+    The file is memory-mapped and only newlines and quote characters are
+    counted, so a newline inside a quoted field never splits a record. The
+    ranges hold the same rows as ``pd.read_csv(chunksize=...)`` chunks, so
+    column types come out the same as in a serial run.
+    """
+    if not os.path.getsize(path):
+        return
+    chunksize = max(1, chunksize)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header_end = _record_end(mm, 0, 0)
+        header = mm[:header_end]
+        selected = tuple(columns) if columns else None
+        pos, count = header_end, 0
+        for window in _record_ends(mm, header_end):
+            ends = window
+            while count + len(ends) >= chunksize:
+                end = int(ends[chunksize - count - 1])
+                yield CsvRange(path, header, pos, end, selected)
+                ends = ends[chunksize - count :]
+                pos, count = end, 0
+            count += len(ends)
+        # A last record without a newline, or records short of a full chunk
+        if pos < len(mm) and (count or mm[pos:].strip()):
+            yield CsvRange(path, header, pos, len(mm), selected)
+
+
+def load_chunk(chunk: pd.DataFrame | CsvRange) -> pd.DataFrame:
+    """A chunk from iter_table_chunks or iter_csv_ranges as a DataFrame."""
+    return chunk.read() if isinstance(chunk, CsvRange) else chunk
+
+
+def arrow_safe(df: pd.DataFrame, text_columns: Container[Any] = ()) -> pd.DataFrame:
+    """Stringify object columns that mix types, e.g. ints next to masked strings.
+
+    Columns in *text_columns* are stringified whatever their dtype.
+    """
+    out = df
+    for col in df.columns:
+        if (col in text_columns or df[col].dtype == object) and pd.api.types.infer_dtype(
+            df[col], skipna=True
+        ) not in ("string", "empty", "bytes"):
+            if out is df:
+                out = df.copy()
+            out[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return out
+
+
+def write_table(
+    df: pd.DataFrame, path: str, kind: str | None = None, level: int | None = None
+) -> None:
+    """Write *df* to *path*; a .gz/.bz2/.xz/.zst suffix compresses it at *level*."""
+    base, compression = strip_compression(path)
+    lower = base.lower()
+    if compression:
+        kind = detect_kind(path)
+        with open_text_output(path, "w", level) as f:
+            if kind == "csv":
+                df.to_csv(f, index=False)
+            else:
+                df.to_json(f, orient="records", lines=kind == "ndjson", force_ascii=False)
+    elif lower.endswith(".csv") or kind == "csv":
         df.to_csv(path, index=False)
+    elif lower.endswith((".jsonl", ".ndjson")) or kind == "ndjson":
+        df.to_json(path, orient="records", lines=True, force_ascii=False)
     elif lower.endswith(".json") or kind == "json":
         df.to_json(path, orient="records", lines=False)  # type: ignore[call-overload]
     elif lower.endswith(".xlsx") or kind == "xlsx":
         df.to_excel(path, index=False)  # type: ignore[call-overload]
+    elif lower.endswith(".parquet") or kind == "parquet":
+        _pyarrow()
+        arrow_safe(df).to_parquet(path, index=False)
+    elif lower.endswith((".feather", ".arrow")) or kind == "feather":
+        _pyarrow()
+        arrow_safe(df).to_feather(path)
     else:
         raise ValueError(f"Unsupported file type for {path}")
+
+
+class ChunkWriter(abc.ABC):
+    """Append DataFrame chunks to one output file kept open for the whole run."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        self._write(df)
+        self.rows += len(df)
+
+    @abc.abstractmethod
+    def _write(self, df: pd.DataFrame) -> None: ...
+
+    @abc.abstractmethod
+    def close(self) -> None: ...
+
+    def __enter__(self) -> ChunkWriter:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class TextChunkWriter(ChunkWriter):
+    """Chunks appended to one text stream, compressed when the path says so."""
+
+    def __init__(self, path: str, append: bool = False, level: int | None = None) -> None:
+        super().__init__(path)
+        self._f = open_text_output(path, "a" if append else "w", level)
+
+    def commit(self) -> int:
+        """Make everything written so far durable; returns the file's byte size."""
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return os.fstat(self._f.fileno()).st_size
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class CsvChunkWriter(TextChunkWriter):
+    def __init__(self, path: str, append: bool = False, level: int | None = None) -> None:
+        super().__init__(path, append, level)
+        # Appending continues a file that already has its header
+        self._header_written = append
+
+    def _write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self._f, index=False, header=not self._header_written)
+        self._header_written = True
+
+
+class NdjsonChunkWriter(TextChunkWriter):
+    def _write(self, df: pd.DataFrame) -> None:
+        if len(df):
+            df.to_json(self._f, orient="records", lines=True, force_ascii=False)
+
+
+class XlsxChunkWriter(ChunkWriter):
+    """Stream chunks into a write-only workbook, one sheet per ``attrs["sheet"]``.
+
+    Rows go to temporary files as they are appended, so memory does not grow
+    with the workbook. A chunk without a sheet name continues the current sheet.
+    """
+
+    def __init__(self, path: str) -> None:
+        from openpyxl import Workbook  # noqa: PLC0415
+
+        super().__init__(path)
+        self._workbook = Workbook(write_only=True)
+        self._sheet: Any = None
+        self._title: str | None = None
+
+    def _write(self, df: pd.DataFrame) -> None:
+        title = df.attrs.get("sheet") or self._title or "Sheet1"
+        if self._sheet is None or title != self._title:
+            self._sheet = self._workbook.create_sheet(title=title)
+            self._title = title
+            if len(df.columns):
+                self._sheet.append([str(c) for c in df.columns])
+        values = df.to_numpy(dtype=object)
+        missing = pd.isna(values)
+        values[missing] = None
+        for row in values.tolist():
+            self._sheet.append(row)
+
+    def close(self) -> None:
+        if self._sheet is None:
+            self._workbook.create_sheet(title="Sheet1")
+        self._workbook.save(self.path)
+
+
+class ArrowChunkWriter(ChunkWriter):
+    """Write each chunk as a Parquet row group or an Arrow IPC record batch.
+
+    The schema is fixed by the first chunk. Columns for which *masked* is true
+    (those a column rule or scan plan targets) are written as nullable strings
+    from the start, since any later chunk may mask a value in them; other
+    columns keep their first chunk's type, and a typed column that has a value
+    masked in a later chunk raises ValueError.
+    """
+
+    def __init__(
+        self, path: str, kind: str, masked: Callable[[Any], bool] | None = None
+    ) -> None:
+        super().__init__(path)
+        self.kind = kind
+        self._pa = _pyarrow()
+        self._masked = masked
+        self._text: set[Any] = set()
+        self._writer: Any = None
+        self._schema: Any = None
+
+    def _open(self, table: Any) -> None:
+        pa = self._pa
+        # All-null first chunks would pin a column to the null type; use string instead
+        fields = [
+            pa.field(f.name, pa.string())
+            if f.name in self._text or pa.types.is_null(f.type)
+            else f
+            for f in table.schema
+        ]
+        self._schema = pa.schema(fields, metadata=table.schema.metadata)
+        if self.kind == "parquet":
+            import pyarrow.parquet as pq  # noqa: PLC0415
+
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(self.path, self._schema)
+
+    def _conform(self, table: Any) -> Any:
+        pa = self._pa
+        columns = []
+        for field in self._schema:
+            column = table.column(field.name)
+            if column.type != field.type:
+                try:
+                    column = column.cast(field.type)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+                    raise ValueError(
+                        f"Column {field.name!r} changed type from {field.type} to "
+                        f"{column.type} between chunks, e.g. because a value in it was "
+                        "masked; give it a column strategy or pass a scan --plan that "
+                        "flags it, so it is written as text"
+                    ) from exc
+            columns.append(column)
+        return pa.Table.from_arrays(columns, schema=self._schema)
+
+    def _write(self, df: pd.DataFrame) -> None:
+        if self._writer is None and self._masked is not None:
+            self._text = {c for c in df.columns if self._masked(c)}
+        table = self._pa.Table.from_pandas(arrow_safe(df, self._text), preserve_index=False)
+        if self._writer is None:
+            self._open(table)
+        table = self._conform(table)
+        if self.kind == "parquet":
+            self._writer.write_table(table)
+        else:
+            for batch in table.to_batches():
+                self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_chunk_writer(
+    path: str,
+    kind: str | None = None,
+    level: int | None = None,
+    masked: Callable[[Any], bool] | None = None,
+) -> ChunkWriter:
+    """Chunk writer for *kind*; *level* is the compression level of .gz/.bz2/.xz/.zst text.
+
+    *masked* tells typed (Parquet/Arrow) writers which columns the rules or plan
+    target, so they get a string type before the first masked value shows up.
+    """
+    kind = kind or detect_kind(path)
+    if kind == "csv":
+        return CsvChunkWriter(path, level=level)
+    if kind == "ndjson":
+        return NdjsonChunkWriter(path, level=level)
+    if kind in ARROW_KINDS:
+        return ArrowChunkWriter(path, kind, masked)
+    if kind == "xlsx":
+        return XlsxChunkWriter(path)
+    raise ValueError(f"Streaming output is not supported for {kind} files: {path}")
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Mapping
+from typing import Any
+
+# Environment variable holding the key when options.token_key is not set
+DEFAULT_KEY_ENV = "DATA_MASKER_TOKEN_KEY"
+TOKEN_PREFIX = "TOK-"
+# Hex characters per token: 64 bits, so collisions stay unlikely into the billions
+DEFAULT_TOKEN_LENGTH = 16
+MIN_TOKEN_LENGTH = 8
+MAX_TOKEN_LENGTH = 128
+TOKEN_FORMATS = ("hex", "preserve")
+# BLAKE2b takes keys of at most this many bytes; longer keys are hashed down
+_MAX_KEY_BYTES = 64
+_BLOCK_BYTES = 64
+_LOWER = "abcdefghijklmnopqrstuvwxyz"
+_UPPER = _LOWER.upper()
+
+
+class KeyedTokenizer:
+    """Deterministic tokens from a secret key, with no mapping to store.
+
+    Tokens are keyed BLAKE2b digests, so the same key and value give the same
+    token in any process or on any host, and they can't be brute-forced back
+    to short values (SSNs, card numbers) without the key. ``hex`` tokens are
+    ``TOK-`` plus *length* hex characters. ``preserve`` tokens keep the
+    value's shape: each digit becomes a digit, each letter a letter of the same
+    case, and every other character (dashes, spaces, ``@``) is kept.
+    """
+
+    def __init__(
+        self, key: bytes, token_format: str = "hex", length: int = DEFAULT_TOKEN_LENGTH
+    ) -> None:
+        if not key:
+            raise ValueError("tokenize_keyed needs a non-empty key")
+        if token_format not in TOKEN_FORMATS:
+            raise ValueError(
+                f"Unknown token_format {token_format!r}; use one of {', '.join(TOKEN_FORMATS)}"
+            )
+        if not MIN_TOKEN_LENGTH <= length <= MAX_TOKEN_LENGTH:
+            raise ValueError(
+                f"token_length must be between {MIN_TOKEN_LENGTH} and {MAX_TOKEN_LENGTH}"
+            )
+        if len(key) > _MAX_KEY_BYTES:
+            key = hashlib.blake2b(key).digest()
+        self.format = token_format
+        self.length = length
+        self._key = key
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> KeyedTokenizer | None:
+        """Tokenizer for rules *options*, or None when no key is configured.
+
+        The key is ``options.token_key`` or else the environment variable named
+        by ``options.token_key_env`` (default ``DATA_MASKER_TOKEN_KEY``).
+        """
+        key = options.get("token_key") or os.environ.get(
+            str(options.get("token_key_env") or DEFAULT_KEY_ENV)
+        )
+        if not key:
+            return None
+        return cls(
+            str(key).encode("utf-8"),
+            str(options.get("token_format", "hex")),
+            int(options.get("token_length", DEFAULT_TOKEN_LENGTH)),
+        )
+
+    def _stream(self, data: bytes, size: int) -> bytes:
+        # Keyed digest bytes, extended block by block for long values
+        blocks = []
+        for counter in range(-(-size // _BLOCK_BYTES)):
+            blocks.append(
+                hashlib.blake2b(
+                    data, key=self._key, salt=counter.to_bytes(16, "big"), person=b"dm-preserve"
+                ).digest()
+            )
+        return b"".join(blocks)
+
+    def tokenize(self, value: str) -> str:
+        data = value.encode("utf-8")
+        if self.format == "hex":
+            digest = hashlib.blake2b(
+                data, key=self._key, digest_size=-(-self.length // 2), person=b"dm-token"
+            ).hexdigest()
+            return TOKEN_PREFIX + digest[: self.length]
+        stream = self._stream(data, len(value))
+        out = []
+        for ch, byte in zip(value, stream, strict=False):
+            if ch.isdigit() and ch.isascii():
+                out.append(str(byte % 10))
+            elif ch in _LOWER:
+                out.append(_LOWER[byte % 26])
+            elif ch in _UPPER:
+                out.append(_UPPER[byte % 26])
+            else:
+                out.append(ch)
+        return "".join(out)
+
+    def tokenize_batch(self, values: list[str]) -> list[str]:
+        tokenize = self.tokenize
+        return [tokenize(v) for v in values]
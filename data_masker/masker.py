@@ -1,64 +1,108 @@
 from __future__ import annotations
 
-import hashlib
+from collections.abc import Callable
+from functools import partial
 from typing import Any
 
+import numpy as np
+import pandas as pd
+
+from .cell_masker import DEFAULT_CACHE_SIZE, MASK_REPLACEMENT, CellMasker, ColumnMask
 from .detectors import Detector
-from .pii_patterns import DEFAULT_PATTERNS
-from .rules import Rules
-from .token_store import TokenStore
-
-MASK_REPLACEMENT = "[REDACTED]"
-
-class Masker:
-    def __init__(self, rules: Rules, token_store: TokenStore | None = None) -> None:
-        self.rules = rules
-        # Restrict detector patterns based on enabled detectors from rules
-        patterns = {k: v for k, v in DEFAULT_PATTERNS.items() if k in self.rules.enabled_detectors}
-        self.detector = Detector(patterns)
-        token_path = self.rules.options.get("token_store") or ".tokens.json"
-        self.tokens = token_store or TokenStore(token_path)
-
-    def _hash(self, text: str) -> str:
-        return hashlib.sha256(text.encode("utf-8")).hexdigest()
-
-    def _partial(self, text: str, keep_last: int) -> str:
-        if len(text) <= keep_last:
-            return "*" * len(text)
-        return "*" * (len(text) - keep_last) + text[-keep_last:]
-
-    def _apply_strategy(self, text: str, strategy: str) -> str:
-        if strategy == "redact":
-            return MASK_REPLACEMENT
-        if strategy == "hash":
-            return self._hash(text)
-        if strategy == "tokenize":
-            return self.tokens.tokenize(text)
-        if strategy == "partial":
-            keep = int(self.rules.options.get("partial_keep_last", 4))
-            return self._partial(text, keep)
-        if strategy == "null":
-            return ""
-        # fallback
-        return MASK_REPLACEMENT
-
-    def mask_cell(self, value: Any, column: str | None = None) -> Any:
-        if value is None:
-            return value
-        text = str(value)
-        # column-specific rule
-        col_rule = (self.rules.columns.get(column or "") or {}) if column else {}
-        if "strategy" in col_rule:
-            return self._apply_strategy(text, col_rule["strategy"])
-        # detect PII types and pick a strategy
-        hits = self.detector.detect_cell(text)
-        if not hits:
-            # default strategy 'redact' shouldn't be applied to non-PII, so return original
-            return value
-        # choose strategy by first hit type-specific or default
-        for hit in hits:
-            strategy = self.rules.strategies.get(hit)
-            if strategy:
-                return self._apply_strategy(text, strategy)
-        strategy = self.rules.strategies.get("default", "redact")
-        return self._apply_strategy(text, strategy)
+
+__all__ = ["DEFAULT_CACHE_SIZE", "MASK_REPLACEMENT", "ColumnMask", "Masker"]
+
+
+def _factorize(series: pd.Series, raw: np.ndarray) -> tuple[np.ndarray, list[Any]]:
+    """Codes and distinct values of *series*, -1 for missing values.
+
+    Object columns are split by type too: 1, 1.0 and True hash equal, and
+    pd.factorize alone would give them one code and one masked result.
+    """
+    codes, uniques = pd.factorize(series)
+    values: list[Any] = uniques.tolist()
+    if series.dtype != object or not values:
+        return codes, values
+    type_codes, types = pd.factorize(pd.Series([type(v) for v in raw], dtype=object))
+    if len(types) < 2:  # noqa: PLR2004
+        return codes, values
+    present = codes >= 0
+    keys = codes[present].astype(np.int64) * len(types) + type_codes[present]
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    split = np.full(len(codes), -1, dtype=np.intp)
+    split[present] = inverse
+    return split, raw[np.flatnonzero(present)[first]].tolist()
+
+
+def _partial_batch(texts: list[str], keep: int) -> list[str]:
+    # Vectorized "partial": stars for all but the last *keep* characters
+    values = pd.Series(texts, dtype=object)
+    lengths = values.str.len().to_numpy()
+    short = lengths <= keep
+    stars = pd.Series("*", index=values.index, dtype=object).str.repeat(
+        np.where(short, lengths, lengths - keep).tolist()
+    )
+    tails = values.str[-keep:].where(~short, "") if keep else values
+    return (stars + tails).tolist()
+
+
+class Masker(CellMasker):
+    """``CellMasker`` plus masking of whole columns and DataFrames with pandas."""
+
+    detector_class = Detector
+
+    def _compile_strategies(
+        self,
+    ) -> tuple[dict[str, Callable[[str], str]], dict[str, Callable[[list[str]], list[str]]]]:
+        cell, batch = super()._compile_strategies()
+        keep = int(self.rules.options.get("partial_keep_last", 4))
+        batch["partial"] = partial(_partial_batch, keep=keep)
+        return cell, batch
+
+    def mask_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Mask every column of *df* in place and return it."""
+        for col, plan in zip(df.columns, self.compile(df.columns), strict=True):
+            if not plan.skip:
+                df[col] = self._mask_series(df[col], plan)
+        return df
+
+    def mask_column(self, series: pd.Series, column: str | None = None) -> pd.Series:
+        """Mask a whole column; same result as ``mask_cell`` on every value.
+
+        Each distinct value is detected once, and the values needing the same
+        strategy are masked in one batch. Columns with a ``strategy`` rule skip
+        detection and are masked as a single batch.
+        """
+        return self._mask_series(series, self.column(column))
+
+    def _mask_series(self, series: pd.Series, plan: ColumnMask) -> pd.Series:
+        column = plan.name
+        raw = series.to_numpy(dtype=object)
+        try:
+            codes, values = _factorize(series, raw)
+        except TypeError:
+            # unhashable cells (lists, dicts) from JSON input
+            return series.map(lambda v: self.mask_cell(v, column))
+        if plan.strategy is not None:
+            results = self._apply_strategy_batch([str(v) for v in values], plan.strategy)
+            changed = bool(results)
+        else:
+            results, changed = self._mask_distinct(values, plan)
+        out = raw.copy()
+        present = codes >= 0
+        if changed:
+            masked = np.empty(len(results), dtype=object)
+            for pos, result in enumerate(results):
+                masked[pos] = result
+            out[present] = masked[codes[present]]
+        # Missing values keep mask_cell's handling (None passes, NaN is "nan")
+        na_results: dict[type, Any] = {}
+        for i in np.flatnonzero(~present):
+            value = raw[i]
+            if type(value) not in na_results:
+                na_results[type(value)] = self.mask_cell(value, column)
+            out[i] = na_results[type(value)]
+            changed = changed or out[i] is not value
+        if not changed:
+            return series
+        return pd.Series(out, index=series.index, name=series.name).infer_objects()
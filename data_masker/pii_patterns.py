@@ -1,4 +1,5 @@
 import re
+from dataclasses import dataclass
 
 EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
 PHONE = re.compile(r"\b(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}\b")
@@ -22,3 +23,26 @@ DEFAULT_PATTERNS = {
     "ipv6": IPV6,
     "iban": IBAN,
 }
+
+
+@dataclass(frozen=True)
+class Prefilter:
+    """Cheap necessary conditions a text must meet before its regex can match."""
+
+    min_length: int = 0
+    min_digits: int = 0
+    required: str = ""
+    min_required: int = 1
+
+
+# Derived from the minimum shape of each pattern above; a text failing its
+# prefilter can never match, so the regex search is skipped entirely.
+DEFAULT_PREFILTERS = {
+    "email": Prefilter(min_length=6, required="@"),
+    "phone": Prefilter(min_length=7, min_digits=7),
+    "credit_card": Prefilter(min_length=13, min_digits=13),
+    "ssn": Prefilter(min_length=9, min_digits=9),
+    "ipv4": Prefilter(min_length=7, min_digits=4, required=".", min_required=3),
+    "ipv6": Prefilter(min_length=3, required=":", min_required=2),
+    "iban": Prefilter(min_length=14, min_digits=2),
+}
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, TypeAlias
+
+import pandas as pd
+
+from .detectors import Detector
+from .io_utils import CsvRange, load_chunk
+from .masker import Masker
+from .rules import Rules
+from .stats import Stats
+from .token_store import TokenStore
+
+# Per-process state built once by _init_worker and reused for every chunk
+_state: dict[str, Any] = {}
+
+
+def ordered_map(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    workers: int,
+    initializer: Callable[..., None] | None = None,
+    initargs: tuple[Any, ...] = (),
+) -> Iterator[Any]:
+    """Apply *fn* to *items* in a process pool, yielding results in input order.
+
+    At most ``2 * workers`` items are in flight, so a slow consumer (the output
+    writer) bounds how far the reader runs ahead.
+    """
+    with ProcessPoolExecutor(workers, initializer=initializer, initargs=initargs) as pool:
+        window: deque[Future[Any]] = deque()
+        for item in items:
+            window.append(pool.submit(fn, item))
+            if len(window) >= 2 * workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def _init_worker(
+    rules: Rules,
+    token_path: str | None,
+    token_backend: str | None,
+    profile: dict[str, list[str]] | None = None,
+    instrument: bool = False,
+) -> None:
+    _state["detector"] = Detector.from_rules(rules)
+    # Tokens are a deterministic digest of the value, so workers mint the same
+    # token the parent would; the parent merges their new mappings in order.
+    tokens = TokenStore(token_path, backend=token_backend, read_only=True)
+    _state["masker"] = Masker(rules, token_store=tokens, profile=profile)
+    # Worker stats are drained after every chunk and merged by the parent
+    _state["stats"] = Stats() if instrument else None
+    if instrument:
+        _state["detector"].stats = _state["stats"]
+        _state["masker"].instrument(_state["stats"])
+
+
+# A DataFrame, or a CSV byte range the worker parses itself
+Chunk: TypeAlias = pd.DataFrame | CsvRange
+
+
+def _load(chunk: Chunk, stats: Stats | None) -> pd.DataFrame:
+    frame = load_chunk(chunk)
+    if stats is not None and isinstance(chunk, CsvRange):
+        # rows parsed here are invisible to the parent's reader
+        stats.add("chunks", rows=len(frame))
+    return frame
+
+
+def _drain_stats() -> dict[str, Any] | None:
+    stats: Stats | None = _state["stats"]
+    return None if stats is None else stats.drain()
+
+
+def _scan_chunk(chunk: Chunk) -> tuple[dict[str, dict[str, int]], dict[str, Any] | None]:
+    frame = _load(chunk, _state["stats"])
+    return _state["detector"].detect_frame(frame), _drain_stats()
+
+
+def _mask_chunk(
+    chunk: Chunk,
+) -> tuple[pd.DataFrame, dict[str, str], int, int, dict[str, Any] | None]:
+    masker: Masker = _state["masker"]
+    hits, misses = masker.cache_hits, masker.cache_misses
+    masked = masker.mask_frame(_load(chunk, _state["stats"]))
+    new_tokens = masker.tokens.drain_new()
+    return (
+        masked,
+        new_tokens,
+        masker.cache_hits - hits,
+        masker.cache_misses - misses,
+        _drain_stats(),
+    )
+
+
+def scan_chunks(
+    chunks: Iterable[Chunk], rules: Rules, workers: int = 1, stats: Stats | None = None
+) -> Iterator[dict[str, dict[str, int]]]:
+    """Yield per-column detection counts for each chunk, in chunk order."""
+    if workers <= 1:
+        det = Detector.from_rules(rules)
+        det.stats = stats
+        for chunk in chunks:
+            yield det.detect_frame(_load(chunk, stats))
+        return
+    initargs = (rules, None, None, None, stats is not None)
+    for counts, snapshot in ordered_map(_scan_chunk, chunks, workers, _init_worker, initargs):
+        if stats is not None and snapshot is not None:
+            stats.merge(snapshot)
+        yield counts
+
+
+def mask_chunks(
+    chunks: Iterable[Chunk], masker: Masker, workers: int = 1
+) -> Iterator[pd.DataFrame]:
+    """Yield masked chunks in chunk order.
+
+    With several workers each process masks with its own compiled Masker; new
+    token mappings and cache counters are folded back into *masker*.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield masker.mask_frame(_load(chunk, masker.stats))
+        return
+    # Workers read the store as it is now, so make sure it is on disk
+    masker.tokens.flush()
+    initargs = (
+        masker.rules,
+        masker.tokens.path,
+        masker.tokens.backend.name,
+        masker.profile,
+        masker.stats is not None,
+    )
+    for masked, new_tokens, hits, misses, snapshot in ordered_map(
+        _mask_chunk, chunks, workers, _init_worker, initargs
+    ):
+        masker.tokens.update(new_tokens)
+        masker.cache_hits += hits
+        masker.cache_misses += misses
+        if masker.stats is not None and snapshot is not None:
+            masker.stats.merge(snapshot)
+        yield masked
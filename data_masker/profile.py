@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from typing import Any
+
+PROFILE_VERSION = 1
+
+
+def build_profile(
+    file: str, results: dict[str, dict[str, int]], scanned: Iterable[str]
+) -> dict[str, Any]:
+    """Map every scanned column to the PII types found in it ([] = clean)."""
+    return {
+        "version": PROFILE_VERSION,
+        "file": file,
+        "columns": {str(col): sorted(results.get(col, {})) for col in scanned},
+    }
+
+
+def load_profile(path: str) -> dict[str, list[str]]:
+    """Read a column plan written by ``scan --export-plan``.
+
+    A scan report (``--export-json``) is accepted as well; it only lists PII
+    columns, so every other column keeps full detection.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    columns = data.get("columns") if isinstance(data, dict) else None
+    if not isinstance(columns, dict):
+        raise ValueError(f"No column plan found in {path}")
+    return {str(col): [str(t) for t in types] for col, types in columns.items()}
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from typing import Any, cast
 
-import yaml
-
 from .pii_patterns import DEFAULT_PATTERNS
 
 DEFAULT_STRATEGIES: dict[str, str] = {
@@ -22,6 +21,8 @@ class Rules:
     columns: dict[str, dict[str, Any]]
     options: dict[str, Any]
     enabled_detectors: set[str]
+    # Term list detectors: name -> {"files", "case_sensitive", "whole_words"}
+    dictionaries: dict[str, dict[str, Any]] = field(default_factory=dict)
 
     @staticmethod
     def load(path: str | None) -> Rules:
@@ -34,6 +35,9 @@ class Rules:
                     {"partial_keep_last": 4},
                     enabled_detectors,
                 )
+            # Imported here so the default rules don't pay yaml's import time
+            import yaml  # noqa: PLC0415
+
             with open(path, encoding="utf-8") as f:
                 raw: Any = yaml.safe_load(f) or {}
             # Explicit type cast for mypy
@@ -55,11 +59,32 @@ class Rules:
             options: dict[str, Any] = dict(options_in)
             if "partial_keep_last" not in options:
                 options["partial_keep_last"] = 4
+            # Term dictionaries: a file, a list of files, or a mapping with options.
+            # Relative paths are resolved against the rules file's directory.
+            dictionaries_in: dict[str, Any] = cast(
+                dict[str, Any], data.get("dictionaries")
+            ) if isinstance(data.get("dictionaries"), dict) else {}
+            base = os.path.dirname(os.path.abspath(path))
+            dictionaries: dict[str, dict[str, Any]] = {}
+            for k, v in dictionaries_in.items():
+                spec: dict[str, Any] = dict(cast(dict[str, Any], v)) if isinstance(
+                    v, dict
+                ) else {"files": v}
+                files = spec.get("files") or []
+                if isinstance(files, str):
+                    files = [files]
+                dictionaries[str(k)] = {
+                    "files": [os.path.join(base, str(f)) for f in files],
+                    "case_sensitive": bool(spec.get("case_sensitive", False)),
+                    "whole_words": bool(spec.get("whole_words", True)),
+                }
+            if dictionaries and "dictionary_cache" not in options:
+                options["dictionary_cache"] = os.path.join(base, ".dictionary_cache")
             # Detector toggles
             detectors_in: dict[str, Any] = cast(
                 dict[str, Any], data.get("detectors")
             ) if isinstance(data.get("detectors"), dict) else {}
-            enabled_detectors = set(DEFAULT_PATTERNS.keys())
+            enabled_detectors = set(DEFAULT_PATTERNS.keys()) | set(dictionaries)
             for k, v in detectors_in.items():
                 k_str = str(k)
                 detector_name = k_str.replace("enable_", "")
@@ -67,4 +92,4 @@ class Rules:
                     enabled_detectors.add(detector_name)
                 else:
                     enabled_detectors.discard(detector_name)
-            return Rules(strategies, columns, options, enabled_detectors)
+            return Rules(strategies, columns, options, enabled_detectors, dictionaries)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .detectors import Detector
+
+# Rows read per step when sampling and no --chunksize is given
+DEFAULT_SAMPLE_CHUNKSIZE = 1000
+
+
+def stable_rows_needed(confidence: float, min_rate: float) -> int:
+    """Values without a new PII type after which a column counts as settled.
+
+    A type present in at least ``min_rate`` of a column's values shows up among
+    this many values with probability ``confidence``.
+    """
+    if not 0 < confidence < 1 or not 0 < min_rate < 1:
+        raise ValueError("confidence and min_rate must be between 0 and 1")
+    return math.ceil(math.log(1 - confidence) / math.log(1 - min_rate))
+
+
+@dataclass
+class ColumnSample:
+    counts: dict[str, int]
+    sampled: int = 0
+    # non-null values tested since the set of detected types last grew
+    stable: int = 0
+    settled: bool = False
+
+    def rates(self) -> dict[str, float]:
+        if not self.sampled:
+            return {}
+        return {t: c / self.sampled for t, c in self.counts.items() if c}
+
+
+@dataclass
+class SampleResult:
+    columns: dict[str, ColumnSample] = field(default_factory=dict)
+    rows_read: int = 0
+    # True when the whole input was read before every column settled
+    exhausted: bool = False
+
+
+def sample_scan(
+    chunks: Iterable[pd.DataFrame],
+    detector: Detector,
+    sample: int,
+    confidence: float = 0.95,
+    min_rate: float = 0.01,
+) -> SampleResult:
+    """Scan chunks progressively, dropping columns once their classification is stable.
+
+    Each column tests at most *sample* non-null values. It settles earlier once
+    no new type has appeared for ``stable_rows_needed(confidence, min_rate)``
+    values. Reading stops as soon as every column has settled.
+    """
+    needed = stable_rows_needed(confidence, min_rate)
+    result = SampleResult(exhausted=True)
+    for chunk in chunks:
+        result.rows_read += len(chunk)
+        for col in chunk.columns:
+            state = result.columns.get(col)
+            if state is None:
+                state = result.columns[col] = ColumnSample({t: 0 for t in detector.types})
+            if state.settled:
+                continue
+            values = chunk[col].dropna().iloc[: sample - state.sampled]
+            seen = {t for t, c in state.counts.items() if c}
+            for t, c in detector.detect_series(values).items():
+                state.counts[t] += c
+            state.sampled += len(values)
+            if {t for t, c in state.counts.items() if c} - seen:
+                # a new type appeared somewhere in this chunk: restart the window
+                state.stable = 0
+            else:
+                state.stable += len(values)
+            state.settled = state.sampled >= sample or state.stable >= needed
+        if result.columns and all(s.settled for s in result.columns.values()):
+            result.exhausted = False
+            break
+    return result
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from importlib.metadata import PackageNotFoundError, version
+from re import Pattern
+from typing import IO, Any
+
+import pandas as pd
+
+from .dictionaries import load_dictionaries
+from .pii_patterns import DEFAULT_PATTERNS
+from .pipeline import scan_chunks
+from .rules import Rules
+
+CACHE_VERSION = 2
+# Kinds whose records can be split on byte offsets without parsing the file
+CACHEABLE_KINDS = ("csv", "ndjson")
+
+
+@dataclass
+class Block:
+    start: int
+    end: int
+    data: bytes
+    # False when the file ends mid-record; such a block is scanned but not cached
+    complete: bool
+
+
+@dataclass
+class CachedScan:
+    counts: dict[str, dict[str, int]] = field(default_factory=dict)
+    reused_chunks: int = 0
+    reused_rows: int = 0
+    scanned_chunks: int = 0
+    scanned_rows: int = 0
+
+
+def fingerprint(
+    patterns: dict[str, Pattern[str]],
+    kind: str,
+    chunksize: int,
+    columns: list[str] | None,
+    dictionaries: dict[str, str] | None = None,
+) -> str:
+    """Hash of everything besides the file bytes that affects cached counts.
+
+    *dictionaries* maps each term dictionary to the key of its term files.
+    The package version is included, since detection code changes between
+    releases.
+    """
+    spec: dict[str, Any] = {
+        "version": CACHE_VERSION,
+        "package": _package_version(),
+        "kind": kind,
+        "chunksize": chunksize,
+        "columns": columns,
+        "patterns": {name: [p.pattern, p.flags] for name, p in sorted(patterns.items())},
+    }
+    if dictionaries:
+        spec["dictionaries"] = dictionaries
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _package_version() -> str:
+    try:
+        return version("data-masker")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def iter_blocks(f: IO[bytes], start: int, records: int, quoted: bool) -> Iterator[Block]:
+    """Split *f* from byte *start* into blocks of up to *records* records.
+
+    With *quoted* (CSV) a newline inside a double-quoted field does not end a
+    record: a line with an odd number of quotes toggles the in-quotes state.
+    """
+    f.seek(start)
+    lines: list[bytes] = []
+    count = 0
+    in_quotes = False
+    pos = block_start = start
+    for line in f:
+        lines.append(line)
+        pos += len(line)
+        if quoted and line.count(b'"') % 2:
+            in_quotes = not in_quotes
+        if in_quotes or not line.endswith(b"\n"):
+            continue
+        count += 1
+        if count == records:
+            yield Block(block_start, pos, b"".join(lines), True)
+            lines, count, block_start = [], 0, pos
+    if lines:
+        data = b"".join(lines)
+        yield Block(block_start, pos, data, not in_quotes and data.endswith(b"\n"))
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cache_file(cache_dir: str, path: str) -> str:
+    key = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def _load_entry(cache_file: str, fp: str, header: str) -> list[dict[str, Any]]:
+    try:
+        with open(cache_file, encoding="utf-8") as fh:
+            entry = json.load(fh)
+    except (OSError, ValueError):
+        return []
+    if entry.get("fingerprint") != fp or entry.get("header") != header:
+        return []
+    blocks: list[dict[str, Any]] = entry.get("blocks", [])
+    return blocks
+
+
+def block_frame(
+    block: Block, header: bytes, kind: str, columns: list[str] | None
+) -> pd.DataFrame:
+    """Parse a CSV or JSON Lines block; CSV blocks are parsed under *header*."""
+    if not block.data.strip():
+        return pd.DataFrame()
+    buf = io.BytesIO(header + block.data)
+    if kind == "csv":
+        return pd.read_csv(buf, usecols=columns)  # type: ignore[call-overload]
+    df = pd.read_json(buf, orient="records", lines=True)
+    return df[columns] if columns else df
+
+
+def cached_scan(  # noqa: PLR0913
+    path: str,
+    kind: str,
+    rules: Rules,
+    cache_dir: str,
+    chunksize: int,
+    columns: list[str] | None = None,
+    workers: int = 1,
+) -> CachedScan:
+    """Scan *path*, reusing per-chunk counts cached by an earlier scan.
+
+    Cached chunks are checked by re-hashing their byte range, so an appended
+    file only re-detects the new bytes. A changed header, rules, detector set
+    or package version invalidates the cache, and edited bytes invalidate it
+    from that point on.
+    """
+    patterns = {k: v for k, v in DEFAULT_PATTERNS.items() if k in rules.enabled_detectors}
+    terms = {name: d.key for name, d in load_dictionaries(rules).items()}
+    fp = fingerprint(patterns, kind, chunksize, columns, terms)
+    cache_file = _cache_file(cache_dir, path)
+    result = CachedScan()
+    kept: list[dict[str, Any]] = []
+    with open(path, "rb") as f:
+        header = b""
+        if kind == "csv":
+            first = next(iter_blocks(f, 0, 1, quoted=True), None)
+            header = first.data if first is not None else b""
+        offset = len(header)
+        for cached in _load_entry(cache_file, fp, _digest(header)):
+            if cached["start"] != offset:
+                break
+            f.seek(offset)
+            if _digest(f.read(cached["end"] - offset)) != cached["hash"]:
+                break
+            kept.append(cached)
+            offset = cached["end"]
+            result.reused_chunks += 1
+            result.reused_rows += cached["rows"]
+            _add(result.counts, cached["counts"])
+        # Blocks are parsed lazily; scan_chunks may read ahead with --workers
+        pending: deque[tuple[Block, int]] = deque()
+
+        def frames() -> Iterator[pd.DataFrame]:
+            for block in iter_blocks(f, offset, chunksize, quoted=kind == "csv"):
+                frame = block_frame(block, header, kind, columns)
+                pending.append((block, len(frame)))
+                yield frame
+
+        for counts in scan_chunks(frames(), rules, workers):
+            block, rows = pending.popleft()
+            clean = {col: {t: n for t, n in found.items() if n} for col, found in counts.items()}
+            _add(result.counts, clean)
+            result.scanned_chunks += 1
+            result.scanned_rows += rows
+            if block.complete:
+                kept.append(
+                    {
+                        "start": block.start,
+                        "end": block.end,
+                        "hash": _digest(block.data),
+                        "rows": rows,
+                        "counts": clean,
+                    }
+                )
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = cache_file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(
+            {
+                "version": CACHE_VERSION,
+                "path": os.path.abspath(path),
+                "fingerprint": fp,
+                "header": _digest(header),
+                "blocks": kept,
+            },
+            fh,
+        )
+    os.replace(tmp, cache_file)
+    return result
+
+
+def _add(total: dict[str, dict[str, int]], counts: dict[str, dict[str, int]]) -> None:
+    for col, by_type in counts.items():
+        col_total = total.setdefault(col, {})
+        for t, n in by_type.items():
+            col_total[t] = col_total.get(t, 0) + n
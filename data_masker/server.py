@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from .detectors import Detector
+from .masker import Masker
+from .rules import Rules
+from .token_store import TokenStore
+
+DEFAULT_PORT = 8765
+# Requests waiting to be processed before new ones get 503 (backpressure)
+DEFAULT_MAX_PENDING = 64
+# Queued requests combined into one masking pass
+DEFAULT_MAX_BATCH = 32
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_MAX_BODY = 32 << 20
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+# Responses at or above this status count as errors in /metrics
+_ERROR_STATUS = 400
+_CONTENT_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Job:
+    kind: str
+    rules_key: str
+    frame: pd.DataFrame
+    fmt: str
+    # JSON bodies are answered in the shape they came in: a list or {"records": [...]}
+    wrapped: bool = False
+    future: asyncio.Future[bytes] | None = None
+    rows: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.rows = len(self.frame)
+
+
+def parse_body(body: bytes, content_type: str) -> tuple[pd.DataFrame, str, bool]:
+    """(frame, format, wrapped) for a CSV, NDJSON or JSON records body."""
+    kind = content_type.split(";", 1)[0].strip().lower()
+    try:
+        if kind in ("text/csv", "application/csv"):
+            return pd.read_csv(io.BytesIO(body)), "csv", False
+        if kind in ("application/x-ndjson", "application/jsonl", "application/ndjson"):
+            if not body.strip():
+                return pd.DataFrame(), "ndjson", False
+            return pd.read_json(io.BytesIO(body), orient="records", lines=True), "ndjson", False
+        data = json.loads(body or b"[]")
+    except (ValueError, pd.errors.ParserError) as exc:
+        raise RequestError(400, f"Could not parse body: {exc}") from exc
+    wrapped = isinstance(data, dict)
+    records = data.get("records") if isinstance(data, dict) else data
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise RequestError(400, 'Expected a JSON list of records or {"records": [...]}')
+    return pd.DataFrame(records), "json", wrapped
+
+
+def render(df: pd.DataFrame, fmt: str, wrapped: bool) -> bytes:
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    if fmt == "ndjson":
+        return df.to_json(orient="records", lines=True, force_ascii=False).encode("utf-8")
+    records = df.to_json(orient="records", force_ascii=False)
+    return (f'{{"records": {records}}}' if wrapped else records).encode("utf-8")
+
+
+class MaskingService:
+    """Local HTTP service that keeps maskers, detectors and the token store warm.
+
+    ``POST /mask`` and ``POST /scan`` take a CSV, NDJSON or JSON records body;
+    ``?rules=name`` picks another rules file from *rules_dir*. Rules files can
+    point at dictionaries and caches, so clients may not name files outside
+    it, and ``?rules=`` is refused when no *rules_dir* is set. Requests are
+    queued and the queued mask requests sharing rules, columns and column
+    types are masked as one frame. A full queue answers 503. New tokens are
+    flushed every *flush_interval* seconds and on shutdown. ``GET /metrics``
+    reports counters.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        rules_path: str | None = None,
+        token_store_path: str | None = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_body: int = DEFAULT_MAX_BODY,
+        rules_dir: str | None = None,
+    ) -> None:
+        self.rules_path = rules_path
+        self.rules_dir = os.path.realpath(rules_dir) if rules_dir else None
+        rules = Rules.load(rules_path)
+        self.tokens = TokenStore(
+            token_store_path or rules.options.get("token_store"),
+            backend=rules.options.get("token_backend"),
+        )
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_batch = max(1, max_batch)
+        self.max_body = max_body
+        # rules key -> (rules file mtime, masker, detector)
+        self._compiled: dict[str, tuple[float, Masker, Detector]] = {}
+        self._queue: asyncio.Queue[Job] | None = None
+        # One thread does all masking and flushing, so Masker caches need no locks
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="data-masker-serve")
+        self._stopping: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._started = time.monotonic()
+        self.metrics: dict[str, Any] = {
+            "requests": {},
+            "rows": {"mask": 0, "scan": 0},
+            "batches": 0,
+            "batched_requests": 0,
+            "rejected": 0,
+            "errors": 0,
+            "processing_seconds": 0.0,
+            "token_flushes": 0,
+        }
+
+    def _compile(self, rules_path: str | None) -> tuple[Masker, Detector]:
+        key = os.path.abspath(rules_path) if rules_path else ""
+        mtime = os.path.getmtime(key) if key else 0.0
+        cached = self._compiled.get(key)
+        if cached is None or cached[0] != mtime:
+            # A changed rules file gets a fresh masker on its next request
+            rules = Rules.load(rules_path)
+            masker = Masker(rules, token_store=self.tokens)
+            cached = self._compiled[key] = (mtime, masker, Detector.from_rules(rules))
+        return cached[1], cached[2]
+
+    def _rules_file(self, name: str) -> str:
+        # Only files inside rules_dir, after resolving "..", absolute paths and symlinks
+        if self.rules_dir is None:
+            raise RequestError(403, "?rules= is disabled; start the service with --rules-dir")
+        path = os.path.realpath(os.path.join(self.rules_dir, name))
+        if os.path.commonpath([path, self.rules_dir]) != self.rules_dir:
+            raise RequestError(403, f"Rules file outside the rules directory: {name}")
+        if not os.path.isfile(path):
+            raise RequestError(400, f"Rules file not found: {name}")
+        return path
+
+    def _process(self, jobs: list[Job]) -> list[bytes | Exception]:
+        # Runs on the worker thread. Mask jobs with the same rules, columns and
+        # dtypes are concatenated, masked once and split back into per-request
+        # frames. Matching dtypes keep concat from upcasting one request's
+        # columns (int64 to float64) because of another request's blanks.
+        results: dict[int, bytes | Exception] = {}
+        groups: dict[tuple[str, tuple[str, ...], tuple[str, ...]], list[int]] = {}
+        for pos, job in enumerate(jobs):
+            if job.kind == "mask":
+                frame = job.frame
+                key = (job.rules_key, tuple(map(str, frame.columns)), tuple(map(str, frame.dtypes)))
+                groups.setdefault(key, []).append(pos)
+                continue
+            try:
+                _, detector = self._compile(job.rules_key or None)
+                counts = detector.detect_frame(job.frame)
+                columns = {c: {t: n for t, n in found.items() if n} for c, found in counts.items()}
+                report = {"rows": job.rows, "columns": {c: f for c, f in columns.items() if f}}
+                results[pos] = json.dumps(report).encode("utf-8")
+            except Exception as exc:
+                results[pos] = exc
+        for (rules_key, _, _), positions in groups.items():
+            try:
+                masker, _ = self._compile(rules_key or None)
+                frames = [jobs[pos].frame for pos in positions]
+                combined = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+                masked = masker.mask_frame(combined)
+                start = 0
+                for pos in positions:
+                    job = jobs[pos]
+                    part = masked.iloc[start : start + job.rows]
+                    results[pos] = render(part, job.fmt, job.wrapped)
+                    start += job.rows
+            except Exception as exc:
+                for pos in positions:
+                    results[pos] = exc
+        return [results[pos] for pos in range(len(jobs))]
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self._queue.get()]
+            while not self._queue.empty() and len(jobs) < self.max_batch:
+                jobs.append(self._queue.get_nowait())
+            start = time.perf_counter()
+            results = await loop.run_in_executor(self._executor, self._process, jobs)
+            self.metrics["processing_seconds"] += time.perf_counter() - start
+            self.metrics["batches"] += 1
+            self.metrics["batched_requests"] += len(jobs)
+            for job, result in zip(jobs, results, strict=True):
+                self.metrics["rows"][job.kind] += job.rows
+                assert job.future is not None
+                if not job.future.done():
+                    if isinstance(result, Exception):
+                        job.future.set_exception(result)
+                    else:
+                        job.future.set_result(result)
+                self._queue.task_done()
+
+    async def _flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await loop.run_in_executor(self._executor, self.tokens.flush)
+            self.metrics["token_flushes"] += 1
+
+    def metrics_report(self) -> dict[str, Any]:
+        hits = sum(m.cache_hits for _, m, _ in self._compiled.values())
+        misses = sum(m.cache_misses for _, m, _ in self._compiled.values())
+        return {
+            **self.metrics,
+            "uptime_seconds": round(time.monotonic() - self._started, 3),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "maskers": len(self._compiled),
+            "cache": {"hits": hits, "misses": misses},
+        }
+
+    async def _dispatch(
+        self, method: str, target: str, headers: dict[str, str], body: bytes
+    ) -> tuple[int, str, bytes]:
+        url = urlsplit(target)
+        endpoint = url.path.rstrip("/") or "/"
+        name = endpoint.lstrip("/") or "root"
+        requests = self.metrics["requests"]
+        requests[name] = requests.get(name, 0) + 1
+        if endpoint == "/metrics":
+            if method != "GET":
+                raise RequestError(405, "Use GET for /metrics")
+            return 200, "application/json", json.dumps(self.metrics_report()).encode("utf-8")
+        if endpoint not in ("/mask", "/scan"):
+            raise RequestError(404, f"Unknown endpoint {url.path}")
+        if method != "POST":
+            raise RequestError(405, f"Use POST for {endpoint}")
+        requested = parse_qs(url.query).get("rules")
+        rules_path = self._rules_file(requested[0]) if requested else self.rules_path or ""
+        # Parsing a large body takes a while; keep it off the event loop
+        frame, fmt, wrapped = await asyncio.get_running_loop().run_in_executor(
+            None, parse_body, body, headers.get("content-type", "application/json")
+        )
+        assert self._queue is not None
+        job = Job(endpoint[1:], rules_path, frame, fmt, wrapped)
+        job.future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.metrics["rejected"] += 1
+            raise RequestError(503, "Too many pending requests; retry later") from None
+        result = await job.future
+        content_type = "application/json" if job.kind == "scan" else _CONTENT_TYPES[fmt]
+        return 200, content_type, result
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: dict[str, str]) -> bytes:
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise RequestError(400, "Content-Length must be an integer") from None
+        if length < 0:
+            raise RequestError(400, "Content-Length must not be negative")
+        if length > self.max_body:
+            raise RequestError(413, f"Body over {self.max_body} bytes")
+        if headers.get("transfer-encoding"):
+            raise RequestError(411, "Send a Content-Length body")
+        return await reader.readexactly(length) if length else b""
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, *_ = request_line.decode("latin-1").split()
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body: bytes | None = None
+                try:
+                    body = await self._read_body(reader, headers)
+                    status, content_type, payload = await self._dispatch(
+                        method, target, headers, body
+                    )
+                except RequestError as exc:
+                    status, content_type = exc.status, "application/json"
+                    payload = json.dumps({"error": str(exc)}).encode("utf-8")
+                except Exception as exc:
+                    status, content_type = 500, "application/json"
+                    payload = json.dumps({"error": f"{type(exc).__name__}: {exc}"}).encode()
+                if status >= _ERROR_STATUS:
+                    self.metrics["errors"] += 1
+                # A body left unread would be parsed as the next request
+                close = headers.get("connection", "").lower() == "close" or body is None
+                head = (
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+                )
+                writer.write(head.encode("latin-1") + payload)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        unix_socket: str | None = None,
+        ready: Callable[[str], None] | None = None,
+    ) -> None:
+        """Serve until ``stop()`` is called; the token store is flushed on the way out."""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._queue = asyncio.Queue(self.max_pending)
+        self._compile(self.rules_path)
+        if unix_socket:
+            server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+            address = unix_socket
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+            bound = server.sockets[0].getsockname()
+            address = f"http://{bound[0]}:{bound[1]}"
+        tasks = [asyncio.create_task(self._worker()), asyncio.create_task(self._flusher())]
+        try:
+            async with server:
+                if ready is not None:
+                    ready(address)
+                await self._stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._loop.run_in_executor(self._executor, self.tokens.close)
+            self._executor.shutdown()
+
+    def stop(self) -> None:
+        """Ask a running ``serve()`` to shut down; safe to call from any thread."""
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from time import perf_counter
+from typing import Any
+
+# Functions listed from a cProfile run in the --stats text report
+PROFILE_TOP = 15
+
+
+class Stats:
+    """Timers and counters filled in by instrumented components.
+
+    Detector, Masker and TokenStore carry a ``stats`` attribute that is None
+    unless a run asks for ``--stats``; they only record when it is set. Names
+    are dotted: a timer ``regex.email`` has counters ``regex.email.tested`` etc.
+    """
+
+    def __init__(self) -> None:
+        self.timers: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self.chunks: list[dict[str, float]] = []
+
+    def add(self, name: str, seconds: float = 0.0, **counts: int) -> None:
+        if seconds:
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+        for key, n in counts.items():
+            counter = f"{name}.{key}"
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    @contextmanager
+    def timer(self, name: str, **counts: int) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start, **counts)
+
+    def record_chunk(self, rows: int, read: float, process: float, write: float) -> None:
+        total = read + process + write
+        self.chunks.append(
+            {
+                "rows": rows,
+                "read": read,
+                "process": process,
+                "write": write,
+                "rows_per_sec": rows / total if total else 0.0,
+            }
+        )
+
+    def record_run(self, rows: int) -> None:
+        """Record a whole-file run as a single chunk from the stage totals."""
+        self.record_chunk(
+            rows,
+            self.timers.get("read", 0.0),
+            self.timers.get("process", 0.0),
+            self.timers.get("write", 0.0),
+        )
+
+    def track_chunks(
+        self,
+        chunks: Iterable[Any],
+        process: Callable[[Iterable[Any]], Iterable[Any]],
+    ) -> Iterator[Any]:
+        """Yield ``process(chunks)``, recording read/process/write time per chunk.
+
+        Read is the time spent pulling input chunks, process the rest of the time
+        spent producing an output chunk, and write the time the consumer holds
+        a chunk before asking for the next one. Outputs that are not DataFrames
+        (scan counts) are credited with the input rows read meanwhile.
+        """
+        # Only chunked pandas runs get here; the stream engine never imports pandas
+        import pandas as pd  # noqa: PLC0415
+
+        reads = self._timed(chunks, "read")
+        results = iter(process(reads))
+        while True:
+            read_before = self.timers.get("read", 0.0)
+            rows_before = self.counters.get("chunks.rows", 0)
+            start = perf_counter()
+            try:
+                chunk = next(results)
+            except StopIteration:
+                return
+            elapsed = perf_counter() - start
+            read = self.timers.get("read", 0.0) - read_before
+            self.add("process", elapsed - read)
+            if isinstance(chunk, pd.DataFrame):
+                rows = len(chunk)
+            else:
+                rows = self.counters.get("chunks.rows", 0) - rows_before
+            start = perf_counter()
+            yield chunk
+            write = perf_counter() - start
+            self.add("write", write)
+            self.record_chunk(rows, read, elapsed - read, write)
+
+    def _timed(self, items: Iterable[Any], name: str) -> Iterator[Any]:
+        import pandas as pd  # noqa: PLC0415
+
+        it = iter(items)
+        while True:
+            start = perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            self.add(name, perf_counter() - start)
+            if isinstance(item, pd.DataFrame):
+                self.add("chunks", rows=len(item))
+            yield item
+
+    def drain(self) -> dict[str, Any]:
+        """Return and reset the timers and counters (worker -> parent hand-off)."""
+        snapshot = {"timers": self.timers, "counters": self.counters}
+        self.timers, self.counters = {}, {}
+        return snapshot
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        for name, seconds in snapshot["timers"].items():
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+        for name, n in snapshot["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self) -> dict[str, Any]:
+        rows = sum(int(c["rows"]) for c in self.chunks)
+        elapsed = sum(self.timers.get(k, 0.0) for k in ("read", "process", "write"))
+        return {
+            "rows": rows,
+            "seconds": round(elapsed, 6),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+            "timers": {k: round(v, 6) for k, v in sorted(self.timers.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "chunks": [{k: round(v, 6) for k, v in c.items()} for c in self.chunks],
+        }
+
+    def report(self) -> list[str]:
+        """Human-readable summary lines for the --stats output."""
+        data = self.to_dict()
+        c = self.counters
+        lines = [
+            f"Rows: {data['rows']} in {data['seconds']:.3f}s ({data['rows_per_sec']:,.0f} rows/s)",
+            "  read {:.3f}s, process {:.3f}s, write {:.3f}s over {} chunk(s)".format(
+                self.timers.get("read", 0.0),
+                self.timers.get("process", 0.0),
+                self.timers.get("write", 0.0),
+                len(self.chunks),
+            ),
+        ]
+        groups = (("regex", "Regex"), ("validator", "Validators"), ("strategy", "Strategies"))
+        for group, label in groups:
+            names = {k.split(".")[1] for k in (*self.timers, *c) if k.startswith(group + ".")}
+            # slowest first
+            timed = sorted(((self.timers.get(f"{group}.{n}", 0.0), n) for n in names), reverse=True)
+            if timed:
+                lines.append(f"{label}:")
+            for seconds, name in timed:
+                key = f"{group}.{name}"
+                if group == "regex":
+                    detail = f"{c.get(key + '.matched', 0)}/{c.get(key + '.tested', 0)} matched"
+                elif group == "validator":
+                    calls, rejected = c.get(key + ".calls", 0), c.get(key + ".rejected", 0)
+                    rate = rejected / calls if calls else 0.0
+                    detail = f"{calls} calls, {rejected} rejected ({rate:.1%})"
+                else:
+                    detail = f"{c.get(key + '.calls', 0)} calls"
+                lines.append(f"  {name:12s} {seconds:8.3f}s  {detail}")
+        if any(k.startswith("tokens.") for k in (*self.timers, *c)):
+            lines.append(
+                "Token store: {} hits, {} misses, {} written, flush {:.3f}s".format(
+                    c.get("tokens.hits", 0),
+                    c.get("tokens.misses", 0),
+                    c.get("tokens.flush.written", 0),
+                    self.timers.get("tokens.flush", 0.0),
+                )
+            )
+        if "cache.hits" in c:
+            lines.append(f"Cache: {c['cache.hits']} hits, {c.get('cache.misses', 0)} misses")
+        return lines
+
+
+def stage(stats: Stats | None, name: str) -> AbstractContextManager[None]:
+    """``stats.timer(name)``, or a no-op when stats are off."""
+    return nullcontext() if stats is None else stats.timer(name)
+
+
+@contextmanager
+def profiled(path: str | None) -> Iterator[None]:
+    """Run the block under cProfile and dump the stats to *path* (no-op if None)."""
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+def profile_summary(path: str, limit: int = PROFILE_TOP) -> list[str]:
+    """Top functions by cumulative time from a cProfile dump, one line each."""
+    ps = pstats.Stats(path)
+    entries = sorted(ps.stats.items(), key=lambda kv: -kv[1][3])[:limit]  # type: ignore[attr-defined]
+    lines = []
+    for (filename, lineno, func), (_, calls, own, cumulative, _) in entries:
+        where = f"{filename.rsplit('/', 1)[-1]}:{lineno}({func})"
+        lines.append(f"  {cumulative:8.3f}s cum {own:8.3f}s own {calls:>9} calls  {where}")
+    return lines
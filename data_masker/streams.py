@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+from typing import IO, Any, cast
+
+# Compression by file suffix; only text kinds, the others compress internally
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+COMPRESSIBLE_KINDS = ("csv", "ndjson", "json")
+# Leading bytes of each format, for compressed input without a suffix
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+# gzip defaults to level 9, which costs a lot of time for little gain
+_DEFAULT_GZIP_LEVEL = 6
+# Decompressed bytes per read-ahead block, and blocks decompressed ahead
+_READ_AHEAD_BLOCK = 1 << 20
+_READ_AHEAD_DEPTH = 4
+
+
+def strip_compression(path: str) -> tuple[str, str | None]:
+    """*path* without a compression suffix, and that compression (or None)."""
+    root, ext = os.path.splitext(path)
+    compression = COMPRESSION_SUFFIXES.get(ext.lower())
+    return (root, compression) if compression else (path, None)
+
+
+def detect_compression(path: str) -> str | None:
+    """Compression of *path* from its suffix, else from an existing file's magic bytes."""
+    compression = strip_compression(path)[1]
+    if compression or not os.path.isfile(path):
+        return compression
+    with open(path, "rb") as f:
+        head = f.read(6)
+    return next((name for magic, name in _MAGIC if head.startswith(magic)), None)
+
+
+def detect_kind(path: str) -> str:
+    base, compression = strip_compression(path)
+    kind = _detect_kind(base)
+    if compression and kind not in COMPRESSIBLE_KINDS:
+        raise ValueError(f"Compressed {kind} files are not supported: {path}")
+    return kind
+
+
+def _detect_kind(path: str) -> str:
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        return "csv"
+    if lower.endswith((".jsonl", ".ndjson")):
+        return "ndjson"
+    if lower.endswith(".json"):
+        return "json"
+    if lower.endswith(".xlsx"):
+        return "xlsx"
+    if lower.endswith(".parquet"):
+        return "parquet"
+    if lower.endswith((".feather", ".arrow")):
+        return "feather"
+    raise ValueError(f"Unsupported file type for {path}")
+
+
+def _zstd() -> Any:
+    try:
+        from compression import zstd  # noqa: PLC0415
+    except ImportError:
+        try:
+            import zstandard as zstd  # noqa: PLC0415
+        except ImportError as exc:
+            raise ImportError(
+                "zstd support requires zstandard: pip install 'data-masker[zstd]'"
+            ) from exc
+    return zstd
+
+
+def _open_compressed(path: str, mode: str, compression: str, level: int | None) -> IO[bytes]:
+    if compression == "gzip":
+        gzip_level = _DEFAULT_GZIP_LEVEL if level is None else level
+        raw: Any = gzip.open(path, mode, compresslevel=gzip_level)  # noqa: SIM115
+    elif compression == "bz2":
+        raw = bz2.open(path, mode, compresslevel=level or 9)  # noqa: SIM115
+    elif compression == "xz":
+        raw = lzma.open(path, mode, preset=None if "r" in mode else level)  # noqa: SIM115
+    else:
+        zstd = _zstd()
+        if "r" in mode or level is None:
+            raw = zstd.open(path, mode)
+        elif hasattr(zstd, "ZstdCompressor"):
+            # the zstandard package takes a compressor, the standard library a level
+            raw = zstd.open(path, mode, cctx=zstd.ZstdCompressor(level=level))
+        else:
+            raw = zstd.open(path, mode, level=level)
+    return cast(IO[bytes], raw)
+
+
+class ReadAhead(io.RawIOBase):
+    """Reads *raw* on a background thread, a few blocks ahead of the consumer.
+
+    zlib, bz2, lzma and zstd release the GIL while decompressing, so the next
+    blocks are decompressed while the current chunk is parsed and detected.
+    """
+
+    def __init__(self, raw: IO[bytes]) -> None:
+        super().__init__()
+        self._raw = raw
+        self._blocks: queue.Queue[bytes | BaseException] = queue.Queue(_READ_AHEAD_DEPTH)
+        self._stop = threading.Event()
+        self._buffer = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, name="data-masker-read-ahead")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _put(self, item: bytes | BaseException) -> None:
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _fill(self) -> None:
+        try:
+            while not self._stop.is_set():
+                block = self._raw.read(_READ_AHEAD_BLOCK)
+                self._put(block)
+                if not block:
+                    return
+        except BaseException as exc:  # handed to the reading thread
+            self._put(exc)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        if not self._buffer:
+            if self._eof:
+                return 0
+            item = self._blocks.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._buffer = memoryview(item)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._raw.close()
+        super().close()
+
+
+def open_input(path: str) -> IO[bytes]:
+    """Binary stream of *path*, decompressed on a read-ahead thread if compressed."""
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path, "rb")  # noqa: SIM115
+    raw = _open_compressed(path, "rb", compression, None)
+    return io.BufferedReader(ReadAhead(raw), _READ_AHEAD_BLOCK)
+
+
+def open_text_input(path: str) -> IO[str]:
+    """UTF-8 text stream of *path* with newlines untranslated, as the csv module wants."""
+    return io.TextIOWrapper(open_input(path), encoding="utf-8", newline="")
+
+
+def open_text_output(path: str, mode: str = "w", level: int | None = None) -> IO[str]:
+    """UTF-8 text stream into *path*, compressed by its suffix at *level*."""
+    compression = strip_compression(path)[1]
+    if compression is None:
+        return open(path, mode, newline="", encoding="utf-8")  # noqa: SIM115
+    raw = _open_compressed(path, mode + "b", compression, level)
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+def temp_path_for(path: str) -> str:
+    """Sibling temp path used when writing over the file being read."""
+    base, compression = strip_compression(path)
+    directory, name = os.path.split(os.path.abspath(base))
+    # Keeps the compression suffix so the temp file is written compressed too
+    return os.path.join(directory, f".{name}.tmp{path[len(base):]}")
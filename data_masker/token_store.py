@@ -1,36 +1,318 @@
 from __future__ import annotations
 
+import atexit
 import hashlib
 import json
 import os
+import sqlite3
+import threading
+import warnings
+import weakref
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+from time import perf_counter
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from .stats import Stats
 
-class TokenStore:
-    def __init__(self, path: str | None = None) -> None:
-        self.path = path or ".tokens.json"
-        self._store: dict[str, str] = {}
-        self._load()
+# New mappings are buffered and written in batches of this size (and on flush()).
+DEFAULT_BATCH_SIZE = 1000
+# Store used when none is configured; appends only the new mappings on each flush
+DEFAULT_STORE = ".tokens.jsonl"
+# Default of earlier releases, still used when it exists so tokens stay stable
+LEGACY_STORE = ".tokens.json"
+# JSON stores past this many mappings warn that every flush rewrites them whole
+JSON_WARN_MAPPINGS = 100_000
 
-    def _load(self) -> None:
+_SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+_LOG_SUFFIXES = (".jsonl", ".ndjson", ".log")
+
+
+class JsonBackend:
+    """Legacy single JSON object; every flush rewrites the whole file.
+
+    The file is replaced atomically, so a crash mid-flush leaves the previous
+    version. Use the log or sqlite backend to write only the new mappings.
+    """
+
+    name = "json"
+    lazy = False
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._warned = False
+
+    def load(self) -> dict[str, str]:
         if os.path.exists(self.path):
             try:
                 with open(self.path, encoding="utf-8") as f:
-                    self._store = json.load(f)
+                    data = json.load(f)
+                return data if isinstance(data, dict) else {}
             except Exception:
-                self._store = {}
+                return {}
+        return {}
 
-    def save(self) -> None:
+    def get(self, key: str) -> str | None:
+        return None
+
+    def write(self, items: dict[str, str], store: dict[str, str]) -> None:
+        if len(store) > JSON_WARN_MAPPINGS and not self._warned:
+            self._warned = True
+            warnings.warn(
+                f"Token store {self.path} holds {len(store)} mappings and is rewritten on "
+                f"every flush; move it to an append-only backend with "
+                f"`data-masker migrate-tokens {self.path} tokens.sqlite`",
+                stacklevel=2,
+            )
+        tmp = self.path + ".tmp"
         try:
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self._store, f, indent=2)
-        except Exception:
-            pass
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(store, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def close(self) -> None:
+        pass
+
+
+class LogBackend:
+    """Append-only JSON Lines log: one {"k": ..., "v": ...} record per mapping."""
+
+    name = "log"
+    lazy = False
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def _records(self) -> Iterator[tuple[str, str]]:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    # torn last line from an interrupted append
+                    continue
+                yield str(rec["k"]), str(rec["v"])
+
+    def load(self) -> dict[str, str]:
+        if not os.path.exists(self.path):
+            return {}
+        store: dict[str, str] = {}
+        lines = 0
+        for key, token in self._records():
+            store[key] = token
+            lines += 1
+        # Duplicates only appear when several writers appended the same keys
+        if lines > 2 * len(store):
+            self.compact(store)
+        return store
+
+    def get(self, key: str) -> str | None:
+        return None
+
+    def write(self, items: dict[str, str], store: dict[str, str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(_log_lines(items.items()))
+
+    def compact(self, store: dict[str, str]) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(_log_lines(store.items()))
+        os.replace(tmp, self.path)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteBackend:
+    """SQLite table looked up per key, so nothing is loaded up front."""
+
+    name = "sqlite"
+    lazy = True
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # The store serializes access, so the connection may be shared by threads
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, token TEXT NOT NULL)"
+            )
+        return self._conn
+
+    def load(self) -> dict[str, str]:
+        return dict(self.conn.execute("SELECT key, token FROM tokens"))
+
+    def get(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT token FROM tokens WHERE key = ?", (key,)).fetchone()
+        return None if row is None else str(row[0])
+
+    def write(self, items: dict[str, str], store: dict[str, str]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tokens (key, token) VALUES (?, ?)", items.items()
+            )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+Backend = JsonBackend | LogBackend | SqliteBackend
+
+
+def _log_lines(items: Iterable[tuple[str, str]]) -> Iterator[str]:
+    for key, token in items:
+        yield json.dumps({"k": key, "v": token}) + "\n"
+
+
+def default_store_path() -> str:
+    """``.tokens.json`` when an earlier release created one, else ``.tokens.jsonl``."""
+    return LEGACY_STORE if os.path.exists(LEGACY_STORE) else DEFAULT_STORE
+
+
+def open_backend(path: str, backend: str | None = None) -> Backend:
+    """Pick a backend by name ("json", "log", "sqlite") or by the file suffix."""
+    lower = path.lower()
+    if backend == "sqlite" or (backend is None and lower.endswith(_SQLITE_SUFFIXES)):
+        return SqliteBackend(path)
+    if backend == "log" or (backend is None and lower.endswith(_LOG_SUFFIXES)):
+        return LogBackend(path)
+    if backend in (None, "json"):
+        return JsonBackend(path)
+    raise ValueError(f"Unknown token store backend: {backend}")
+
+
+class TokenStore:
+    def __init__(
+        self,
+        path: str | None = None,
+        backend: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        read_only: bool = False,
+    ) -> None:
+        self.path = path or default_store_path()
+        self.backend = open_backend(self.path, backend)
+        self.batch_size = batch_size
+        # Read-only stores (parallel workers) never write; their new mappings are
+        # collected with drain_new() and merged by the owner of the writable store.
+        self.read_only = read_only
+        self._store: dict[str, str] = {}
+        self._pending: dict[str, str] = {}
+        self._loaded = False
+        # One store may be shared by threads (mask-dir); all access goes through this
+        self._lock = threading.RLock()
+        # Set to a Stats to count hits/misses and time flushes (--stats)
+        self.stats: Stats | None = None
+        # Flushed at exit unless closed first. The hook holds a weak reference so
+        # dropped stores can be collected; __del__ flushes those instead.
+        self._exit_hook: Callable[[], None] | None = None
+        if not read_only:
+            self._exit_hook = partial(_flush_at_exit, weakref.ref(self))
+            atexit.register(self._exit_hook)
+
+    def _load(self) -> None:
+        # Deferred until the first lookup; lazy backends are queried per key instead
+        if not self._loaded:
+            self._loaded = True
+            if not self.backend.lazy:
+                self._store = self.backend.load()
+
+    def flush(self) -> None:
+        """Write buffered new mappings to the backend.
+
+        Errors from the backend propagate; the mappings stay buffered, so a
+        later flush retries them.
+        """
+        with self._lock:
+            if not self._pending or self.read_only:
+                return
+            start = perf_counter()
+            self.backend.write(self._pending, self._store)
+            if self.stats is not None:
+                self.stats.add("tokens.flush", perf_counter() - start, written=len(self._pending))
+            self._pending = {}
+
+    # Kept for callers of the pre-batching API
+    save = flush
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self.backend.close()
+        if self._exit_hook is not None:
+            atexit.unregister(self._exit_hook)
+            self._exit_hook = None
+
+    def __del__(self) -> None:
+        if getattr(self, "_pending", None) and not self.read_only:
+            self.flush()
+
+    def drain_new(self) -> dict[str, str]:
+        """Return and forget the mappings created since the last flush or drain."""
+        with self._lock:
+            new, self._pending = self._pending, {}
+        return new
+
+    def items(self) -> dict[str, str]:
+        """Return every stored mapping, including ones not flushed yet."""
+        with self._lock:
+            self._load()
+            stored = self.backend.load() if self.backend.lazy else {}
+            return {**stored, **self._store}
+
+    def update(self, mappings: dict[str, str]) -> None:
+        """Add mappings produced elsewhere (another store, a worker) to this store."""
+        with self._lock:
+            self._load()
+            new = {k: v for k, v in mappings.items() if k not in self._store}
+            self._store.update(new)
+            self._pending.update(new)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
 
     def tokenize(self, value: str) -> str:
-        key = f"tok::{value}"
-        if key not in self._store:
-            # stable short token (8 hex)
-            digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:8]
-            self._store[key] = f"TOK-{digest}"
-            self.save()
-        return self._store[key]
+        with self._lock:
+            self._load()
+            key = f"tok::{value}"
+            token = self._store.get(key)
+            if token is None and self.backend.lazy:
+                token = self.backend.get(key)
+                if token is not None:
+                    self._store[key] = token
+            if self.stats is not None:
+                self.stats.add("tokens", hits=int(token is not None), misses=int(token is None))
+            if token is None:
+                # stable short token (8 hex)
+                digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:8]
+                token = self._store[key] = self._pending[key] = f"TOK-{digest}"
+                if len(self._pending) >= self.batch_size and not self.read_only:
+                    self.flush()
+            return token
+
+
+def _flush_at_exit(ref: weakref.ref[TokenStore]) -> None:
+    store = ref()
+    if store is not None:
+        store.flush()
+
+
+def migrate(src: str, dst: str, backend: str | None = None) -> int:
+    """Copy every mapping from the store at *src* into *dst*; returns the count."""
+    source = TokenStore(src)
+    target = TokenStore(dst, backend=backend)
+    mappings = source.items()
+    target.update(mappings)
+    target.close()
+    source.close()
+    return len(mappings)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import ipaddress
+import re
+from collections.abc import Sequence
+from re import Pattern
+from typing import TYPE_CHECKING
+
+from .pii_patterns import IPV6
+
+# numpy is only needed by the *_batch validators, which import it themselves
+if TYPE_CHECKING:
+    import numpy as np
+
+MIN_CC_DIGITS = 13
+# Luhn doubling table: digit d -> 2d, minus 9 when that is over 9
+_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+_DOUBLE_DIGITS = bytes.maketrans(b"0123456789", b"0246813579")
+_NON_DIGITS = bytes(sorted(set(range(256)) - set(b"0123456789")))
+_ZERO = ord("0")
+# IBAN letters as their mod-97 numbers, A=10 ... Z=35
+_IBAN_LETTERS = {ord(ch): str(ord(ch) - 55) for ch in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}
+_IBAN_TOKEN = re.compile(r"[A-Z]{2}[0-9]{2}[A-Z0-9]{10,30}")
+# Digits folded into the running mod-97 remainder at a time; stays well within a machine int
+_MOD97_CHUNK = 9
+# Longest textual IPv6 address (with an embedded IPv4 tail)
+_MAX_IPV6_LENGTH = 45
+_MAX_IPV6_GROUPS = 8
+
+
+def _ascii_digits(text: str) -> bytes:
+    return text.encode().translate(None, _NON_DIGITS)
+
+
+def luhn_valid(text: str) -> bool:
+    """Luhn checksum over all digits in *text* (at least 13 of them)."""
+    if not text.isascii():
+        # \d also matches non-ASCII digits; checked one by one
+        digits = [int(ch) for ch in text if ch.isdigit()]
+        if len(digits) < MIN_CC_DIGITS:
+            return False
+        total = sum(digits[-1::-2]) + sum(_DOUBLED[d] for d in digits[-2::-2])
+        return total % 10 == 0
+    raw = _ascii_digits(text)
+    if len(raw) < MIN_CC_DIGITS:
+        return False
+    # bytes sum to their ASCII codes; take the '0' offset off once
+    total = sum(raw[-1::-2]) + sum(raw[-2::-2].translate(_DOUBLE_DIGITS)) - _ZERO * len(raw)
+    return total % 10 == 0
+
+
+def luhn_valid_batch(texts: Sequence[str]) -> np.ndarray:
+    """``luhn_valid`` over *texts*, checking same-length digit runs as one array."""
+    import numpy as np  # noqa: PLC0415
+
+    table = np.array(_DOUBLED, dtype=np.int64)
+    valid = np.zeros(len(texts), dtype=bool)
+    by_length: dict[int, tuple[list[int], list[bytes]]] = {}
+    for pos, text in enumerate(texts):
+        if not text.isascii():
+            valid[pos] = luhn_valid(text)
+            continue
+        raw = _ascii_digits(text)
+        if len(raw) >= MIN_CC_DIGITS:
+            positions, runs = by_length.setdefault(len(raw), ([], []))
+            positions.append(pos)
+            runs.append(raw)
+    for length, (positions, runs) in by_length.items():
+        digits = (np.frombuffer(b"".join(runs), dtype=np.uint8) - _ZERO).reshape(-1, length)
+        # Counting from the right, the check digit is kept and every second digit
+        # before it doubled
+        kept = digits[:, (length - 1) % 2 :: 2]
+        doubled = digits[:, length % 2 :: 2]
+        totals = kept.sum(axis=1, dtype=np.int64) + table[doubled].sum(axis=1)
+        valid[positions] = totals % 10 == 0
+    return valid
+
+
+def iban_mod97(iban: str) -> bool:
+    """ISO 7064 mod-97 check of an IBAN, folded in chunks of digits."""
+    digits = (iban[4:] + iban[:4]).upper().translate(_IBAN_LETTERS)
+    remainder = 0
+    for start in range(0, len(digits), _MOD97_CHUNK):
+        remainder = int(f"{remainder}{digits[start : start + _MOD97_CHUNK]}") % 97
+    return remainder == 1
+
+
+def iban_valid(text: str) -> bool:
+    """True when any IBAN-shaped token in *text* passes the mod-97 check."""
+    return any(iban_mod97(token) for token in _IBAN_TOKEN.findall(text.upper()))
+
+
+def iban_valid_batch(texts: Sequence[str]) -> np.ndarray:
+    import numpy as np  # noqa: PLC0415
+
+    return np.fromiter((iban_valid(t) for t in texts), dtype=bool, count=len(texts))
+
+
+def _ipv6_shape(token: str) -> bool:
+    # Cheap necessary conditions; tokens passing them still get the strict parse
+    address = token.split("%", 1)[0]
+    if len(address) > _MAX_IPV6_LENGTH or ":::" in address:
+        return False
+    compressed = address.count("::")
+    if compressed > 1:
+        return False
+    groups = sum(1 for group in address.split(":") if group)
+    if "." in address:
+        # an IPv4 tail stands for two groups
+        groups += 1
+    return groups < _MAX_IPV6_GROUPS if compressed else groups == _MAX_IPV6_GROUPS
+
+
+def _is_address_char(ch: str) -> bool:
+    return ch.isalnum() or ch in ":.%"
+
+
+def ipv6_valid(text: str, pattern: Pattern[str] = IPV6) -> bool:
+    """True when a span of *text* matched by *pattern* is a valid IPv6 address.
+
+    Each match is widened to the address-like token around it, so a valid
+    prefix of a longer token (``fe80::1::2``, ``2001:db8::zz``) doesn't count.
+    """
+    checked = 0
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if start < checked:
+            continue
+        while start and _is_address_char(text[start - 1]):
+            start -= 1
+        while end < len(text) and _is_address_char(text[end]):
+            end += 1
+        checked = end
+        token = text[start:end]
+        if not _ipv6_shape(token):
+            continue
+        try:
+            ipaddress.IPv6Address(token)
+        except ValueError:
+            continue
+        return True
+    return False
+
+
+def ipv6_valid_batch(texts: Sequence[str], pattern: Pattern[str] = IPV6) -> np.ndarray:
+    import numpy as np  # noqa: PLC0415
+
+    return np.fromiter((ipv6_valid(t, pattern) for t in texts), dtype=bool, count=len(texts))
@@ -0,0 +1,107 @@
+import json
+
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from data_masker.cli import main
+from data_masker.io_utils import iter_table_chunks, open_chunk_writer
+
+pytest.importorskip("pyarrow")
+
+ROWS = 10
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": list(range(ROWS)),
+        "email": [f"u{i}@example.com" if i % 2 else None for i in range(ROWS)],
+        "amount": [i * 1.5 for i in range(ROWS)],
+    })
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_batches_with_projection(tmp_path, suffix):
+    path = tmp_path / f"data{suffix}"
+    df = _frame()
+    if suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
+    chunks = list(iter_table_chunks(str(path), chunksize=4, columns=["email"]))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert all(list(c.columns) == ["email"] for c in chunks)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_chunked_mask_keeps_types(tmp_path, suffix):
+    src = tmp_path / f"data{suffix}"
+    out = tmp_path / f"out{suffix}"
+    if suffix == ".parquet":
+        _frame().to_parquet(src, index=False)
+    else:
+        _frame().to_feather(src)
+    plan = tmp_path / "plan.json"
+    res = CliRunner().invoke(main, ["scan", str(src), "--export-plan", str(plan)])
+    assert res.exit_code == 0, res.output
+    # Columns the plan marks clean keep their type; the rest may hold masked text
+    res = CliRunner().invoke(
+        main, ["mask", str(src), "-o", str(out), "--chunksize", "3", "--plan", str(plan)]
+    )
+    assert res.exit_code == 0, res.output
+    masked = pd.read_parquet(out) if suffix == ".parquet" else pd.read_feather(out)
+    assert masked["id"].tolist() == list(range(ROWS))
+    assert str(masked["amount"].dtype) == "float64"
+    assert masked["email"].dropna().eq("[REDACTED]").all()
+
+
+def test_chunked_mask_without_plan_keeps_types(tmp_path):
+    src, out = tmp_path / "data.parquet", tmp_path / "out.parquet"
+    _frame().to_parquet(src, index=False)
+    res = CliRunner().invoke(main, ["mask", str(src), "-o", str(out), "--chunksize", "2"])
+    assert res.exit_code == 0, res.output
+    masked = pd.read_parquet(out)
+    assert masked.dtypes.astype(str).to_dict() == {
+        "id": "int64", "email": "str", "amount": "float64",
+    }
+    assert masked["email"].dropna().eq("[REDACTED]").all()
+
+
+def test_chunked_mask_of_typed_column_masked_late(tmp_path):
+    # The first chunks are plain ints; only the last row holds a card number
+    src, out = tmp_path / "data.parquet", tmp_path / "out.parquet"
+    values = [1000, 2000, 3000, 4000, 4111111111111111]
+    pd.DataFrame({"n": values}).to_parquet(src, index=False)
+    args = [
+        "mask", str(src), "-o", str(out), "--chunksize", "3",
+        "--token-store", str(tmp_path / "t.json"),
+    ]
+    res = CliRunner().invoke(main, args)
+    assert res.exit_code != 0
+    assert "column strategy" in res.output
+    # A plan that flags the column writes it as text from the first chunk
+    plan = tmp_path / "plan.json"
+    CliRunner().invoke(main, ["scan", str(src), "--export-plan", str(plan)])
+    res = CliRunner().invoke(main, [*args, "--plan", str(plan)])
+    assert res.exit_code == 0, res.output
+    masked = pd.read_parquet(out)["n"].tolist()
+    assert masked[:4] == ["1000", "2000", "3000", "4000"]
+    assert masked[4].startswith("TOK-")
+
+
+def test_scan_parquet_columns(tmp_path):
+    src = tmp_path / "data.parquet"
+    _frame().to_parquet(src, index=False)
+    res = CliRunner().invoke(
+        main, ["scan", str(src), "--as-json", "--chunksize", "4", "--columns", "email,id"]
+    )
+    assert res.exit_code == 0
+    assert json.loads(res.output)["columns"] == {"email": {"email": ROWS // 2}}
+
+
+def test_arrow_writer_casts_later_chunks(tmp_path):
+    path = tmp_path / "out.parquet"
+    with open_chunk_writer(str(path)) as writer:
+        writer.write(pd.DataFrame({"a": [None, None]}))
+        writer.write(pd.DataFrame({"a": ["x", 1]}))
+    assert pd.read_parquet(path)["a"].tolist()[2:] == ["x", "1"]
@@ -0,0 +1,84 @@
+import json
+import threading
+
+import pandas as pd
+from click.testing import CliRunner
+
+from data_masker.cli import main
+from data_masker.token_store import TokenStore
+
+FILES = 4
+ROWS = 30
+THREADS = 8
+
+
+def _write_drop(root):
+    (root / "sub").mkdir(parents=True)
+    for i in range(FILES):
+        folder = root / "sub" if i % 2 else root
+        lines = ["id,email,note"] + [f"{j},user{j}@example.com,n{i}" for j in range(ROWS)]
+        (folder / f"part{i}.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    (root / "readme.txt").write_text("not data", encoding="utf-8")
+
+
+def test_scan_dir_aggregates_report(tmp_path):
+    src = tmp_path / "drop"
+    _write_drop(src)
+    (src / "broken.json").write_text("{not json", encoding="utf-8")
+    report_path = tmp_path / "report.json"
+    res = CliRunner().invoke(main, [
+        "scan-dir", str(src), "--recursive", "--jobs", "3", "--export-json", str(report_path),
+    ])
+    assert res.exit_code == 1
+    report = json.loads(report_path.read_text())
+    assert len(report["files"]) == FILES
+    assert report["totals"] == {"email": FILES * ROWS}
+    assert list(report["errors"]) == [str(src / "broken.json")]
+
+
+def test_mask_dir_shares_tokens_across_files(tmp_path):
+    src = tmp_path / "drop"
+    _write_drop(src)
+    rules = tmp_path / "rules.yml"
+    rules.write_text("strategies:\n  email: tokenize\n", encoding="utf-8")
+    out = tmp_path / "out"
+    store = tmp_path / "tokens.jsonl"
+    res = CliRunner().invoke(main, [
+        "mask-dir", str(src), "-o", str(out), "-r", str(rules), "--recursive",
+        "--pattern", "*.csv", "--jobs", "3", "--token-store", str(store), "--chunksize", "10",
+    ])
+    assert res.exit_code == 0, res.output
+    first = pd.read_csv(out / "part0.csv")
+    second = pd.read_csv(out / "sub" / "part1.csv")
+    assert first["email"].str.startswith("TOK-").all()
+    assert first["email"].tolist() == second["email"].tolist()
+    assert len(store.read_text().splitlines()) == ROWS
+
+
+def test_token_store_is_thread_safe(tmp_path):
+    tokens = TokenStore(str(tmp_path / "t.jsonl"), batch_size=7)
+
+    def work(offset):
+        for j in range(ROWS * 10):
+            tokens.tokenize(f"v{(j + offset) % (ROWS * 10)}")
+
+    threads = [threading.Thread(target=work, args=(i * 13,)) for i in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    tokens.close()
+    assert len(TokenStore(str(tmp_path / "t.jsonl")).items()) == ROWS * 10
+    assert len((tmp_path / "t.jsonl").read_text().splitlines()) == ROWS * 10
+
+
+def test_mask_dir_into_its_own_source_keeps_inputs(tmp_path):
+    src = tmp_path / "drop"
+    _write_drop(src)
+    for extra in (["--chunksize", "7"], []):
+        res = CliRunner().invoke(main, ["mask-dir", str(src), "-o", str(src), *extra])
+        assert res.exit_code == 0, res.output
+        masked = pd.read_csv(src / "part0.csv")
+        assert len(masked) == ROWS
+        assert (masked["email"] == "[REDACTED]").all()
+    assert sorted(p.name for p in src.iterdir()) == ["part0.csv", "part2.csv", "readme.txt", "sub"]
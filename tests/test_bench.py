@@ -0,0 +1,43 @@
+import json
+
+from click.testing import CliRunner
+
+from data_masker.bench import compare, generate_dataset
+from data_masker.cli import main
+from data_masker.detectors import Detector
+from data_masker.pii_patterns import DEFAULT_PATTERNS
+
+ROWS = 400
+WIDTH = 10
+
+
+def test_generated_data_covers_every_type_with_invalid_checksums():
+    df = generate_dataset(ROWS, width=WIDTH, density=1.0, seed=1)
+    assert list(df.columns)[: len(DEFAULT_PATTERNS)] == list(DEFAULT_PATTERNS)
+    assert len(df.columns) == WIDTH
+    det = Detector()
+    for kind in ("email", "ssn", "ipv4", "ipv6"):
+        assert det.detect_series(df[kind])[kind] == ROWS
+    # a share of cards and IBANs is generated with a bad checksum
+    for kind in ("credit_card", "iban"):
+        assert 0 < det.detect_series(df[kind])[kind] < ROWS
+
+
+def test_compare_flags_slowdowns_only():
+    baseline = {"results": {"a": {"rows_per_sec": 100.0}, "b": {"rows_per_sec": 100.0}}}
+    report = {"results": {"a": {"rows_per_sec": 70.0}, "b": {"rows_per_sec": 95.0}}}
+    regressions = compare(report, baseline, tolerance=0.2)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("a:")
+
+
+def test_bench_command_writes_results(tmp_path):
+    out = tmp_path / "bench.json"
+    res = CliRunner().invoke(
+        main, ["bench", "--rows", "50", "--repeat", "1", "--chunksize", "20", "-o", str(out)]
+    )
+    assert res.exit_code == 0, res.output
+    results = json.loads(out.read_text())["results"]
+    assert {"detect_series", "mask_cell.hash", "token_store.tokenize", "e2e.mask.chunked"} <= set(
+        results
+    )
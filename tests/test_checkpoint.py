@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from data_masker import checkpoint
+from data_masker.cli import main
+
+CHUNKSIZE = 3
+ROWS = 20
+COMMITTED = 2
+
+
+def _write_input(path):
+    lines = ["id,email,note"]
+    lines += [f'{i},user{i}@example.com,"line {i}\nsecond"' for i in range(ROWS)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def _mask(src, out, ckpt, *extra):
+    args = ["mask", str(src), "-o", str(out), "--chunksize", str(CHUNKSIZE)]
+    args += ["--checkpoint", str(ckpt), "--token-store", str(src.parent / "t.jsonl"), *extra]
+    return CliRunner().invoke(main, args)
+
+
+def _interrupt_after(monkeypatch, chunks):
+    real = checkpoint.mask_chunks
+
+    def failing(frames, masker, workers=1):
+        for n, chunk in enumerate(real(frames, masker, workers)):
+            if n == chunks:
+                raise RuntimeError("killed")
+            yield chunk
+
+    monkeypatch.setattr(checkpoint, "mask_chunks", failing)
+
+
+def test_resumed_run_matches_uninterrupted_run(tmp_path, monkeypatch):
+    src = tmp_path / "in.csv"
+    _write_input(src)
+    full = tmp_path / "full.csv"
+    assert _mask(src, full, tmp_path / "full.ckpt").exit_code == 0
+    assert not (tmp_path / "full.ckpt").exists()
+
+    out, ckpt = tmp_path / "out.csv", tmp_path / "out.ckpt"
+    _interrupt_after(monkeypatch, COMMITTED)
+    assert _mask(src, out, ckpt).exit_code != 0
+    state = json.loads(ckpt.read_text())
+    assert state["chunks"] == COMMITTED
+    assert state["rows"] == COMMITTED * CHUNKSIZE
+    # A torn write past the committed chunks is cut off on resume
+    with open(out, "a") as f:
+        f.write("9,partial")
+    monkeypatch.undo()
+    res = _mask(src, out, ckpt)
+    assert res.exit_code == 0
+    assert f"resumed after {COMMITTED} chunk(s)" in res.output
+    assert out.read_bytes() == full.read_bytes()
+    assert not ckpt.exists()
+
+
+def test_checkpoint_for_another_input_is_refused(tmp_path, monkeypatch):
+    src = tmp_path / "in.csv"
+    _write_input(src)
+    out, ckpt = tmp_path / "out.csv", tmp_path / "out.ckpt"
+    _interrupt_after(monkeypatch, 1)
+    assert _mask(src, out, ckpt).exit_code != 0
+    monkeypatch.undo()
+    with open(src, "a") as f:
+        f.write("99,new@example.com,x\n")
+    res = _mask(src, out, ckpt)
+    assert res.exit_code != 0
+    assert "different run" in res.output
+    assert "input_size" in res.output
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".xlsx"])
+def test_checkpoint_needs_byte_addressable_files(tmp_path, suffix):
+    src = tmp_path / "in.csv"
+    _write_input(src)
+    res = _mask(src, tmp_path / f"out{suffix}", tmp_path / "out.ckpt")
+    assert res.exit_code != 0
+    assert "--checkpoint" in res.output
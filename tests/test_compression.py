@@ -0,0 +1,71 @@
+import bz2
+import gzip
+import lzma
+
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from data_masker.cli import main
+from data_masker.io_utils import iter_table_chunks, read_table
+from data_masker.streams import ReadAhead, detect_compression, detect_kind, temp_path_for
+
+ROWS = 2500
+CHUNKSIZE = 1000
+CSV = "id,email\n" + "".join(f"{i},user{i}@example.com\n" for i in range(ROWS))
+OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+NAMES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+
+@pytest.mark.parametrize("suffix", list(OPENERS))
+def test_compressed_csv_is_read_whole_and_in_chunks(tmp_path, suffix):
+    src = tmp_path / f"people.csv{suffix}"
+    with OPENERS[suffix](src, "wt") as f:
+        f.write(CSV)
+    assert detect_kind(str(src)) == "csv"
+    df, kind = read_table(str(src))
+    assert (kind, len(df)) == ("csv", ROWS)
+    chunks = list(iter_table_chunks(str(src), chunksize=CHUNKSIZE))
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+    # Magic bytes give the compression of a file without the suffix
+    plain_name = tmp_path / "people.csv"
+    plain_name.write_bytes(src.read_bytes())
+    assert detect_compression(str(plain_name)) == NAMES[suffix]
+    assert len(read_table(str(plain_name))[0]) == ROWS
+
+
+def test_mask_writes_one_compressed_stream(tmp_path):
+    src = tmp_path / "people.csv.gz"
+    with gzip.open(src, "wt") as f:
+        f.write(CSV)
+    for args in (["--chunksize", str(CHUNKSIZE)], ["--engine", "stream"], []):
+        out = tmp_path / "masked.ndjson.xz" if not args else tmp_path / "masked.csv.bz2"
+        res = CliRunner().invoke(
+            main, ["mask", str(src), "-o", str(out), "--compression-level", "1", *args]
+        )
+        assert res.exit_code == 0, res.output
+        opener = lzma.open if out.suffix == ".xz" else bz2.open
+        with opener(out, "rt") as f:
+            text = f.read()
+        assert "@example.com" not in text
+        assert text.count("[REDACTED]") == ROWS
+    args = ["mask", str(src), "-o", str(src), "--inplace", "--chunksize", "500"]
+    res = CliRunner().invoke(main, args)
+    assert res.exit_code == 0
+    assert pd.read_csv(src)["email"].eq("[REDACTED]").all()
+    assert temp_path_for(str(src)).endswith(".people.csv.tmp.gz")
+
+
+def test_read_ahead_passes_errors_and_closes_early(tmp_path):
+    src = tmp_path / "big.csv.gz"
+    with gzip.open(src, "wb") as f:
+        f.write(b"x" * (5 << 20))
+    reader = ReadAhead(gzip.open(src, "rb"))  # noqa: SIM115
+    assert reader.read(10) == b"x" * 10
+    reader.close()
+    assert not reader._thread.is_alive()
+    (tmp_path / "bad.csv.gz").write_bytes(b"\x1f\x8bnot gzip at all")
+    with pytest.raises(OSError):
+        read_table(str(tmp_path / "bad.csv.gz"))
+    with pytest.raises(ValueError, match="Compressed parquet"):
+        detect_kind("data.parquet.gz")
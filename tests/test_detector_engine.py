@@ -0,0 +1,91 @@
+import re
+from typing import Any
+
+import pandas as pd
+
+from data_masker.detectors import Detector
+from data_masker.pii_patterns import DEFAULT_PATTERNS
+
+SAMPLES = [
+    "alice@example.com",
+    "202-555-0133",
+    "4111 1111 1111 1111",
+    "1234567890123456",
+    "123-45-6789",
+    "192.168.0.1",
+    "2001:0db8:85a3:0000:0000:8a2e:0370:7334",
+    "12:30:45",
+    "GB82WEST12345698765432",
+    "GB00WEST12345698765432",
+    "Hello World",
+    "contact bob@example.org or 202 555 0199",
+    "",
+    "٣٣٣-٤٤-٥٥٥٥",
+]
+
+
+def naive_hits(det: Detector, text: str) -> list[str]:
+    # Reference implementation: every pattern searched on every cell
+    hits = []
+    for name, pattern in det.patterns.items():
+        if pattern.search(text):
+            if name == "credit_card" and not det._passes_luhn(text):
+                continue
+            if name == "ipv6" and not det._valid_ipv6(text):
+                continue
+            if name == "iban" and not det._valid_iban(text):
+                continue
+            hits.append(name)
+    return hits
+
+
+def test_engine_matches_naive_scan():
+    det = Detector()
+    for text in SAMPLES:
+        assert det.detect_cell(text) == naive_hits(det, text)
+    counts = det.detect_series(pd.Series(SAMPLES))
+    expected = {k: 0 for k in DEFAULT_PATTERNS}
+    for text in SAMPLES:
+        for name in naive_hits(det, text):
+            expected[name] += 1
+    assert counts == expected
+
+
+def test_prefilter_skips_regex_calls():
+    det = Detector()
+    calls = {"n": 0}
+
+    class Counting:
+        def __init__(self, pattern: Any) -> None:
+            self.pattern = pattern
+
+        def search(self, text: str) -> Any:
+            calls["n"] += 1
+            return self.pattern.search(text)
+
+    det._engine = [(n, Counting(p), pf, v) for n, p, pf, v in det._engine]
+    det.detect_cell("Hello World")
+    assert calls["n"] == 0
+    det.detect_cell("alice@example.com")
+    assert calls["n"] == 1
+
+
+def test_custom_patterns_are_not_prefiltered():
+    det = Detector({"email": re.compile(r"x")})
+    assert det.detect_cell("x") == ["email"]
+
+
+def test_vectorized_series_matches_per_cell_counts():
+    mixed = pd.Series(SAMPLES * 3 + [None, float("nan"), 4111111111111111, 1.5], dtype=object)
+    for series in (pd.Series(SAMPLES * 5), mixed, pd.Series([1.0, None, 2.5])):
+        assert Detector(vectorized=True).detect_series(series) == Detector(
+            vectorized=False
+        ).detect_series(series)
+
+
+def test_vectorized_datetimes_are_stringified_like_cells():
+    # all midnights: astype("string") would drop the time of day
+    stamps = pd.Series(pd.to_datetime(["2020-01-01", "2020-01-02", None]))
+    clock = {"clock": re.compile(r"\d\d:\d\d:\d\d")}
+    for vectorized in (True, False):
+        assert Detector(clock, vectorized=vectorized).detect_series(stamps) == {"clock": 2}
@@ -0,0 +1,111 @@
+import json
+import random
+from pathlib import Path
+
+import pandas as pd
+from click.testing import CliRunner
+
+from data_masker import dictionaries
+from data_masker.cli import main
+from data_masker.detectors import Detector
+from data_masker.dictionaries import TermDictionary, load_dictionary
+from data_masker.rules import Rules
+
+CASES = 2000
+
+
+def _naive_end(text, terms, whole):
+    ends = []
+    for term in terms:
+        start = text.find(term)
+        while start != -1:
+            end = start + len(term)
+            before = start == 0 or not text[start - 1].isalnum()
+            after = end == len(text) or not text[end].isalnum()
+            if not whole or (before and after):
+                ends.append(end)
+            start = text.find(term, start + 1)
+    return min(ends, default=None)
+
+
+def test_automaton_matches_naive_search():
+    rng = random.Random(0)
+    terms = sorted({"".join(rng.choice("ab c") for _ in range(rng.randint(1, 4))).strip()
+                    for _ in range(200)} - {""})
+    for whole in (False, True):
+        automaton = TermDictionary(terms, whole_words=whole)
+        for _ in range(CASES):
+            text = "".join(rng.choice("ab cx") for _ in range(rng.randint(0, 16)))
+            found = automaton.search(text)
+            assert (found and found[1]) == _naive_end(text, terms, whole)
+    assert TermDictionary(["Alice"]).search("hi ALICE!") == (3, 8)
+    assert TermDictionary(["Alice"], case_sensitive=True).search("hi ALICE!") is None
+
+
+def _rules(tmp_path, extra=""):
+    (tmp_path / "names.txt").write_text("# staff\nAda Lovelace\nGrace Hopper\n", encoding="utf-8")
+    rules = tmp_path / "rules.yml"
+    rules.write_text(
+        "dictionaries:\n  employee: names.txt\nstrategies:\n  employee: tokenize\n" + extra,
+        encoding="utf-8",
+    )
+    return rules
+
+
+def test_dictionary_types_scan_and_mask(tmp_path):
+    rules = _rules(tmp_path)
+    src = tmp_path / "in.csv"
+    src.write_text("owner,note\nAda Lovelace,ok\nBob,cc grace hopper\nAdam,x\n", encoding="utf-8")
+    res = CliRunner().invoke(main, ["scan", str(src), "-r", str(rules), "--as-json"])
+    assert json.loads(res.output)["columns"] == {"owner": {"employee": 1}, "note": {"employee": 1}}
+    out = tmp_path / "out.csv"
+    res = CliRunner().invoke(main, [
+        "mask", str(src), "-o", str(out), "-r", str(rules),
+        "--token-store", str(tmp_path / "t.jsonl"),
+    ])
+    assert res.exit_code == 0, res.output
+    masked = pd.read_csv(out)
+    assert masked["owner"].tolist()[0].startswith("TOK-")
+    assert masked["owner"].tolist()[1:] == ["Bob", "Adam"]
+
+
+def test_automaton_is_cached_on_disk(tmp_path, monkeypatch):
+    rules = Rules.load(str(_rules(tmp_path)))
+    spec = rules.dictionaries["employee"]
+    cache_dir = rules.options["dictionary_cache"]
+    first = load_dictionary(spec, cache_dir)
+
+    def no_rebuild(paths):
+        raise AssertionError("term files re-read")
+
+    monkeypatch.setattr(dictionaries, "read_terms", no_rebuild)
+    assert load_dictionary(spec, cache_dir).key == first.key
+    monkeypatch.undo()
+    (tmp_path / "names.txt").write_text("Alan Turing\n", encoding="utf-8")
+    changed = load_dictionary(spec, cache_dir)
+    assert changed.key != first.key
+    assert changed.search("alan turing") is not None
+
+
+def test_cache_is_plain_json_and_damaged_files_are_rebuilt(tmp_path):
+    rules = Rules.load(str(_rules(tmp_path)))
+    spec = rules.dictionaries["employee"]
+    cache_dir = rules.options["dictionary_cache"]
+    first = load_dictionary(spec, cache_dir)
+    (cache_file,) = Path(cache_dir).iterdir()
+    assert cache_file.suffix == ".json"
+    assert json.loads(cache_file.read_text(encoding="utf-8"))["key"] == first.key
+    # A cache with links to missing states is ignored, not trusted
+    state = first.to_state()
+    state["fail"] = [len(state["fail"])] * len(state["fail"])
+    cache_file.write_text(json.dumps(state), encoding="utf-8")
+    rebuilt = load_dictionary(spec, cache_dir)
+    assert rebuilt.search("ada lovelace") == first.search("ada lovelace")
+
+
+def test_dictionary_can_be_disabled(tmp_path):
+    rules = Rules.load(str(_rules(tmp_path, "detectors:\n  enable_employee: false\n")))
+    assert "employee" not in Detector.from_rules(rules).types
+    assert Detector.from_rules(Rules.load(str(_rules(tmp_path)))).detect_cell("Ada Lovelace") == [
+        "employee"
+    ]
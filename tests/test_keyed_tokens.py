@@ -0,0 +1,70 @@
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from data_masker.cli import main
+from data_masker.keyed_tokens import DEFAULT_TOKEN_LENGTH, TOKEN_PREFIX, KeyedTokenizer
+from data_masker.masker import Masker
+from data_masker.rules import Rules
+from data_masker.token_store import TokenStore
+
+
+def _masker(tmp_path, name="t.jsonl", **options):
+    r = Rules.load(None)
+    r.columns["ssn"] = {"strategy": "tokenize_keyed"}
+    r.options.update(options)
+    return Masker(r, token_store=TokenStore(str(tmp_path / name)))
+
+
+def test_keyed_tokens_are_stable_without_a_store(tmp_path):
+    first = _masker(tmp_path, "a.jsonl", token_key="secret")
+    second = _masker(tmp_path, "b.jsonl", token_key="secret")
+    other = _masker(tmp_path, "c.jsonl", token_key="another secret")
+    token = first.mask_cell("123-45-6789", column="ssn")
+    assert token.startswith(TOKEN_PREFIX)
+    assert len(token) == len(TOKEN_PREFIX) + DEFAULT_TOKEN_LENGTH
+    assert second.mask_strings(["123-45-6789"], "ssn") == [token]
+    assert other.mask_cell("123-45-6789", column="ssn") != token
+    for m in (first, second, other):
+        m.tokens.close()
+    assert not any(os.path.exists(tmp_path / n) for n in ("a.jsonl", "b.jsonl", "c.jsonl"))
+
+
+def test_preserve_format_keeps_shape():
+    tok = KeyedTokenizer(b"secret", "preserve")
+    out = tok.tokenize("Ann-123 45@x.io")
+    assert len(out) == len("Ann-123 45@x.io")
+    assert out[0].isupper() and out[1:3].islower()
+    assert out[4:7].isdigit() and out[8:10].isdigit()
+    assert (out[3], out[7], out[10], out[12]) == ("-", " ", "@", ".")
+    assert out != "Ann-123 45@x.io"
+    assert tok.tokenize_batch(["Ann-123 45@x.io"]) == [out]
+    SHORT = 10
+    assert len(KeyedTokenizer(b"secret", length=SHORT).tokenize("x")) == len(TOKEN_PREFIX) + SHORT
+
+
+def test_key_from_environment_and_missing_key(tmp_path, monkeypatch):
+    monkeypatch.delenv("DATA_MASKER_TOKEN_KEY", raising=False)
+    with pytest.raises(ValueError, match="needs a key"):
+        _masker(tmp_path)
+    src = tmp_path / "in.csv"
+    src.write_text("ssn\n123-45-6789\n")
+    rules = tmp_path / "rules.yml"
+    rules.write_text("columns:\n  ssn:\n    strategy: tokenize_keyed\n")
+    args = ["mask", str(src), "-o", str(tmp_path / "out.csv"), "-r", str(rules)]
+    res = CliRunner().invoke(main, args)
+    assert res.exit_code != 0
+    assert "needs a key" in res.output
+    monkeypatch.setenv("DATA_MASKER_TOKEN_KEY", "secret")
+    res = CliRunner().invoke(main, args)
+    assert res.exit_code == 0
+    expected = KeyedTokenizer(b"secret").tokenize("123-45-6789")
+    assert (tmp_path / "out.csv").read_text().splitlines() == ["ssn", expected]
+
+
+def test_optional_store_for_reverse_lookup(tmp_path):
+    m = _masker(tmp_path, token_key="secret", keyed_token_store=True)
+    token = m.mask_cell("123-45-6789", column="ssn")
+    m.tokens.close()
+    assert TokenStore(str(tmp_path / "t.jsonl")).items() == {"keyed::123-45-6789": token}
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_masker.masker import Masker
+from data_masker.rules import Rules
+from data_masker.token_store import TokenStore
+
+VALUES = [
+    "alice@example.com",
+    "202-555-0133",
+    "4111 1111 1111 1111",
+    "hello",
+    "alice@example.com",
+    None,
+    np.nan,
+    "ab",
+    7,
+]
+
+
+@pytest.mark.parametrize("strategy", ["redact", "hash", "tokenize", "partial", "null"])
+def test_mask_column_matches_mask_cell(tmp_path, strategy):
+    r = Rules.load(None)
+    r.strategies.update({"default": strategy, "email": strategy, "phone": strategy})
+    r.columns["ssn"] = {"strategy": strategy}
+    series = pd.Series(VALUES, dtype=object)
+    for column in ("notes", "ssn"):
+        cell = Masker(r, token_store=TokenStore(str(tmp_path / "a.json")))
+        col = Masker(r, token_store=TokenStore(str(tmp_path / "b.json")))
+        expected = series.map(lambda v, m=cell, c=column: m.mask_cell(v, c))
+        pd.testing.assert_series_equal(col.mask_column(series, column), expected)
+
+
+@pytest.mark.parametrize("column", ["notes", "ssn"])
+def test_equal_values_of_different_types_stay_distinct(tmp_path, column):
+    # 1, 1.0 and True hash equal but mask_cell keeps them apart
+    r = Rules.load(None)
+    r.columns["ssn"] = {"strategy": "hash"}
+    series = pd.Series([1, 1.0, True, "a@b.com", 1], dtype=object)
+    cell = Masker(r, token_store=TokenStore(str(tmp_path / "a.json")))
+    col = Masker(r, token_store=TokenStore(str(tmp_path / "b.json")))
+    masked = col.mask_column(series, column)
+    assert masked.tolist() == [cell.mask_cell(v, column) for v in series]
+    if column == "ssn":
+        assert len(set(masked)) == len(set(map(str, series)))
+    else:
+        assert [type(v) for v in masked[:3]] == [int, float, bool]
+
+
+def test_column_rule_masks_each_distinct_value_once(tmp_path):
+    r = Rules.load(None)
+    r.columns["ssn"] = {"strategy": "tokenize"}
+    m = Masker(r, token_store=TokenStore(str(tmp_path / "t.jsonl")))
+    calls = []
+    tokenize = m.tokens.tokenize
+    m.tokens.tokenize = lambda v: calls.append(v) or tokenize(v)
+    out = m.mask_column(pd.Series(["123-45-6789", "987-65-4321"] * 50), "ssn")
+    assert sorted(calls) == ["123-45-6789", "987-65-4321"]
+    assert out.str.startswith("TOK-").all()
+
+
+def test_partial_batch_handles_short_values():
+    r = Rules.load(None)
+    r.columns["code"] = {"strategy": "partial"}
+    r.options["partial_keep_last"] = 3
+    out = Masker(r).mask_column(pd.Series(["", "ab", "abc", "abcdef"]), "code")
+    assert out.tolist() == ["", "**", "***", "***def"]
+
+
+def test_clean_column_is_returned_unchanged():
+    series = pd.Series([1, 2, 3, 2])
+    assert Masker(Rules.load(None)).mask_column(series, "n") is series
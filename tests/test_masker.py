@@ -56,3 +56,55 @@ def test_credit_card_luhn_valid_only():
     out_invalid = m.mask_cell("1234567890123456")
     # Should not be masked since detector should ignore it
     assert out_invalid == "1234567890123456"
+
+
+def test_mask_cell_cache_hits_repeated_values(tmp_path):
+    r = Rules.load(None)
+    m = Masker(r, token_store=TokenStore(path=str(tmp_path / "tokens.json")))
+    for _ in range(3):
+        assert m.mask_cell("alice@example.com", column="email") == "[REDACTED]"
+    assert m.mask_cell(1, column="n") == 1
+    assert m.mask_cell(True, column="n") is True
+    info = m.cache_info()
+    EXPECTED_HITS, EXPECTED_MISSES = 2, 3
+    assert info["hits"] == EXPECTED_HITS
+    assert info["misses"] == EXPECTED_MISSES
+
+
+def test_mask_cell_cache_is_bounded(tmp_path):
+    r = Rules.load(None)
+    CACHE_SIZE = 2
+    r.options["cache_size"] = CACHE_SIZE
+    m = Masker(r, token_store=TokenStore(path=str(tmp_path / "tokens.json")))
+    for v in ("a", "b", "c", "a"):
+        m.mask_cell(v, column="c")
+    assert m.cache_info()["size"] == CACHE_SIZE
+    assert m.cache_hits == 0
+
+
+def test_mask_cell_cache_skips_nan(tmp_path):
+    r = Rules.load(None)
+    m = Masker(r, token_store=TokenStore(path=str(tmp_path / "tokens.json")))
+    m.mask_cell("alice@example.com", column="c")
+    for _ in range(3):
+        nan = float("nan")
+        assert m.mask_cell(nan, column="c") is nan
+    assert m.cache_info()["size"] == 1
+    assert m.cache_misses == 1
+
+
+def test_compiled_column_plan_resolves_rules_once(tmp_path):
+    r = Rules.load(None)
+    r.columns["ssn"] = {"strategy": "partial"}
+    r.options["partial_keep_last"] = 2
+    m = Masker(
+        r, token_store=TokenStore(path=str(tmp_path / "tokens.json")), profile={"id": []}
+    )
+    ssn, note, ident = m.compile(["ssn", "note", "id"])
+    assert (ssn.strategy, ssn.detector) == ("partial", None)
+    assert note.strategy is None and note.detector is m.detector
+    assert ident.skip
+    assert m.column("ssn") is ssn
+    # options are bound at compile time, later edits to the rules don't apply
+    r.options["partial_keep_last"] = 6
+    assert m.mask_cell("123-45-6789", column="ssn") == "*********89"
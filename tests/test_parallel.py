@@ -0,0 +1,42 @@
+import json
+
+from click.testing import CliRunner
+
+from data_masker.cli import main
+
+
+def _write_people(path, rows=120):
+    lines = ["id,email,ssn,note"]
+    for i in range(rows):
+        lines.append(f"{i},user{i % 7}@example.com,123-45-{i:04d},hello {i}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_parallel_scan_matches_serial(tmp_path):
+    src = tmp_path / "people.csv"
+    _write_people(src)
+    runner = CliRunner()
+    serial = runner.invoke(main, ["scan", str(src), "--as-json", "--chunksize", "25"])
+    parallel = runner.invoke(
+        main, ["scan", str(src), "--as-json", "--chunksize", "25", "--workers", "2"]
+    )
+    assert parallel.exit_code == 0
+    assert json.loads(parallel.output) == json.loads(serial.output)
+
+
+def test_parallel_mask_keeps_order_and_tokens(tmp_path):
+    src = tmp_path / "people.csv"
+    _write_people(src)
+    runner = CliRunner()
+    outputs = {}
+    for workers in ("1", "3"):
+        out = tmp_path / f"out{workers}.csv"
+        store = tmp_path / f"tokens{workers}.jsonl"
+        res = runner.invoke(main, [
+            "mask", str(src), "-o", str(out), "--chunksize", "25",
+            "--workers", workers, "--token-store", str(store),
+        ])
+        assert res.exit_code == 0
+        outputs[workers] = (out.read_text(), store.read_text().splitlines())
+    assert outputs["3"][0] == outputs["1"][0]
+    assert sorted(outputs["3"][1]) == sorted(outputs["1"][1])
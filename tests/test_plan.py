@@ -0,0 +1,39 @@
+import json
+
+from click.testing import CliRunner
+
+from data_masker.cli import main
+from data_masker.masker import Masker
+from data_masker.rules import Rules
+from data_masker.token_store import TokenStore
+
+
+def test_scan_exports_plan_with_clean_columns(tmp_path):
+    src = tmp_path / "data.csv"
+    src.write_text("id,email\n1,alice@example.com\n")
+    plan = tmp_path / "plan.json"
+    res = CliRunner().invoke(main, ["scan", str(src), "--export-plan", str(plan)])
+    assert res.exit_code == 0
+    assert json.loads(plan.read_text())["columns"] == {"id": [], "email": ["email"]}
+
+
+def test_mask_with_plan_only_touches_flagged_columns(tmp_path):
+    plan = tmp_path / "plan.json"
+    plan.write_text(json.dumps({"columns": {"note": [], "email": ["email"]}}))
+    src = tmp_path / "data.csv"
+    src.write_text("note,email,other\nbob@example.com,alice@example.com,carol@example.com\n")
+    out = tmp_path / "out.csv"
+    res = CliRunner().invoke(main, ["mask", str(src), "-o", str(out), "--plan", str(plan)])
+    assert res.exit_code == 0
+    # clean column passed through, flagged and unplanned columns masked
+    assert out.read_text().splitlines()[1] == "bob@example.com,[REDACTED],[REDACTED]"
+
+
+def test_profile_restricts_detectors_but_not_column_rules(tmp_path):
+    r = Rules.load(None)
+    r.columns["id"] = {"strategy": "redact"}
+    profile = {"email": ["email"], "id": []}
+    m = Masker(r, token_store=TokenStore(str(tmp_path / "t.json")), profile=profile)
+    assert m.mask_cell("123-45-6789", column="email") == "123-45-6789"
+    assert m.mask_cell("42", column="id") == "[REDACTED]"
+    assert not m.skips_column("id")
@@ -0,0 +1,58 @@
+import json
+
+import pandas as pd
+from click.testing import CliRunner
+
+from data_masker.cli import main
+from data_masker.detectors import Detector
+from data_masker.sampling import sample_scan, stable_rows_needed
+
+ROWS = 5000
+
+
+def test_stable_rows_needed_rule_of_three():
+    # 95% confidence of seeing a 1% type needs ~300 values
+    EXPECTED_WINDOW = 299
+    assert stable_rows_needed(0.95, 0.01) == EXPECTED_WINDOW
+
+
+def test_sample_scan_stops_reading_once_settled():
+    df = pd.DataFrame({
+        "email": [f"u{i}@example.com" for i in range(ROWS)],
+        "amount": [i * 1.5 for i in range(ROWS)],
+    })
+    chunks = (df.iloc[i : i + 100] for i in range(0, ROWS, 100))
+    result = sample_scan(chunks, Detector(), sample=ROWS)
+    assert not result.exhausted
+    assert result.rows_read < ROWS
+    assert result.columns["email"].rates() == {"email": 1.0}
+    assert result.columns["amount"].rates() == {}
+
+
+def test_scan_sample_cli_reports_rates(tmp_path):
+    src = tmp_path / "data.csv"
+    lines = ["name,email"] + [f"n{i},u{i}@example.com" for i in range(50)]
+    src.write_text("\n".join(lines) + "\n")
+    res = CliRunner().invoke(main, ["scan", str(src), "--as-json", "--sample", "20"])
+    assert res.exit_code == 0
+    data = json.loads(res.output)
+    assert data["columns"] == {"email": {"email": 20}}
+    assert data["sample"]["columns"]["email"] == {
+        "sampled": 20,
+        "settled": True,
+        "rates": {"email": 1.0},
+    }
+
+
+def test_scan_sample_refuses_to_export_plan(tmp_path):
+    src = tmp_path / "data.csv"
+    lines = ["id,note"] + [f"{i},plain" for i in range(ROWS)]
+    lines[-1] = f"{ROWS},bob@example.com"
+    src.write_text("\n".join(lines) + "\n")
+    plan = tmp_path / "plan.json"
+    res = CliRunner().invoke(
+        main, ["scan", str(src), "--sample", "500", "--export-plan", str(plan)]
+    )
+    assert res.exit_code != 0
+    assert "--export-plan" in res.output
+    assert not plan.exists()
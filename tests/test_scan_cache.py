@@ -0,0 +1,92 @@
+import io
+import json
+
+from click.testing import CliRunner
+
+from data_masker import scan_cache
+from data_masker.cli import main
+from data_masker.scan_cache import iter_blocks
+
+CHUNKSIZE = 10
+ROWS = 35
+APPENDED = 12
+
+
+def _rows(start, stop):
+    # every third note spans two lines inside quotes
+    return "".join(
+        f'{i},user{i}@example.com,"note {i}\nline two"\n' if i % 3 == 0
+        else f"{i},123-45-{i:04d},plain {i}\n"
+        for i in range(start, stop)
+    )
+
+
+def _scan(path, cache, *extra):
+    res = CliRunner().invoke(main, [
+        "scan", str(path), "--as-json", "--chunksize", str(CHUNKSIZE), "--cache", str(cache),
+        *extra,
+    ])
+    assert res.exit_code == 0, res.output
+    return json.loads(res.stdout)
+
+
+def test_blocks_respect_quoted_newlines():
+    data = b'a,"x\ny",1\nb,c,2\n"q""\n",d,3\ntail'
+    blocks = list(iter_blocks(io.BytesIO(data), 0, 1, quoted=True))
+    assert [b.data for b in blocks] == [b'a,"x\ny",1\n', b"b,c,2\n", b'"q""\n",d,3\n', b"tail"]
+    assert [b.complete for b in blocks] == [True, True, True, False]
+
+
+def test_rescan_only_detects_appended_rows(tmp_path):
+    src = tmp_path / "log.csv"
+    src.write_text("id,contact,note\n" + _rows(0, ROWS), encoding="utf-8")
+    cache = tmp_path / "cache"
+    first = _scan(src, cache)
+    assert first["cache"]["reused_rows"] == 0
+    again = _scan(src, cache)
+    assert again["cache"]["scanned_rows"] == 0
+    assert again["columns"] == first["columns"]
+
+    with open(src, "a", encoding="utf-8") as f:
+        f.write(_rows(ROWS, ROWS + APPENDED))
+    appended = _scan(src, cache)
+    assert appended["cache"]["reused_rows"] == ROWS
+    assert appended["cache"]["scanned_rows"] == APPENDED
+    full = CliRunner().invoke(main, ["scan", str(src), "--as-json"])
+    assert appended["columns"] == json.loads(full.stdout)["columns"]
+
+
+def test_cache_invalidates_on_rules_and_edits(tmp_path):
+    src = tmp_path / "log.csv"
+    src.write_text("id,contact,note\n" + _rows(0, ROWS), encoding="utf-8")
+    cache = tmp_path / "cache"
+    _scan(src, cache)
+    rules = tmp_path / "rules.yml"
+    rules.write_text("detectors:\n  enable_email: false\n", encoding="utf-8")
+    no_email = _scan(src, cache, "-r", str(rules))
+    assert no_email["cache"]["reused_rows"] == 0
+    assert "email" not in json.dumps(no_email["columns"])
+
+    # rewriting a row in the middle keeps only the chunks before it
+    text = src.read_text(encoding="utf-8").replace("plain 20", "plain XX")
+    src.write_text(text, encoding="utf-8")
+    edited = _scan(src, cache, "-r", str(rules))
+    assert 0 < edited["cache"]["reused_rows"] < ROWS
+
+
+def test_edit_and_append_rescans_from_the_edit(tmp_path, monkeypatch):
+    src = tmp_path / "log.csv"
+    src.write_text("id,contact,note\n" + _rows(0, ROWS * 4), encoding="utf-8")
+    cache = tmp_path / "cache"
+    _scan(src, cache)
+    # a same-length edit in a middle chunk plus appended rows must not reuse stale counts
+    text = src.read_text(encoding="utf-8").replace("plain 70", " a@bc.io")
+    src.write_text(text + _rows(ROWS * 4, ROWS * 4 + APPENDED), encoding="utf-8")
+    again = _scan(src, cache)
+    assert again["cache"]["reused_rows"] == 7 * CHUNKSIZE  # noqa: PLR2004
+    full = CliRunner().invoke(main, ["scan", str(src), "--as-json"])
+    assert again["columns"] == json.loads(full.stdout)["columns"]
+
+    monkeypatch.setattr(scan_cache, "_package_version", lambda: "99.0")
+    upgraded = _scan(src, cache)
+    assert upgraded["cache"]["reused_rows"] == 0
@@ -0,0 +1,161 @@
+import asyncio
+import http.client
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from data_masker.server import Job, MaskingService, parse_body
+
+OK = 200
+ROWS = 40
+CLIENTS = 8
+
+
+def _start(tmp_path, **options):
+    svc = MaskingService(token_store_path=str(tmp_path / "t.jsonl"), **options)
+    bound = threading.Event()
+
+    def ready(url):
+        svc.port = int(url.rsplit(":", 1)[1])
+        bound.set()
+
+    thread = threading.Thread(
+        target=lambda: asyncio.run(svc.serve("127.0.0.1", 0, ready=ready)), daemon=True
+    )
+    thread.start()
+    assert bound.wait(10)
+    return svc, thread
+
+
+@pytest.fixture
+def service(tmp_path):
+    rules_dir = tmp_path / "rules"
+    rules_dir.mkdir()
+    svc, thread = _start(tmp_path, flush_interval=0.05, rules_dir=str(rules_dir))
+    yield svc
+    svc.stop()
+    thread.join(10)
+
+
+def _request(svc, method, path, body=b"", content_type="application/json"):
+    conn = http.client.HTTPConnection("127.0.0.1", svc.port, timeout=10)
+    conn.request(method, path, body=body, headers={"Content-Type": content_type})
+    res = conn.getresponse()
+    payload = res.read()
+    conn.close()
+    return res.status, payload
+
+
+def test_mask_and_scan_records_and_csv(service):
+    records = [{"id": i, "email": f"user{i}@example.com"} for i in range(3)]
+    status, body = _request(service, "POST", "/mask", json.dumps({"records": records}))
+    assert status == OK
+    masked = json.loads(body)["records"]
+    assert [r["email"] for r in masked] == ["[REDACTED]"] * 3
+    assert [r["id"] for r in masked] == [0, 1, 2]
+    csv_body = b"name,phone\nAnn,202-555-0133\nBob,none\n"
+    status, body = _request(service, "POST", "/mask", csv_body, "text/csv")
+    assert body.decode().splitlines() == ["name,phone", "Ann,[REDACTED]", "Bob,none"]
+    status, body = _request(service, "POST", "/scan", csv_body, "text/csv")
+    assert json.loads(body) == {"rows": 2, "columns": {"phone": {"phone": 1}}}
+
+
+def test_concurrent_requests_are_batched_and_counted(service, tmp_path):
+    rules = tmp_path / "rules" / "rules.yml"
+    rules.write_text("columns:\n  email:\n    strategy: tokenize\n", encoding="utf-8")
+    results = {}
+
+    def client(n):
+        rows = [{"email": f"user{(n * ROWS + i) % ROWS}@example.com"} for i in range(ROWS)]
+        results[n] = _request(service, "POST", "/mask?rules=rules.yml", json.dumps(rows))
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(CLIENTS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    tokens = [[r["email"] for r in json.loads(body)] for status, body in results.values()]
+    assert all(status == OK for status, _ in results.values())
+    assert all(batch == tokens[0] for batch in tokens)
+    assert tokens[0][0].startswith("TOK-")
+    _, body = _request(service, "GET", "/metrics")
+    metrics = json.loads(body)
+    assert metrics["rows"]["mask"] == CLIENTS * ROWS
+    assert metrics["batched_requests"] == CLIENTS
+    assert metrics["maskers"] == 2  # noqa: PLR2004
+
+
+def test_rules_outside_rules_dir_are_refused(service, tmp_path):
+    outside = tmp_path / "evil.yml"
+    outside.write_text("columns: {}\n", encoding="utf-8")
+    for name in (str(outside), "../evil.yml"):
+        assert _request(service, "POST", f"/mask?rules={name}", b"[]")[0] == 403  # noqa: PLR2004
+    assert _request(service, "POST", "/mask?rules=missing.yml", b"[]")[0] == 400  # noqa: PLR2004
+    svc, thread = _start(tmp_path)
+    try:
+        # Without --rules-dir no client may pick a rules file at all
+        assert _request(svc, "POST", f"/mask?rules={outside}", b"[]")[0] == 403  # noqa: PLR2004
+    finally:
+        svc.stop()
+        thread.join(10)
+
+
+def test_batched_requests_keep_their_own_types(tmp_path):
+    svc = MaskingService(token_store_path=str(tmp_path / "t.jsonl"))
+    ints = Job("mask", "", *parse_body(b"id\n1\n2\n", "text/csv"))
+    blanks = Job("mask", "", *parse_body(b'[{"id": 3}, {"id": null}]', "application/json"))
+    alone = svc._process([ints])
+    assert svc._process([ints, blanks])[0] == alone[0] == b"id\n1\n2\n"
+
+
+def _raw(svc, request):
+    with socket.create_connection(("127.0.0.1", svc.port), timeout=10) as sock:
+        sock.sendall(request)
+        return sock.makefile("rb").readline()
+
+
+def test_bad_content_length_and_forbidden_reason(service):
+    bad = b"POST /mask HTTP/1.1\r\nContent-Length: lots\r\n\r\n[]"
+    assert _raw(service, bad) == b"HTTP/1.1 400 Bad Request\r\n"
+    forbidden = b"POST /mask?rules=../x.yml HTTP/1.1\r\nContent-Length: 2\r\n\r\n[]"
+    assert _raw(service, forbidden) == b"HTTP/1.1 403 Forbidden\r\n"
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 10
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_errors_and_backpressure(tmp_path):
+    svc, thread = _start(tmp_path, max_pending=1, max_batch=1)
+    assert _request(svc, "POST", "/mask", b"{not json")[0] == 400  # noqa: PLR2004
+    assert _request(svc, "GET", "/mask")[0] == 405  # noqa: PLR2004
+    assert _request(svc, "GET", "/nope")[0] == 404  # noqa: PLR2004
+    # Hold the worker thread: one request is taken off the queue, one waits in it
+    release = threading.Event()
+    svc._executor.submit(release.wait)
+    statuses = []
+
+    def client():
+        statuses.append(_request(svc, "POST", "/mask", b"[]")[0])
+
+    waiting = [threading.Thread(target=client) for _ in range(2)]
+    try:
+        waiting[0].start()
+        _wait_for(lambda: svc.metrics["requests"]["mask"] == 3 and svc._queue.empty())  # noqa: PLR2004
+        waiting[1].start()
+        _wait_for(svc._queue.full)
+        assert _request(svc, "POST", "/mask", b"[]")[0] == 503  # noqa: PLR2004
+    finally:
+        release.set()
+        for t in waiting:
+            t.join(10)
+        svc.stop()
+        thread.join(10)
+    assert statuses == [OK, OK]
+    assert svc.metrics_report()["rejected"] == 1
@@ -0,0 +1,59 @@
+import subprocess
+import sys
+
+# Cumulative import time allowed for data_masker.cli, in microseconds. The
+# CLI module itself takes well under 100ms; pandas alone is several times this.
+IMPORT_BUDGET_US = 300_000
+HEAVY_MODULES = ("pandas", "numpy", "yaml", "openpyxl")
+
+
+def _python(*args):
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True
+    )
+
+
+def test_cli_import_skips_heavy_modules():
+    code = (
+        "import sys, data_masker.cli; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    assert _python("-c", code).stdout.strip() == ""
+
+
+def test_cli_import_time_budget():
+    err = _python("-X", "importtime", "-c", "import data_masker.cli").stderr
+    cumulative = {
+        fields[2].strip(): int(fields[1])
+        for fields in (line.split("|") for line in err.splitlines() if "|" in line)
+        if fields[1].strip().isdigit()
+    }
+    assert cumulative["data_masker.cli"] < IMPORT_BUDGET_US
+
+
+def test_help_runs_without_pandas():
+    code = (
+        "import sys\n"
+        "from click.testing import CliRunner\n"
+        "from data_masker.cli import main\n"
+        "res = CliRunner().invoke(main, ['mask', '--help'])\n"
+        "assert res.exit_code == 0, res.output\n"
+        "print('pandas' in sys.modules)\n"
+    )
+    assert _python("-c", code).stdout.strip() == "False"
+
+
+def test_stream_engine_masks_without_pandas(tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    src.write_text("id,email\n1,alice@example.com\n2,none\n", encoding="utf-8")
+    code = (
+        "import sys\n"
+        "from click.testing import CliRunner\n"
+        "from data_masker.cli import main\n"
+        f"res = CliRunner().invoke(main, ['mask', {str(src)!r}, '-o', {str(out)!r},\n"
+        f"    '--engine', 'stream', '--token-store', {str(tmp_path / 't.json')!r}, '--stats'])\n"
+        "assert res.exit_code == 0, res.output\n"
+        "print(','.join(m for m in ('pandas', 'numpy') if m in sys.modules))\n"
+    )
+    assert _python("-c", code).stdout.strip() == ""
+    assert out.read_text(encoding="utf-8") == "id,email\n1,[REDACTED]\n2,none\n"
@@ -0,0 +1,85 @@
+import json
+
+import pandas as pd
+from click.testing import CliRunner
+
+from data_masker.cli import main
+from data_masker.detectors import Detector
+from data_masker.stats import Stats
+
+ROWS = 60
+CHUNKSIZE = 25
+CHUNKS = 3
+CARDS = 2
+
+
+def _write_people(path):
+    lines = ["id,email,card"]
+    for i in range(ROWS):
+        # every other card fails the Luhn check
+        card = "4111 1111 1111 1111" if i % 2 else "4111 1111 1111 1112"
+        lines.append(f"{i},user{i}@example.com,{card}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_detector_counts_validator_rejections():
+    det = Detector()
+    det.stats = Stats()
+    det.detect_series(pd.Series(["4111 1111 1111 1111", "4111 1111 1111 1112", "hello"]))
+    assert det.stats.counters["validator.credit_card.calls"] == CARDS
+    assert det.stats.counters["validator.credit_card.rejected"] == 1
+    # the email prefilter rules out every value, so the regex never runs
+    assert det.stats.counters.get("regex.email.tested", 0) == 0
+    det.detect_cell("4111 1111 1111 1112")
+    assert det.stats.counters["validator.credit_card.rejected"] == CARDS
+    assert "regex.credit_card" in det.stats.timers
+
+
+def test_mask_stats_json_reports_chunks_strategies_and_tokens(tmp_path):
+    src = tmp_path / "people.csv"
+    _write_people(src)
+    rules = tmp_path / "rules.yml"
+    rules.write_text("strategies:\n  email: tokenize\n", encoding="utf-8")
+    out_json = tmp_path / "stats.json"
+    res = CliRunner().invoke(main, [
+        "mask", str(src), "-o", str(tmp_path / "out.csv"), "-r", str(rules),
+        "--token-store", str(tmp_path / "t.jsonl"), "--chunksize", str(CHUNKSIZE),
+        "--stats", "--stats-json", str(out_json),
+    ])
+    assert res.exit_code == 0, res.output
+    assert "Validators:" in res.output
+    stats = json.loads(out_json.read_text())
+    assert stats["rows"] == ROWS
+    assert len(stats["chunks"]) == CHUNKS
+    assert stats["counters"]["strategy.tokenize.calls"] == ROWS
+    assert stats["counters"]["tokens.misses"] == ROWS
+    assert stats["counters"]["tokens.flush.written"] == ROWS
+    assert stats["counters"]["validator.credit_card.rejected"] == 1
+
+
+def test_parallel_scan_stats_match_serial(tmp_path):
+    src = tmp_path / "people.csv"
+    _write_people(src)
+    runner = CliRunner()
+    counters = []
+    for workers in ("1", "2"):
+        out_json = tmp_path / f"stats{workers}.json"
+        res = runner.invoke(main, [
+            "scan", str(src), "--chunksize", str(CHUNKSIZE), "--workers", workers,
+            "--stats-json", str(out_json),
+        ])
+        assert res.exit_code == 0, res.output
+        stats = json.loads(out_json.read_text())
+        assert stats["rows"] == ROWS
+        counters.append(stats["counters"])
+    assert counters[0] == counters[1]
+
+
+def test_cprofile_writes_profile(tmp_path):
+    src = tmp_path / "people.csv"
+    _write_people(src)
+    prof = tmp_path / "run.prof"
+    res = CliRunner().invoke(main, ["--cprofile", str(prof), "scan", str(src)])
+    assert res.exit_code == 0, res.output
+    assert prof.exists()
+    assert "top functions" in res.output
@@ -0,0 +1,46 @@
+import pandas as pd
+from click.testing import CliRunner
+
+from data_masker.cli import main
+
+CSV = (
+    "id,email,amount,note\n"
+    "00123,alice@example.com,10,plain\n"
+    "00124,,,\"multi\nline, quoted\"\n"
+    "00125,bob@example.com,12.50,call 202-555-0133\n"
+)
+
+
+def _mask(tmp_path, *args):
+    src = tmp_path / "in.csv"
+    src.write_text(CSV, encoding="utf-8")
+    out = tmp_path / "out.csv"
+    res = CliRunner().invoke(main, [
+        "mask", str(src), "-o", str(out), "--token-store", str(tmp_path / "t.jsonl"), *args,
+    ])
+    assert res.exit_code == 0, res.output
+    return out
+
+
+def test_stream_engine_keeps_unmasked_values_as_written(tmp_path):
+    out = _mask(tmp_path, "--engine", "stream")
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert lines[1] == "00123,[REDACTED],10,plain"
+    assert lines[2] == '00124,,,"multi'
+    assert lines[-1] == "00125,[REDACTED],12.50,[REDACTED]"
+
+
+def test_stream_engine_matches_pandas_engine(tmp_path):
+    stream = pd.read_csv(_mask(tmp_path, "--engine", "stream", "--chunksize", "1"))
+    frame = pd.read_csv(_mask(tmp_path, "--chunksize", "2"))
+    pd.testing.assert_frame_equal(stream, frame)
+
+
+def test_stream_engine_rejects_other_formats(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text(CSV, encoding="utf-8")
+    res = CliRunner().invoke(main, [
+        "mask", str(src), "-o", str(tmp_path / "out.json"), "--engine", "stream",
+    ])
+    assert res.exit_code != 0
+    assert "only CSV" in res.output
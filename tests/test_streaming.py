@@ -0,0 +1,50 @@
+import json
+
+import pandas as pd
+from click.testing import CliRunner
+
+from data_masker import io_utils
+from data_masker.cli import main
+
+
+def test_chunked_scan_never_loads_whole_file(tmp_path, monkeypatch):
+    src = tmp_path / "data.csv"
+    src.write_text("name,email\nAlice,alice@example.com\nBob,bob@example.com\n")
+
+    def fail(path):
+        raise AssertionError("read_table called in chunked mode")
+
+    monkeypatch.setattr("data_masker.io_utils.read_table", fail)
+    res = CliRunner().invoke(main, ["scan", str(src), "--as-json", "--chunksize", "1"])
+    assert res.exit_code == 0
+    assert json.loads(res.output)["columns"] == {"email": {"email": 2}}
+
+
+def test_ndjson_chunked_mask_round_trip(tmp_path):
+    src = tmp_path / "data.ndjson"
+    records = [{"name": "Alice", "email": "alice@example.com"}, {"name": "Bob", "email": None}]
+    src.write_text("".join(json.dumps(r) + "\n" for r in records))
+    out = tmp_path / "out.jsonl"
+    res = CliRunner().invoke(main, ["mask", str(src), "-o", str(out), "--chunksize", "1"])
+    assert res.exit_code == 0
+    masked = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["name"] for r in masked] == ["Alice", "Bob"]
+    assert masked[0]["email"] == "[REDACTED]"
+
+
+def test_chunked_mask_inplace(tmp_path):
+    src = tmp_path / "data.csv"
+    src.write_text("name,email\nAlice,alice@example.com\nBob,bob@example.com\n")
+    res = CliRunner().invoke(
+        main, ["mask", str(src), "-o", "unused.csv", "--inplace", "--chunksize", "1"]
+    )
+    assert res.exit_code == 0
+    assert "@" not in src.read_text()
+
+
+def test_iter_table_chunks_ndjson(tmp_path):
+    src = tmp_path / "data.jsonl"
+    src.write_text('{"a": 1}\n{"a": 2}\n{"a": 3}\n')
+    chunks = list(io_utils.iter_table_chunks(str(src), chunksize=2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert pd.concat(chunks)["a"].tolist() == [1, 2, 3]
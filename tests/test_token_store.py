@@ -0,0 +1,107 @@
+import gc
+import json
+import warnings
+import weakref
+
+import pytest
+
+from data_masker import token_store
+from data_masker.token_store import TokenStore, migrate
+
+
+def test_new_tokens_are_batched_until_flush(tmp_path):
+    path = tmp_path / "tokens.json"
+    BATCH = 3
+    store = TokenStore(str(path), batch_size=BATCH)
+    store.tokenize("a")
+    store.tokenize("b")
+    assert not path.exists()
+    store.tokenize("c")
+    assert len(json.loads(path.read_text())) == BATCH
+    store.tokenize("d")
+    store.flush()
+    assert len(json.loads(path.read_text())) == BATCH + 1
+
+
+@pytest.mark.parametrize("name", ["tokens.sqlite", "tokens.jsonl"])
+def test_backends_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    store = TokenStore(path)
+    token = store.tokenize("123-45-6789")
+    store.close()
+    reopened = TokenStore(path)
+    assert reopened.items() == {"tok::123-45-6789": token}
+    assert reopened.tokenize("123-45-6789") == token
+    reopened.close()
+
+
+def test_json_flush_replaces_file_atomically(tmp_path, monkeypatch):
+    path = tmp_path / "tokens.json"
+    store = TokenStore(str(path))
+    store.tokenize("a")
+    store.flush()
+    before = path.read_text()
+    store.tokenize("b")
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(json, "dump", fail)
+    with pytest.raises(OSError, match="disk full"):
+        store.flush()
+    # The old file is intact, no temp file is left, and "b" is retried later
+    assert path.read_text() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["tokens.json"]
+    monkeypatch.undo()
+    store.close()
+    assert set(json.loads(path.read_text())) == {"tok::a", "tok::b"}
+
+
+def test_unclosed_store_is_collected_and_flushed(tmp_path):
+    path = tmp_path / "tokens.json"
+    store = TokenStore(str(path))
+    store.tokenize("a")
+    ref = weakref.ref(store)
+    del store
+    gc.collect()
+    # The exit hook does not keep the store alive, and nothing is lost
+    assert ref() is None
+    assert list(json.loads(path.read_text())) == ["tok::a"]
+
+
+def test_log_backend_skips_torn_line(tmp_path):
+    path = tmp_path / "tokens.jsonl"
+    path.write_text('{"k": "tok::a", "v": "TOK-1"}\n{"k": "tok::b", "v"')
+    assert TokenStore(str(path)).tokenize("a") == "TOK-1"
+
+
+def test_legacy_json_migrates_to_sqlite(tmp_path):
+    legacy = tmp_path / ".tokens.json"
+    legacy.write_text(json.dumps({"tok::123-45-6789": "TOK-01a54629"}))
+    target = str(tmp_path / "tokens.db")
+    assert migrate(str(legacy), target) == 1
+    assert TokenStore(target).tokenize("123-45-6789") == "TOK-01a54629"
+
+
+def test_new_default_store_is_a_log_but_legacy_json_is_kept(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = TokenStore()
+    assert (store.path, store.backend.name) == (".tokens.jsonl", "log")
+    store.close()
+    (tmp_path / ".tokens.json").write_text("{}")
+    legacy = TokenStore()
+    assert (legacy.path, legacy.backend.name) == (".tokens.json", "json")
+    legacy.close()
+
+
+def test_large_json_store_warns_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(token_store, "JSON_WARN_MAPPINGS", 2)
+    store = TokenStore(str(tmp_path / "tokens.json"))
+    with pytest.warns(UserWarning, match="migrate-tokens"):
+        for value in "abc":
+            store.tokenize(value)
+        store.flush()
+    store.tokenize("d")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        store.close()
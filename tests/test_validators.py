@@ -0,0 +1,70 @@
+import random
+
+import pandas as pd
+import pytest
+
+from data_masker.detectors import Detector
+from data_masker.validators import (
+    iban_mod97,
+    iban_valid_batch,
+    ipv6_valid,
+    luhn_valid,
+    luhn_valid_batch,
+)
+
+SAMPLES = 2000
+# Share of generated numbers written in groups of four
+GROUPED = 0.5
+
+
+def _digit_texts(rng):
+    texts = []
+    for _ in range(SAMPLES):
+        digits = "".join(rng.choice("0123456789") for _ in range(rng.randint(10, 22)))
+        if rng.random() < GROUPED:
+            digits = " ".join(digits[i : i + 4] for i in range(0, len(digits), 4))
+        texts.append(digits)
+    return [*texts, "4111 1111 1111 1111", "٤١١١١١١١١١١١١١١١", "card 4111-1111-1111-1112"]
+
+
+def test_luhn_batch_matches_scalar():
+    texts = _digit_texts(random.Random(0))
+    expected = [luhn_valid(t) for t in texts]
+    assert luhn_valid_batch(texts).tolist() == expected
+    assert expected[-3:] == [True, True, False]
+
+
+def test_iban_chunked_mod97_matches_big_int():
+    rng = random.Random(1)
+    ibans = ["GB82WEST12345698765432", "GB00WEST12345698765432"]
+    ibans += [
+        "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789") for _ in range(30))
+        for _ in range(SAMPLES)
+    ]
+    for iban in ibans:
+        big = int("".join(str(int(ch, 36)) for ch in iban[4:] + iban[:4]))
+        assert iban_mod97(iban) == (big % 97 == 1)
+    assert iban_valid_batch(ibans[:2]).tolist() == [True, False]
+
+
+@pytest.mark.parametrize(
+    ("text", "valid"),
+    [
+        ("host 2001:db8::1 is up", True),
+        ("[2001:db8::1]:443", True),
+        ("fe80::1%eth0", True),
+        ("fe80::1::2", False),
+        ("2001:db8::zz", False),
+        ("1:2:3:4:5:6:7:8:9", False),
+    ],
+)
+def test_ipv6_checks_each_matched_span(text, valid):
+    assert ipv6_valid(text) is valid
+
+
+def test_vectorized_and_per_cell_validation_agree():
+    texts = [*_digit_texts(random.Random(2)), "GB82WEST12345698765432", "ip 2001:db8::1"]
+    series = pd.Series(texts)
+    assert Detector(vectorized=True).detect_series(series) == Detector(
+        vectorized=False
+    ).detect_series(series)
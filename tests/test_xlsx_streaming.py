@@ -0,0 +1,83 @@
+import json
+
+import pandas as pd
+from click.testing import CliRunner
+from openpyxl import Workbook, load_workbook
+
+from data_masker.cli import main
+from data_masker.io_utils import iter_xlsx_chunks
+
+ROWS = 12
+CHUNK = 5
+
+
+def _workbook(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Customers"
+    ws.append(["id", "email", "amount"])
+    for i in range(ROWS):
+        ws.append([i, f"user{i}@example.com" if i % 2 else None, i * 1.5])
+    wb.create_sheet("Notes")
+    staff = wb.create_sheet("Staff")
+    staff.append(["name", "phone"])
+    staff.append(["Ann", "202-555-0133"])
+    wb.save(path)
+
+
+def test_chunks_cover_every_sheet(tmp_path):
+    path = tmp_path / "book.xlsx"
+    _workbook(path)
+    chunks = list(iter_xlsx_chunks(str(path), chunksize=CHUNK, columns=["email", "phone"]))
+    assert [c.attrs["sheet"] for c in chunks] == ["Customers"] * 3 + ["Notes", "Staff"]
+    assert [len(c) for c in chunks] == [CHUNK, CHUNK, ROWS - 2 * CHUNK, 0, 1]
+    assert list(chunks[0].columns) == ["email"]
+
+
+def test_mask_streams_workbook_and_keeps_sheets(tmp_path):
+    src, out = tmp_path / "book.xlsx", tmp_path / "masked.xlsx"
+    _workbook(src)
+    res = CliRunner().invoke(main, [
+        "mask", str(src), "-o", str(out), "--chunksize", str(CHUNK),
+        "--token-store", str(tmp_path / "t.json"),
+    ])
+    assert res.exit_code == 0, res.output
+    wb = load_workbook(out)
+    assert wb.sheetnames == ["Customers", "Notes", "Staff"]
+    customers = list(wb["Customers"].iter_rows(values_only=True))
+    assert customers[0] == ("id", "email", "amount")
+    assert customers[1:3] == [(0, None, 0), (1, "[REDACTED]", 1.5)]
+    assert len(customers) == ROWS + 1
+    assert list(wb["Staff"].iter_rows(values_only=True)) == [
+        ("name", "phone"),
+        ("Ann", "[REDACTED]"),
+    ]
+
+
+def test_mask_workbook_to_csv_writes_only_first_sheet(tmp_path):
+    src = tmp_path / "book.xlsx"
+    _workbook(src)
+    outputs = {}
+    for chunksize in (None, CHUNK):
+        out = tmp_path / f"masked-{chunksize}.csv"
+        args = ["mask", str(src), "-o", str(out), "--token-store", str(tmp_path / "t.json")]
+        if chunksize:
+            args += ["--chunksize", str(chunksize)]
+        res = CliRunner().invoke(main, args)
+        assert res.exit_code == 0, res.output
+        outputs[chunksize] = pd.read_csv(out)
+    streamed = outputs[CHUNK]
+    assert list(streamed.columns) == ["id", "email", "amount"]
+    assert len(streamed) == ROWS
+    assert "Ann" not in streamed.to_string()
+    pd.testing.assert_frame_equal(streamed, outputs[None])
+
+
+def test_scan_reads_all_sheets_without_chunksize(tmp_path):
+    path = tmp_path / "book.xlsx"
+    _workbook(path)
+    res = CliRunner().invoke(main, ["scan", str(path), "--as-json"])
+    assert json.loads(res.output)["columns"] == {
+        "email": {"email": ROWS // 2},
+        "phone": {"phone": 1},
+    }